@@ -0,0 +1,137 @@
+"""
+Compile pipeline benchmark driven by the stub compiler.
+
+Runs run_compile_jobs() over a synthetic corpus at several worker counts and
+reports throughput, worker utilization (busy time / workers x wall time) and
+per-file latency percentiles. An optional per-result callback cost simulates
+the progress UI work done on the consuming thread.
+
+Usage:
+    python benchmarks/bench_compile.py --files 200 --workers 1 2 4 8 --latency 0.05
+    python benchmarks/bench_compile.py --fail-rate 0.05 --startup 0.1 --callback-cost-ms 2
+    python benchmarks/bench_compile.py --startup 0.2 --batch-mode args --batch-size 16
+    python benchmarks/bench_compile.py --latency 0.01 --latency-per-kb 0.01 --schedule longest-first
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import vpcf_color_editor as vce  # noqa: E402
+from generate_corpus import generate_corpus  # noqa: E402
+
+STUB_COMPILER = os.path.join(BENCH_DIR, "stub_compiler.py")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def summarize(summary, workers):
+    durations = [r['duration'] for r in summary['results']]
+    wall = summary['wall_time']
+    busy = sum(durations)
+    return {
+        'workers': workers,
+        'files': len(durations),
+        'failed': summary['failed'],
+        'wall_s': round(wall, 3),
+        'files_per_s': round(len(durations) / wall, 1) if wall > 0 else 0.0,
+        'utilization': round(busy / (summary['workers'] * wall), 3) if wall > 0 else 0.0,
+        'p50_ms': round(percentile(durations, 50) * 1000, 1),
+        'p95_ms': round(percentile(durations, 95) * 1000, 1),
+        'p99_ms': round(percentile(durations, 99) * 1000, 1),
+        'max_ms': round(max(durations, default=0.0) * 1000, 1),
+    }
+
+
+def run(jobs, workers, callback_cost, batch_options, durations=None):
+    def on_result(result, completed, total):
+        if durations is not None and not result.get('batched'):
+            durations.record(result['path'], result['duration'])
+        if callback_cost:
+            time.sleep(callback_cost)
+
+    summary = vce.run_compile_jobs(
+        jobs, STUB_COMPILER, max_workers=workers, on_result=on_result, batch_options=batch_options
+    )
+    row = summarize(summary, workers)
+    row['batches'] = summary['batches']
+    row['retried'] = summary['retried']
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compile pipeline with a stub compiler.")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.05, help="stub seconds per file")
+    parser.add_argument("--latency-per-kb", type=float, default=0.0, help="stub extra seconds per KB")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--startup", type=float, default=0.0, help="stub process start-up seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--output-lines", type=int, default=5)
+    parser.add_argument("--callback-cost-ms", type=float, default=0.0,
+                        help="simulated progress UI cost per finished file")
+    parser.add_argument("--batch-mode", choices=vce.COMPILE_BATCH_MODES, default="single")
+    parser.add_argument("--batch-size", type=int, default=vce.DEFAULT_COMPILE_BATCH["size"])
+    parser.add_argument("--schedule", choices=("submit", "longest-first"), default="submit",
+                        help="longest-first: warm up duration history, then order jobs slowest first")
+    parser.add_argument("--json", metavar="PATH", help="write the results to PATH")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "STUB_COMPILER_LATENCY": str(args.latency),
+        "STUB_COMPILER_LATENCY_PER_KB": str(args.latency_per_kb),
+        "STUB_COMPILER_JITTER": str(args.jitter),
+        "STUB_COMPILER_STARTUP": str(args.startup),
+        "STUB_COMPILER_FAIL_RATE": str(args.fail_rate),
+        "STUB_COMPILER_OUTPUT_LINES": str(args.output_lines),
+    })
+
+    corpus_dir = tempfile.mkdtemp(prefix="vpcf_compile_bench_")
+    try:
+        paths = generate_corpus(corpus_dir, files=args.files, empty_ratio=0.0)
+        jobs = [(os.path.relpath(p, corpus_dir), p) for p in paths]
+
+        batch_options = dict(vce.DEFAULT_COMPILE_BATCH, mode=args.batch_mode, size=args.batch_size)
+        if args.batch_mode == "filelist":
+            batch_options["filelist_arg"] = "-filelist"
+
+        durations = None
+        if args.schedule == "longest-first":
+            durations = vce.CompileDurations(os.path.join(corpus_dir, "durations.json"))
+            run(jobs, max(args.workers), 0.0, batch_options, durations)
+
+        rows = []
+        print(f"{'workers':>8}{'files/s':>10}{'wall s':>9}{'util':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'failed':>8}{'retried':>9}")
+        for workers in args.workers:
+            ordered = jobs
+            if durations is not None:
+                expected = durations.expected([path for _, path in jobs])
+                ordered = vce.order_longest_first(jobs, expected)
+                print(f"{'':>8}predicted {vce.predict_compile_time([ordered], expected, workers):.2f}s")
+            row = run(ordered, workers, args.callback_cost_ms / 1000.0, batch_options)
+            rows.append(row)
+            print(f"{row['workers']:>8}{row['files_per_s']:>10.1f}{row['wall_s']:>9.2f}{row['utilization']:>7.0%}"
+                  f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['failed']:>8}{row['retried']:>9}")
+    finally:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
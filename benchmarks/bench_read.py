@@ -0,0 +1,97 @@
+"""
+Scan benchmark for slow storage: serial read loop vs the asyncio reader.
+
+Every file read can be given an artificial latency (--latency, seconds per
+file, with --jitter) to model an external drive or network share where
+opening a file costs far more than parsing it. Each run starts with an
+empty read cache. Point --folder at a real mount (and use --latency 0)
+to measure the actual storage instead of a generated corpus.
+
+Usage:
+    python benchmarks/bench_read.py --files 500 --latency 0.005
+    python benchmarks/bench_read.py --latency 0.02 --concurrency 4 16 64
+    python benchmarks/bench_read.py --folder /mnt/content/citadel_addons/my_mod --latency 0
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import vpcf_color_editor as vce  # noqa: E402
+from generate_corpus import generate_corpus  # noqa: E402
+
+
+def slow_reader(read_file, latency, jitter, seed):
+    """Wrap read_file() so every call first waits `latency` seconds (+/- jitter)."""
+    rng = random.Random(seed)
+
+    def read(path):
+        time.sleep(max(0.0, latency * (1.0 + rng.uniform(-jitter, jitter))))
+        return read_file(path)
+    return read
+
+
+def timed_scan(folder, concurrency):
+    vce.file_cache.clear()
+    started = time.perf_counter()
+    scan = vce.scan_workspace([folder], read_concurrency=concurrency)
+    return time.perf_counter() - started, scan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs asyncio file reading during a scan.")
+    parser.add_argument("--folder", help="scan this folder instead of a generated corpus")
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated seconds per file read")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write the results to PATH")
+    args = parser.parse_args()
+
+    if args.latency > 0:
+        vce.read_file = slow_reader(vce.read_file, args.latency, args.jitter, args.seed)
+
+    corpus_dir = None
+    folder = args.folder
+    if folder is None:
+        corpus_dir = tempfile.mkdtemp(prefix="vpcf_read_bench_")
+        generate_corpus(corpus_dir, files=args.files, seed=args.seed)
+        folder = corpus_dir
+
+    rows = []
+    try:
+        serial_time, reference = timed_scan(folder, 0)
+        files = len(reference['vpcf_paths'])
+        rows.append({'mode': 'serial', 'concurrency': 1, 'files': files, 'wall_s': round(serial_time, 3),
+                     'files_per_s': round(files / serial_time, 1), 'speedup': 1.0})
+        for concurrency in args.concurrency:
+            wall, scan = timed_scan(folder, concurrency)
+            if scan != reference:
+                print(f"WARNING: asyncio scan with concurrency {concurrency} differs from the serial scan")
+            rows.append({'mode': 'asyncio', 'concurrency': concurrency, 'files': files, 'wall_s': round(wall, 3),
+                         'files_per_s': round(files / wall, 1), 'speedup': round(serial_time / wall, 2)})
+    finally:
+        if corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    print(f"{'mode':<9}{'in flight':>10}{'files':>8}{'wall s':>9}{'files/s':>10}{'speedup':>9}")
+    for row in rows:
+        print(f"{row['mode']:<9}{row['concurrency']:>10}{row['files']:>8}{row['wall_s']:>9.2f}"
+              f"{row['files_per_s']:>10.1f}{row['speedup']:>8.1f}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Synthetic VPCF corpus generator used by the benchmarks.
+
+Produces files that look like real particle definitions: a kv3 header,
+renderers/operators with scalar color fields, gradient blocks with multi-line
+stops, child references and filler operators to reach a target size. A share
+of the files contains no color fields at all, like most of a real addon.
+
+Usage:
+    python benchmarks/generate_corpus.py OUT_DIR --files 1000
+"""
+import argparse
+import os
+import random
+
+HEADER = (
+    '<!-- kv3 encoding:text:version{e21c7f3c-8a33-41c5-9977-a76d3a32aa0d} '
+    'format:vpcf26:version{26288658-411e-4f14-b698-2e1e5d00dec6} -->\n'
+)
+
+SCALAR_FIELDS = [
+    'm_ConstantColor', 'm_ColorFade', 'm_ColorMin', 'm_ColorMax', 'm_Color1',
+    'm_Color2', 'm_ColorTint', 'm_TintColor', 'm_LiteralColor', 'm_vColorBlend',
+]
+
+OPERATOR_CLASSES = [
+    'C_OP_ColorInterpolate', 'C_OP_FadeAndKill', 'C_OP_BasicMovement',
+    'C_OP_InterpolateRadius', 'C_INIT_RandomColor', 'C_OP_RemapScalarToVector',
+]
+
+FILLER_OPERATOR = (
+    '\t\t{{\n'
+    '\t\t\t_class = "C_OP_InterpolateRadius"\n'
+    '\t\t\tm_flStartScale = {start:.6f}\n'
+    '\t\t\tm_flEndScale = {end:.6f}\n'
+    '\t\t\tm_flBias = {bias:.6f}\n'
+    '\t\t}},\n'
+)
+
+
+def random_color(rng, alpha=True):
+    color = [rng.randint(0, 255) for _ in range(3)]
+    if alpha:
+        color.append(255)
+    return color
+
+
+def scalar_operator(rng, field):
+    color = ', '.join(str(c) for c in random_color(rng, alpha=rng.random() < 0.8))
+    return (
+        '\t\t{\n'
+        f'\t\t\t_class = "{rng.choice(OPERATOR_CLASSES)}"\n'
+        f'\t\t\t{field} = [ {color} ]\n'
+        '\t\t},\n'
+    )
+
+
+def gradient_operator(rng, num_stops):
+    stops = []
+    for i in range(num_stops):
+        position = i / (num_stops - 1) if num_stops > 1 else 0.0
+        channels = ''.join(f'\t\t\t\t\t\t{c},\n' for c in random_color(rng))
+        stops.append(
+            '\t\t\t\t\t{\n'
+            f'\t\t\t\t\t\tm_flPosition = {position:.6f}\n'
+            '\t\t\t\t\t\tm_Color = \n'
+            '\t\t\t\t\t\t[\n'
+            f'{channels}'
+            '\t\t\t\t\t\t]\n'
+            '\t\t\t\t\t},\n'
+        )
+    return (
+        '\t\t{\n'
+        '\t\t\t_class = "C_OP_RemapScalarToVector"\n'
+        '\t\t\tm_Gradient = \n'
+        '\t\t\t{\n'
+        '\t\t\t\tm_Stops = \n'
+        '\t\t\t\t[\n'
+        f'{"".join(stops)}'
+        '\t\t\t\t]\n'
+        '\t\t\t}\n'
+        '\t\t},\n'
+    )
+
+
+def generate_vpcf(rng, scalar_fields=10, gradient_blocks=2, stops=4, target_size=8192, children=()):
+    """
+    Build the text of one VPCF file.
+
+    Args:
+        rng (random.Random): Source of randomness
+        scalar_fields (int): Number of scalar color fields
+        gradient_blocks (int): Number of gradient blocks
+        stops (int): Stops per gradient block
+        target_size (int): Approximate file size in characters; filler operators are added to reach it
+        children (iterable): Resource paths written as m_Children references
+
+    Returns:
+        str: The file content
+    """
+    operators = [scalar_operator(rng, rng.choice(SCALAR_FIELDS)) for _ in range(scalar_fields)]
+    operators += [gradient_operator(rng, stops) for _ in range(gradient_blocks)]
+    rng.shuffle(operators)
+
+    child_refs = ''.join(
+        '\t\t{\n'
+        f'\t\t\tm_ChildRef = resource:"{child}"\n'
+        '\t\t},\n'
+        for child in children
+    )
+    head = (
+        HEADER
+        + '{\n'
+        + '\t_class = "CParticleSystemDefinition"\n'
+        + f'\tm_nMaxParticles = {rng.randint(8, 512)}\n'
+        + f'\tm_Children = \n\t[\n{child_refs}\t]\n'
+        + '\tm_Operators = \n\t[\n'
+    )
+    tail = '\t]\n}\n'
+
+    body = ''.join(operators)
+    filler = []
+    size = len(head) + len(body) + len(tail)
+    while size < target_size:
+        op = FILLER_OPERATOR.format(start=rng.random(), end=rng.random(), bias=rng.random())
+        filler.append(op)
+        size += len(op)
+
+    return head + body + ''.join(filler) + tail
+
+
+def generate_corpus(out_dir, files=1000, scalar_fields=10, gradient_blocks=2, stops=4,
+                    target_size=8192, empty_ratio=0.4, child_ratio=0.2, seed=0):
+    """
+    Write `files` synthetic VPCF files under `out_dir/particles/`.
+
+    Field counts are varied around the given means so files differ in shape.
+    Returns the list of written paths.
+    """
+    rng = random.Random(seed)
+    paths = []
+    resource_paths = []
+    for i in range(files):
+        folder = f'particles/hero_{i % 25:02d}/set_{(i // 25) % 10}'
+        resource_paths.append(f'{folder}/effect_{i:05d}.vpcf')
+
+    for i, resource in enumerate(resource_paths):
+        if rng.random() < empty_ratio:
+            n_scalar, n_grad = 0, 0
+        else:
+            n_scalar = max(0, int(rng.gauss(scalar_fields, scalar_fields / 3)))
+            n_grad = max(0, int(rng.gauss(gradient_blocks, gradient_blocks / 2)))
+        children = []
+        if i > 0 and rng.random() < child_ratio:
+            children = rng.sample(resource_paths[:i], min(i, rng.randint(1, 3)))
+
+        content = generate_vpcf(
+            rng, scalar_fields=n_scalar, gradient_blocks=n_grad, stops=max(2, stops),
+            target_size=int(target_size * rng.uniform(0.5, 1.5)), children=children
+        )
+        path = os.path.join(out_dir, *resource.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(content)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic VPCF corpus.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--scalar-fields", type=int, default=10, help="mean scalar color fields per file")
+    parser.add_argument("--gradient-blocks", type=int, default=2, help="mean gradient blocks per file")
+    parser.add_argument("--stops", type=int, default=4, help="stops per gradient block")
+    parser.add_argument("--size", type=int, default=8192, help="mean file size in characters")
+    parser.add_argument("--empty-ratio", type=float, default=0.4, help="share of files without color fields")
+    parser.add_argument("--child-ratio", type=float, default=0.2, help="share of files referencing children")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_corpus(
+        args.out_dir, files=args.files, scalar_fields=args.scalar_fields,
+        gradient_blocks=args.gradient_blocks, stops=args.stops, target_size=args.size,
+        empty_ratio=args.empty_ratio, child_ratio=args.child_ratio, seed=args.seed
+    )
+    print(f"Wrote {len(paths)} files to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Benchmark runner for the scan, per-file save and batch apply paths.
+
+Generates a synthetic corpus for each size, then measures:
+    scan   - find_vpcf_files() + scan_vpcf_files()
+    save   - update_field_colors() + backup + write for every file with fields
+    apply  - apply_colors_to_content() + write over the whole folder ("Apply to All")
+
+Each benchmark reports files/s from a plain timing pass and peak traced memory
+from a second pass under tracemalloc, then compares against baseline.json.
+
+Usage:
+    python benchmarks/run_benchmarks.py                    # 100 / 1k / 10k files
+    python benchmarks/run_benchmarks.py --sizes 100 1000
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import vpcf_color_editor as vce  # noqa: E402
+from generate_corpus import generate_corpus  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000, 10000)
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_TOLERANCE = 0.25  # allowed files/s drop before a result counts as a regression
+
+
+def run_scan(corpus_dir, state, pass_index):
+    vce.file_cache.clear()
+    files = vce.find_vpcf_files(corpus_dir)
+    state['scan'] = vce.scan_vpcf_files(files, corpus_dir)
+    return len(files)
+
+
+def run_save(corpus_dir, state, pass_index):
+    scan = state['scan']
+    fields_by_file = {}
+    for field in scan['all_color_fields']:
+        fields_by_file.setdefault(field['filename'], []).append(field)
+
+    shade = 40 + pass_index
+    for file_name, fields in fields_by_file.items():
+        content = scan['files_content'][file_name]
+        edits = [(field, [shade, 128, 255 - shade, 255]) for field in fields]
+        new_content = vce.update_field_colors(content, edits)
+        path = scan['file_name_to_path'][file_name]
+        vce.backup_file(path)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+    return len(fields_by_file)
+
+
+def run_apply(corpus_dir, state, pass_index):
+    scan = state['scan']
+    shade = 10 + pass_index
+    fields_to_apply = {
+        'm_ConstantColor': [shade, 20, 30],
+        'm_ColorFade': [200, shade, 50],
+        'm_TintColor': [90, 90, shade],
+    }
+    gradient = [[shade, 0, 0], [0, shade, 0], [0, 0, shade], [255, 255, 255]]
+    for file_name, content in scan['files_content'].items():
+        new_content = vce.apply_colors_to_content(content, fields_to_apply, gradient)
+        if new_content != content:
+            path = scan['file_name_to_path'][file_name]
+            vce.backup_file(path)
+            with open(path, 'w') as f:
+                f.write(new_content)
+    return len(scan['files_content'])
+
+
+BENCHMARKS = (("scan", run_scan), ("save", run_save), ("apply", run_apply))
+
+
+def measure(corpus_dir, size):
+    """Run every benchmark on one corpus and return {name: result}."""
+    results = {}
+    state = {}
+    for name, fn in BENCHMARKS:
+        gc.collect()
+        started = time.perf_counter()
+        count = fn(corpus_dir, state, 0)
+        elapsed = time.perf_counter() - started
+
+        gc.collect()
+        tracemalloc.start()
+        fn(corpus_dir, state, 1)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[f"{name}@{size}"] = {
+            'files': count,
+            'seconds': round(elapsed, 4),
+            'files_per_s': round(count / elapsed, 1) if elapsed > 0 else 0.0,
+            'peak_mb': round(peak / (1024 * 1024), 2),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print a comparison table and return the names of regressed benchmarks."""
+    regressions = []
+    print(f"{'benchmark':<14}{'files':>8}{'files/s':>12}{'baseline':>12}{'change':>9}{'peak MB':>10}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        base_rate, change_str, flag = '-', '-', ''
+        if base and base.get('files_per_s'):
+            change = result['files_per_s'] / base['files_per_s'] - 1.0
+            base_rate, change_str = f"{base['files_per_s']:.1f}", f"{change:+.0%}"
+            if change < -tolerance:
+                regressions.append(name)
+                flag = '  REGRESSION'
+        print(f"{name:<14}{result['files']:>8}{result['files_per_s']:>12.1f}{base_rate:>12}{change_str:>9}"
+              f"{result['peak_mb']:>10.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run VPCF editor benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--json", metavar="PATH", help="also write the results to PATH")
+    parser.add_argument("--keep", action="store_true", help="keep the generated corpora")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {}
+    for size in args.sizes:
+        corpus_dir = tempfile.mkdtemp(prefix=f"vpcf_bench_{size}_")
+        try:
+            generate_corpus(corpus_dir, files=size, seed=args.seed)
+            results.update(measure(corpus_dir, size))
+        finally:
+            if args.keep:
+                print(f"Corpus kept at {corpus_dir}")
+            else:
+                shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=4, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
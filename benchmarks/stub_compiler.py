@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the resource compiler, used to benchmark the compile pipeline
+on machines without the real (Windows-only) compiler.
+
+Accepts one or more VPCF paths (or "-filelist LIST" naming a file with one
+path per line), sleeps to simulate work, prints output and
+exits non-zero if any file "fails". Behaviour is controlled by environment
+variables so it can be used as a drop-in compiler path:
+
+    STUB_COMPILER_LATENCY       base seconds per file             (default 0.05)
+    STUB_COMPILER_LATENCY_PER_KB extra seconds per KB of input    (default 0.0)
+    STUB_COMPILER_JITTER        +/- fraction of random jitter     (default 0.2)
+    STUB_COMPILER_STARTUP       seconds of process start-up cost  (default 0.0)
+    STUB_COMPILER_FAIL_RATE     probability a file fails           (default 0.0)
+    STUB_COMPILER_OUTPUT_LINES  lines of output per file           (default 5)
+    STUB_COMPILER_SEED          seed for failures and jitter       (default 0)
+
+Failures are decided by hashing the path with the seed, so the same file
+fails consistently across runs.
+"""
+import hashlib
+import os
+import random
+import sys
+import time
+
+
+def env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def parse_paths(args):
+    paths = []
+    it = iter(args)
+    for arg in it:
+        if arg == "-filelist":
+            with open(next(it), "r", encoding="utf-8") as f:
+                paths.extend(line.strip() for line in f if line.strip())
+        else:
+            paths.append(arg)
+    return paths
+
+
+def main(argv):
+    paths = parse_paths(argv[1:])
+    if not paths:
+        print("usage: stub_compiler.py FILE [FILE ...] | -filelist LIST", file=sys.stderr)
+        return 2
+
+    latency = env_float("STUB_COMPILER_LATENCY", 0.05)
+    latency_per_kb = env_float("STUB_COMPILER_LATENCY_PER_KB", 0.0)
+    jitter = env_float("STUB_COMPILER_JITTER", 0.2)
+    startup = env_float("STUB_COMPILER_STARTUP", 0.0)
+    fail_rate = env_float("STUB_COMPILER_FAIL_RATE", 0.0)
+    output_lines = int(env_float("STUB_COMPILER_OUTPUT_LINES", 5))
+    seed = os.environ.get("STUB_COMPILER_SEED", "0")
+
+    time.sleep(startup)
+    failed = 0
+    for path in paths:
+        digest = hashlib.sha1(f"{seed}:{path}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+
+        size_kb = os.path.getsize(path) / 1024.0 if os.path.exists(path) else 0.0
+        duration = (latency + latency_per_kb * size_kb) * (1.0 + rng.uniform(-jitter, jitter))
+        time.sleep(max(0.0, duration))
+
+        print(f"Compiling {path}")
+        for i in range(output_lines):
+            print(f"  [{i + 1}/{output_lines}] processing {os.path.basename(path)}")
+
+        if not os.path.exists(path):
+            print(f"ERROR: {path}: file not found", file=sys.stderr)
+            failed += 1
+        elif rng.random() < fail_rate:
+            print(f"ERROR: {path}: simulated compile failure", file=sys.stderr)
+            failed += 1
+        else:
+            print(f"OK: {path}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
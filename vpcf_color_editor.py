@@ -2,8 +2,21 @@ import json
 import os
 import sys
 import re
-import subprocess
 import logging
+import logging.handlers
+import queue
+import atexit
+import time
+import random
+import heapq
+import bisect
+import argparse
+import contextlib
+import tempfile
+import fnmatch
+import hashlib
+import csv
+import asyncio
 import tkinter as tk
 from tkinter import (
     Tk, Label, Button, colorchooser, filedialog, messagebox, END, SINGLE,
@@ -12,11 +25,8 @@ from tkinter import (
 from tkinter import ttk
 from tkinter.ttk import Style, Progressbar
 from tkinter import simpledialog
-# **New Imports for Update Checking**
-import urllib.request
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import webbrowser
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 
 # Version and Credit Information
@@ -24,6 +34,10 @@ VERSION = "v1.21"  # Updated version
 CREDIT = "Developed by MrSir"
 
 CONFIG_FILE = "config.json"
+CONFIG_DIR_NAME = "VPCF Color Editor"
+CONFIG_SAVE_DELAY = 0.5  # seconds to wait for further changes before writing config.json
+COMPILE_DURATIONS_FILE = "compile_durations.json"
+COMPILE_HISTORY_DIR = "compile_history"
 compiler_path = [None]  # Placeholder for the compiler path
 folder_path = [None]  # Placeholder for the folder path
 
@@ -33,6 +47,34 @@ MIN_WINDOW_SIZE = (1000, 600)
 FILE_WATCHER_INTERVAL = 2000  # milliseconds
 PROGRESS_BAR_LENGTH = 300
 
+# Workspace constants
+DEFAULT_SCAN_WORKERS = 4  # workspace roots discovered and parsed at the same time
+DEFAULT_READ_CONCURRENCY = 16  # files read at once by the asyncio scanner, "read_concurrency"
+SCAN_POLL_INTERVAL = 100  # milliseconds between UI updates during a background scan
+DISCOVERY_MTIME_SLACK = 2.0  # seconds; directory listings this fresh are re-read on the next scan
+
+# Update check constants (each can be overridden in config.json)
+UPDATE_CHECK_URL = "https://api.github.com/repos/the-mrsir/VPCF-color-editor/releases/latest"  # "update_check_url"
+UPDATE_CHECK_TIMEOUT = 5  # seconds, "update_check_timeout"
+UPDATE_CHECK_TTL = 24 * 60 * 60  # seconds between automatic checks, "update_check_ttl"
+
+# Compiler constants
+COMPILE_TIMEOUT = 30  # seconds per compiler process
+DEFAULT_COMPILE_WORKERS = 4
+COMPILE_DURATION_SMOOTHING = 0.5  # weight of the newest measurement in the moving average
+DEFAULT_COMPILE_QUEUE_WORKERS = 2  # concurrent compile-on-save processes
+COMPILE_HISTORY_LIMIT = 50  # compile runs kept in the compile_history folder
+COMPILE_BATCH_MODES = ("single", "args", "filelist")
+DEFAULT_COMPILE_BATCH = {
+    "mode": "single",     # "single": one process per file, "args": many paths per process,
+                          # "filelist": paths written to a list file passed to the compiler
+    "size": 32,           # files per compiler invocation
+    "filelist_arg": "",   # flag placed before the list file path, e.g. "-filelist"
+}
+# How a file's share of a failed batch's output is judged (see batch_section_succeeded)
+BATCH_ERROR_PATTERN = re.compile(r'\b(error|errors|fail|failed|failure|fatal)\b', re.IGNORECASE)
+BATCH_SUCCESS_PATTERN = re.compile(r'\b(ok|success|succeeded|compiled|done)\b', re.IGNORECASE)
+
 # Color field constants
 SUPPORTED_COLOR_FIELDS = [
     # Main color fields
@@ -96,35 +138,284 @@ scalar_color_pattern = re.compile(
     re.IGNORECASE | re.MULTILINE | re.DOTALL
 )
 
+# Child particle references, e.g. m_ChildRef = resource:"particles/foo/bar.vpcf"
+child_reference_pattern = re.compile(
+    r'\bm_ChildRef\s*=\s*(?:resource(?:_name)?:)?"([^"]+?\.vpcf)"',
+    re.IGNORECASE
+)
+
+COLOR_INDEX_CELL = 16  # grid cell size (per channel) for tolerance lookups in ColorIndex
+CLUSTER_DISPLAY_LIMIT = 500  # clusters listed in the near-duplicate window
+SWATCH_SIZE = (28, 16)  # pixels, color swatch images
+GRADIENT_STRIP_SIZE = (160, 16)  # pixels, interpolated gradient strips
+SWATCH_CACHE_LIMIT = 2048  # swatch and strip images kept for reuse
+SEARCH_RESULT_LIMIT = 1000  # hits listed by Search in Files
+SEARCH_TYPING_DELAY = 200  # milliseconds after the last keystroke before searching
+MANIFEST_VERSION = 1
+MANIFEST_COLUMNS = ("file", "sha256", "field", "occurrence", "start", "end", "value")
+
 # File cache for performance optimization
 file_cache = {}  # {filepath: {'content': str, 'mtime': float, 'color_fields': list}}
 
+def user_config_dir():
+    """
+    Per-user directory for config.json and compile_durations.json:
+    %APPDATA% on Windows, ~/Library/Application Support on macOS and
+    $XDG_CONFIG_HOME (~/.config) elsewhere. VPCF_EDITOR_CONFIG_DIR overrides it.
+    """
+    override = os.environ.get("VPCF_EDITOR_CONFIG_DIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, CONFIG_DIR_NAME)
+
+class ConfigStore:
+    """
+    config.json kept in memory. The file is read once; save() only marks the
+    config dirty and schedules a write CONFIG_SAVE_DELAY seconds later, so a
+    burst of changes costs one write. Writes go to a temporary file in the
+    same directory that then replaces config.json, so a crash or a second
+    instance never leaves a half-written file behind.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.data = None
+        self.lock = threading.Lock()
+        self.timer = None
+
+    def load(self):
+        """Return the live config dict, reading the file on first use."""
+        migrated = None
+        with self.lock:
+            if self.data is None:
+                self.data = {}
+                for candidate in (self.path, self.legacy_path):
+                    if candidate and os.path.exists(candidate):
+                        try:
+                            with open(candidate, "r", encoding="utf-8") as f:
+                                self.data = json.load(f)
+                            if candidate != self.path:
+                                logging.info(f"Moving settings from {candidate} to {self.path}")
+                                migrated = dict(self.data)
+                            break
+                        except (OSError, ValueError) as e:
+                            logging.warning(f"Could not read config {candidate}: {e}")
+            data = self.data
+        if migrated is not None:
+            self._write(migrated)
+        return data
+
+    def save(self, config=None):
+        """Mark the config as changed (replacing it with `config` if given) and schedule a write."""
+        with self.lock:
+            if config is not None and config is not self.data:
+                self.data = dict(config)
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(CONFIG_SAVE_DELAY, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        """Write pending changes now. Called by the debounce timer and on exit."""
+        with self.lock:
+            if self.timer is None:
+                return
+            self.timer.cancel()
+            self.timer = None
+            data = dict(self.data or {})
+        self._write(data)
+
+    def _write(self, data):
+        directory = os.path.dirname(self.path) or "."
+        temp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+            os.replace(temp_path, self.path)
+            temp_path = None
+        except OSError as e:
+            logging.error(f"Could not save config to {self.path}: {e}")
+        finally:
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+config_store = ConfigStore(os.path.join(user_config_dir(), CONFIG_FILE), legacy_path=CONFIG_FILE)
+atexit.register(config_store.flush)
+
 # Load and save configuration
 def load_config():
-    """Load the configuration from a file."""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            return json.load(f)
-    return {}
+    """Return the shared in-memory configuration (read from disk on first use)."""
+    return config_store.load()
 
 def save_config(config):
-    """Save the configuration to a file."""
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=4)
+    """Schedule a debounced, atomic write of the configuration."""
+    config_store.save(config)
+
+# Logging constants
+LOG_FILE = "vpcf_color_editor.log"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_MAX_BYTES = 1024 * 1024  # rotate once the log reaches 1 MB
+LOG_BACKUP_COUNT = 3
+DEFAULT_LOG_LEVEL = "INFO"
+log_listener = [None]  # Placeholder for the background QueueListener
 
 # Configure logging
-logging.basicConfig(
-    filename='vpcf_color_editor.log',
-    filemode='w',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+def setup_logging(level_name=DEFAULT_LOG_LEVEL):
+    """
+    Route all log records through a queue so that file I/O happens on the
+    QueueListener thread instead of the UI thread. The log file is rotated
+    by size rather than truncated on every start.
+
+    Args:
+        level_name (str): Logging level name from config.json (e.g. "DEBUG")
+    """
+    level = logging.getLevelName(str(level_name).upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+
+    if log_listener[0] is not None:
+        logging.getLogger().setLevel(level)
+        return
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    log_listener[0] = listener
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush pending records and stop the logging listener thread."""
+    # Write any pending config first so a failed write still reaches the log
+    config_store.flush()
+    listener = log_listener[0]
+    if listener is not None:
+        log_listener[0] = None
+        listener.stop()
+
+# Performance instrumentation
+PERF_SAMPLE_LIMIT = 2048  # samples kept per stage for percentile estimates
+
+class PerfStats:
+    """
+    Lightweight stage timer. Aggregates count, total, max and a bounded
+    reservoir of samples per stage so percentiles can be reported without
+    unbounded memory. When disabled, stage() returns a shared no-op context
+    manager so instrumented code pays only an attribute check.
+    """
+
+    _null_timer = contextlib.nullcontext()
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages = {}  # {stage: {'count': int, 'total': float, 'max': float, 'samples': list}}
+
+    def stage(self, name):
+        """Return a context manager that times the enclosed block under `name`."""
+        if not self.enabled:
+            return self._null_timer
+        return self._timer(name)
+
+    @contextlib.contextmanager
+    def _timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        """Add one measurement (in seconds) to a stage."""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._stages.get(name)
+            if entry is None:
+                entry = self._stages[name] = {'count': 0, 'total': 0.0, 'max': 0.0, 'samples': []}
+            entry['count'] += 1
+            entry['total'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            samples = entry['samples']
+            if len(samples) < PERF_SAMPLE_LIMIT:
+                samples.append(seconds)
+            else:
+                # Reservoir sampling keeps a uniform sample of every measurement
+                slot = random.randrange(entry['count'])
+                if slot < PERF_SAMPLE_LIMIT:
+                    samples[slot] = seconds
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self):
+        """
+        Returns:
+            list: One dict per stage with count, total, mean, p50, p90, p99 and max (seconds)
+        """
+        with self._lock:
+            items = [(name, dict(entry, samples=sorted(entry['samples']))) for name, entry in self._stages.items()]
+
+        def percentile(samples, pct):
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))]
+
+        rows = []
+        for name, entry in sorted(items):
+            samples = entry['samples']
+            rows.append({
+                'stage': name,
+                'count': entry['count'],
+                'total': entry['total'],
+                'mean': entry['total'] / entry['count'] if entry['count'] else 0.0,
+                'p50': percentile(samples, 50),
+                'p90': percentile(samples, 90),
+                'p99': percentile(samples, 99),
+                'max': entry['max'],
+            })
+        return rows
+
+    def dump_json(self, path):
+        """Write the current snapshot to `path` as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION, 'enabled': self.enabled, 'stages': self.snapshot()}, f, indent=4)
+        logging.info(f"Performance stats written to {path}")
+
+perf_stats = PerfStats()
 
 # **New Function for Checking Updates**
-def fetch_latest_release():
+def fetch_latest_release(api_url=UPDATE_CHECK_URL, timeout=UPDATE_CHECK_TIMEOUT):
+    import urllib.request
     try:
-        api_url = "https://api.github.com/repos/the-mrsir/VPCF-color-editor/releases/latest"
-        with urllib.request.urlopen(api_url) as response:
+        with urllib.request.urlopen(api_url, timeout=timeout) as response:
             data = response.read()
             encoding = response.info().get_content_charset('utf-8')
             latest_release = json.loads(data.decode(encoding))
@@ -147,11 +438,51 @@ def prompt_update(latest_release, latest_version):
         parent=root
     )
     if result:
+        import webbrowser
         webbrowser.open(latest_release['html_url'])
 
+def cached_release(config, now=None):
+    """
+    Return the release stored by the last update check if it is younger than
+    the configured TTL, otherwise None.
+    """
+    cache = config.get("update_check_cache")
+    if not cache or "tag_name" not in cache:
+        return None
+    age = (now if now is not None else time.time()) - cache.get("checked_at", 0)
+    if 0 <= age < config.get("update_check_ttl", UPDATE_CHECK_TTL):
+        return cache
+    return None
+
+def store_release_cache(latest_release):
+    """Remember the latest release in config.json for the next launches."""
+    config = load_config()
+    config["update_check_cache"] = {
+        "checked_at": time.time(),
+        "tag_name": latest_release['tag_name'],
+        "html_url": latest_release.get('html_url', ""),
+    }
+    save_config(config)
+
 def check_for_updates(user_initiated=False):
     try:
-        latest_release = fetch_latest_release()
+        config = load_config()
+        latest_release = None
+        if not user_initiated:
+            if not config.get("update_check_enabled", True):
+                logging.info("Update check disabled in config")
+                return
+            latest_release = cached_release(config)
+            if latest_release:
+                logging.debug(f"Using cached update check result: {latest_release['tag_name']}")
+
+        if latest_release is None:
+            latest_release = fetch_latest_release(
+                config.get("update_check_url", UPDATE_CHECK_URL),
+                config.get("update_check_timeout", UPDATE_CHECK_TIMEOUT)
+            )
+            if latest_release:
+                root.after(0, lambda: store_release_cache(latest_release))
         if not latest_release:
             if user_initiated:
                 root.after(0, lambda: messagebox.showerror(
@@ -176,24 +507,91 @@ def check_for_updates(user_initiated=False):
     except Exception as e:
         logging.error(f"An error occurred while checking for updates: {e}")
         if user_initiated:
+            error = str(e)
             root.after(0, lambda: messagebox.showerror(
                 "Update Check Failed",
-                f"An error occurred while checking for updates:\n{e}",
+                f"An error occurred while checking for updates:\n{error}",
                 parent=root
             ))
 
 def check_for_updates_async(user_initiated=False):
-    threading.Thread(target=lambda: check_for_updates(user_initiated)).start()
+    # Daemon thread: a slow or unreachable endpoint never keeps the app from closing
+    threading.Thread(target=lambda: check_for_updates(user_initiated), daemon=True).start()
+
+class VpcfDiscovery:
+    """
+    Finds .vpcf files with one os.scandir traversal and caches every directory
+    listing together with the directory's mtime. On later scans a directory
+    whose mtime is unchanged is only stat'ed, not listed again: creating,
+    deleting or renaming an entry always changes the mtime of the directory
+    that holds it. Listings taken within DISCOVERY_MTIME_SLACK seconds of the
+    mtime are not trusted, for file systems with coarse timestamps.
+    """
+
+    def __init__(self):
+        self.listings = {}  # {directory: (st_mtime_ns or None, [vpcf names], [subdirectory names])}
+        self.exclude = []   # glob patterns matched against names and root-relative paths
+
+    def is_excluded(self, rel_path, name):
+        return any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(name, p) for p in self.exclude)
+
+    def list_directory(self, directory):
+        """Return ([vpcf file names], [subdirectory names]) for one directory, cached by mtime."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            self.listings.pop(directory, None)
+            return [], []
+        cached = self.listings.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        files, subdirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.name.lower().endswith('.vpcf'):
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logging.warning(f"Could not list {directory}: {e}")
+        files.sort()
+        subdirs.sort()
+        if time.time() - mtime / 1e9 < DISCOVERY_MTIME_SLACK:
+            mtime = None
+        self.listings[directory] = (mtime, files, subdirs)
+        return files, subdirs
+
+    def find(self, folder):
+        """All .vpcf paths under `folder`, skipping excluded files and directories."""
+        vpcf_files = []
+        pending = [(folder, "")]
+        while pending:
+            directory, rel_dir = pending.pop()
+            files, subdirs = self.list_directory(directory)
+            for name in files:
+                if not self.exclude or not self.is_excluded(rel_dir + name, name):
+                    vpcf_files.append(os.path.join(directory, name))
+            for name in reversed(subdirs):
+                if self.exclude and self.is_excluded(rel_dir + name, name):
+                    continue
+                pending.append((os.path.join(directory, name), rel_dir + name + "/"))
+        return vpcf_files
+
+    def clear(self):
+        self.listings.clear()
+
+vpcf_discovery = VpcfDiscovery()
 
 # Find .vpcf files
 def find_vpcf_files(folder_path):
     logging.info(f"Searching for VPCF files in {folder_path}")
-    vpcf_files = []
-    for root_dir, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.lower().endswith('.vpcf'):
-                file_path = os.path.join(root_dir, file)
-                vpcf_files.append(file_path)
+    with perf_stats.stage("scan.walk"):
+        vpcf_files = vpcf_discovery.find(folder_path)
     logging.info(f"Total VPCF files found: {len(vpcf_files)}")
     return vpcf_files
 
@@ -224,8 +622,9 @@ def read_file(filename):
                 return cached_data['content']
 
         # Read file and update cache
-        with open(filename, 'r', encoding='utf-8', errors='replace') as f:
-            content = f.read()
+        with perf_stats.stage("scan.read"):
+            with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
 
         file_cache[filename] = {
             'content': content,
@@ -243,6 +642,101 @@ def read_file(filename):
         logging.error(f"Error reading file {filename}: {e}")
         return ""
 
+def field_display_name(raw_name):
+    """Readable name for a scalar color field, e.g. m_ColorFade -> "Color Fade"."""
+    return FIELD_NAME_MAPPING.get(raw_name, raw_name.replace('m_', '').replace('_', ' ').title())
+
+class ColorField:
+    """
+    One scalar color field or gradient stop found by find_color_fields().
+
+    Records hold spans into the file content instead of copies of the matched
+    text, and the filename is interned, so each record costs a few slots no
+    matter how long the match is. Text such as 'value' and 'full_match' is
+    sliced from the content when asked for. Dict-style access
+    (field['value'], field.get('raw_name')) works as it did for the old
+    per-field dicts; gradient stops have no 'raw_name'.
+    """
+
+    __slots__ = ('type', 'content', 'filename', 'start', 'end', 'value_start', 'value_end',
+                 'stop_start', 'stop_end', 'raw_name', 'gradient_block_index', 'stop_index')
+
+    COLOR_KEYS = ('type', 'start', 'end', 'value_start', 'value_end', 'value', 'full_match',
+                  'prefix', 'field_name', 'raw_name', 'filename')
+    GRADIENT_KEYS = ('type', 'start', 'end', 'value_start', 'value_end', 'value', 'stop_position',
+                     'full_match', 'prefix', 'field_name', 'filename', 'is_non_empty',
+                     'gradient_block_index', 'stop_index')
+
+    def __init__(self, type_, content, filename, start, end, value_start, value_end, raw_name=None,
+                 stop_start=None, stop_end=None, gradient_block_index=None, stop_index=None):
+        self.type = type_
+        self.content = content
+        self.filename = sys.intern(filename)
+        self.start = start
+        self.end = end
+        self.value_start = value_start
+        self.value_end = value_end
+        self.raw_name = raw_name
+        self.stop_start = stop_start
+        self.stop_end = stop_end
+        self.gradient_block_index = gradient_block_index
+        self.stop_index = stop_index
+
+    @property
+    def value(self):
+        return self.content[self.value_start:self.value_end]
+
+    @property
+    def full_match(self):
+        if self.type == 'gradient':
+            return self.content[self.stop_start:self.stop_end]
+        return self.content[self.start:self.end]
+
+    @property
+    def stop_position(self):
+        return self.full_match
+
+    @property
+    def prefix(self):
+        return '' if self.type == 'gradient' else self.content[self.start:self.value_start]
+
+    @property
+    def field_name(self):
+        if self.type == 'gradient':
+            return f'Gradient Block {self.gradient_block_index} Stop {self.stop_index + 1}'
+        return field_display_name(self.raw_name)
+
+    @property
+    def is_non_empty(self):
+        return any(float(c) > 0 for c in re.findall(r'[\d\.]+', self.value))
+
+    def keys(self):
+        return self.GRADIENT_KEYS if self.type == 'gradient' else self.COLOR_KEYS
+
+    def __getitem__(self, key):
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.keys() else default
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def __eq__(self, other):
+        if not isinstance(other, ColorField):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ColorField({self.filename!r}, {self.field_name!r}, {self.value_start}-{self.value_end})"
+
 def find_color_fields(content, filename):
     """
     Find all color fields (scalar colors and gradients) in a VPCF file.
@@ -252,7 +746,7 @@ def find_color_fields(content, filename):
         filename (str): The filename for logging and error reporting
 
     Returns:
-        list: A list of color field dictionaries
+        list: A list of ColorField records, in file order per kind
     """
     color_fields = []
 
@@ -266,37 +760,22 @@ def find_color_fields(content, filename):
     # Counters for gradient blocks and their stops
     gradient_block_counter = 0
 
-    # Use the global field name mapping
-
     # Find all gradients
     try:
         for gradient_match in gradient_pattern.finditer(content):
             gradient_block_counter += 1
-            prefix = gradient_match.group(1)
-            gradient_block = gradient_match.group(2)  # Gradient stops
-            suffix = gradient_match.group(3)
             stop_index = 0
 
-            for stop_match in stop_pattern.finditer(gradient_block):
+            # Stops are matched in place, so their spans are already file offsets
+            for stop_match in stop_pattern.finditer(content, gradient_match.start(2), gradient_match.end(2)):
                 try:
-                    stop_position = stop_match.group(1)  # m_flPosition value
-                    gradient_color = stop_match.group(2)  # m_Color value
-                    is_non_empty = any(float(c) > 0 for c in re.findall(r'[\d\.]+', gradient_color))
-
-                    color_fields.append({
-                        'type': 'gradient',
-                        'start': gradient_match.start(),
-                        'end': gradient_match.end(),
-                        'value': gradient_color,
-                        'stop_position': stop_position,
-                        'full_match': stop_match.group(0),
-                        'prefix': '',  # Gradients don't need a prefix
-                        'field_name': f'Gradient Block {gradient_block_counter} Stop {stop_index + 1}',
-                        'filename': filename,
-                        'is_non_empty': is_non_empty,
-                        'gradient_block_index': gradient_block_counter,
-                        'stop_index': stop_index
-                    })
+                    color_fields.append(ColorField(
+                        'gradient', content, filename,
+                        gradient_match.start(), gradient_match.end(),
+                        stop_match.start(2), stop_match.end(2),
+                        stop_start=stop_match.start(), stop_end=stop_match.end(),
+                        gradient_block_index=gradient_block_counter, stop_index=stop_index
+                    ))
                     stop_index += 1
                 except Exception as e:
                     logging.warning(f"Error processing gradient stop in {filename}: {e}")
@@ -309,10 +788,8 @@ def find_color_fields(content, filename):
     try:
         for match in scalar_color_pattern.finditer(content):
             try:
-                raw_name = match.group(2)
-                display_name = FIELD_NAME_MAPPING.get(raw_name, raw_name.replace('m_', '').replace('_', ' ').title())
-                logging.debug(f"Found scalar color field: {raw_name} -> {display_name}")
-                logging.debug(f"Match: {match.group(0)}")
+                raw_name = sys.intern(match.group(2))
+                logging.debug(f"Found scalar color field: {raw_name} at {match.start()}")
 
                 # Validate that we have a valid color array
                 color_value = match.group(3)
@@ -320,17 +797,10 @@ def find_color_fields(content, filename):
                     logging.warning(f"Empty color value for field {raw_name} in {filename}")
                     continue
 
-                color_fields.append({
-                    'type': 'color',
-                    'start': match.start(),
-                    'end': match.end(),
-                    'value': color_value,
-                    'full_match': match.group(0),
-                    'prefix': match.group(1),
-                    'field_name': display_name,
-                    'raw_name': raw_name,  # Add internal field name
-                    'filename': filename,
-                })
+                color_fields.append(ColorField(
+                    'color', content, filename, match.start(), match.end(),
+                    match.start(3), match.end(3), raw_name=raw_name
+                ))
                 scalar_count += 1
             except Exception as e:
                 logging.warning(f"Error processing scalar color field in {filename}: {e}")
@@ -338,11 +808,1215 @@ def find_color_fields(content, filename):
     except Exception as e:
         logging.error(f"Error processing scalar color fields in {filename}: {e}")
 
-    gradient_count = len([f for f in color_fields if f['type'] == 'gradient'])
-    logging.info(f"Found {scalar_count} scalar color fields and {gradient_count} gradient fields in {filename}")
+    gradient_count = len(color_fields) - scalar_count
+    logging.debug(f"Found {scalar_count} scalar color fields and {gradient_count} gradient fields in {filename}")
 
     return color_fields
 
+def scan_file_name(file_path, parent_folder, name_prefix=""):
+    """Display name of a scanned file: its path relative to `parent_folder`, optionally prefixed."""
+    file_name = os.path.relpath(file_path, parent_folder)
+    return os.path.join(name_prefix, file_name) if name_prefix else file_name
+
+def parse_scanned_file(file_name, content):
+    """Parse one file read during a scan. Returns (color fields, child references)."""
+    with perf_stats.stage("scan.parse"):
+        return find_color_fields(content, file_name), find_child_references(content)
+
+def collect_scan(items, source, started):
+    """
+    Assemble the scan result from (file_name, file_path, content, color_fields,
+    references) tuples and log the summary line.
+    """
+    file_name_to_path = {}
+    files_content = {}
+    all_color_fields = []
+    unique_fields = {}
+    vpcf_paths = {}
+    references = {}
+    skipped = 0
+
+    for file_name, file_path, content, color_fields, child_references in items:
+        references[file_name] = child_references
+        vpcf_paths[file_name] = file_path
+        if color_fields:
+            file_name_to_path[file_name] = file_path
+            files_content[file_name] = content
+            all_color_fields.extend(color_fields)
+            for field in color_fields:
+                if field['type'] == 'color':
+                    unique_fields[field['raw_name']] = field['field_name']
+        else:
+            skipped += 1
+            logging.debug(f"File skipped (no color fields): {file_name}")
+
+    gradient_count = sum(1 for f in all_color_fields if f['type'] == 'gradient')
+    logging.info(
+        f"Scan complete: {len(items)} files in {source}, "
+        f"{len(file_name_to_path)} with color fields, {skipped} skipped, "
+        f"{len(all_color_fields) - gradient_count} scalar fields, {gradient_count} gradient stops "
+        f"({time.perf_counter() - started:.2f}s)"
+    )
+    return {
+        'file_name_to_path': file_name_to_path,
+        'files_content': files_content,
+        'all_color_fields': all_color_fields,
+        'unique_fields': unique_fields,
+        'vpcf_paths': vpcf_paths,
+        'references': references,
+    }
+
+def scan_vpcf_files(vpcf_files, parent_folder, name_prefix=""):
+    """
+    Read and parse every file, keeping only those that contain color fields.
+    Emits a single summary line at INFO; per-file details are logged at DEBUG.
+
+    Args:
+        vpcf_files (list): Absolute paths of the files to scan
+        parent_folder (str): Folder the display names are made relative to
+        name_prefix (str): Prepended to every display name (the workspace root label)
+
+    Returns:
+        dict: 'file_name_to_path', 'files_content', 'all_color_fields' and 'unique_fields'
+              for files with color fields, plus 'vpcf_paths' and 'references'
+              (child particle references) for every scanned file
+    """
+    started = time.perf_counter()
+    items = []
+    for file_path in vpcf_files:
+        file_name = scan_file_name(file_path, parent_folder, name_prefix)
+        content = read_file(file_path)
+        items.append((file_name, file_path, content) + parse_scanned_file(file_name, content))
+    return collect_scan(items, parent_folder, started)
+
+async def read_and_parse_async(jobs, concurrency=DEFAULT_READ_CONCURRENCY, on_file=None):
+    """
+    Read and parse files with up to `concurrency` reads in flight. The blocking
+    open/read runs on a thread pool owned by this call (the loop's default
+    executor is left alone), so on slow or network storage the per-file latency
+    overlaps instead of adding up. Parsing happens on the event loop as each
+    read completes.
+
+    Args:
+        jobs (list): (file_name, file_path) pairs
+        on_file (callable): Called as on_file(file_name, color_fields) after each file is
+            parsed, on the event loop's thread
+
+    Returns:
+        list: (file_name, file_path, content, color_fields, references) in job order
+    """
+    items = [None] * len(jobs)
+    pending = iter(enumerate(jobs))
+
+    loop = asyncio.get_running_loop()
+
+    async def reader(executor):
+        for position, (file_name, file_path) in pending:
+            content = await loop.run_in_executor(executor, read_file, file_path)
+            color_fields, child_references = parse_scanned_file(file_name, content)
+            items[position] = (file_name, file_path, content, color_fields, child_references)
+            if on_file is not None:
+                on_file(file_name, color_fields)
+
+    workers = max(1, min(concurrency, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        await asyncio.gather(*(reader(executor) for _ in range(workers)))
+    return items
+
+async def scan_workspace_async(roots, concurrency=DEFAULT_READ_CONCURRENCY, on_file=None, discovered=None):
+    """Asyncio version of scan_workspace(): discovery per root, then one shared pool of reads."""
+    started = time.perf_counter()
+    labels = workspace_labels(roots) if len(roots) > 1 else {roots[0]: ""}
+    discovered = discovered or {}
+
+    async def discover(root_folder):
+        if root_folder in discovered:
+            return discovered[root_folder]
+        return await asyncio.to_thread(find_vpcf_files, root_folder)
+
+    file_lists = await asyncio.gather(*(discover(r) for r in roots))
+    jobs = [
+        (scan_file_name(file_path, root_folder, labels[root_folder]), file_path)
+        for root_folder, files in zip(roots, file_lists)
+        for file_path in files
+    ]
+    items = await read_and_parse_async(jobs, concurrency, on_file)
+    return collect_scan(items, ", ".join(roots), started)
+
+
+def workspace_labels(roots):
+    """
+    Name prefix for each workspace root: its folder name, numbered when two
+    roots share a name (e.g. several ".../citadel_addons/my_mod" folders).
+    """
+    labels = {}
+    seen = {}
+    for root_folder in roots:
+        base = os.path.basename(os.path.normpath(root_folder)) or root_folder
+        seen[base] = seen.get(base, 0) + 1
+        labels[root_folder] = base if seen[base] == 1 else f"{base} ({seen[base]})"
+    return labels
+
+def scan_workspace(roots, max_workers=DEFAULT_SCAN_WORKERS, read_concurrency=0, on_file=None, discovered=None):
+    """
+    Discover and scan several root folders concurrently and merge them into a
+    single scan_vpcf_files() result. With one root the names are unchanged;
+    with several, each name starts with the root's label from workspace_labels().
+
+    With read_concurrency > 1 the files are read by the asyncio reader
+    (read_and_parse_async()) with that many reads in flight, and `on_file`
+    is called as each file is parsed. `discovered` ({root: [file paths]})
+    supplies roots that were already walked by find_vpcf_files().
+    """
+    discovered = discovered or {}
+    if read_concurrency > 1:
+        return asyncio.run(scan_workspace_async(roots, read_concurrency, on_file, discovered))
+
+    def root_files(root_folder):
+        if root_folder in discovered:
+            return discovered[root_folder]
+        return find_vpcf_files(root_folder)
+
+    if len(roots) == 1:
+        return scan_vpcf_files(root_files(roots[0]), roots[0])
+
+    labels = workspace_labels(roots)
+
+    def scan_root(root_folder):
+        return scan_vpcf_files(root_files(root_folder), root_folder, name_prefix=labels[root_folder])
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(roots)))) as pool:
+        scans = list(pool.map(scan_root, roots))
+
+    merged = {
+        'file_name_to_path': {},
+        'files_content': {},
+        'all_color_fields': [],
+        'unique_fields': {},
+        'vpcf_paths': {},
+        'references': {},
+    }
+    for scan in scans:
+        merged['all_color_fields'].extend(scan['all_color_fields'])
+        for key in ('file_name_to_path', 'files_content', 'unique_fields', 'vpcf_paths', 'references'):
+            merged[key].update(scan[key])
+    logging.info(f"Workspace scan complete: {len(roots)} roots, {len(merged['vpcf_paths'])} files")
+    return merged
+
+class DirectoryTree:
+    """
+    Folder hierarchy of file names for the lazy directory view, with file
+    and color field counts per folder. Children are ordered so a depth-first
+    walk visits files in the same order as the sorted flat list, which keeps
+    Next/Previous consistent between the two views.
+    """
+
+    def __init__(self, file_names, field_counts=None, sep=os.sep):
+        self.sep = sep
+        self.field_counts = field_counts or {}
+        self.files = set()
+        self.folders = {'': ([], [])}  # {folder: (subfolders, files)}
+        self.counts = {'': [0, 0]}     # {folder: [files, color fields]} including subfolders
+        for file_name in file_names:
+            self.files.add(file_name)
+            fields = self.field_counts.get(file_name, 0)
+            folder = ''
+            self._count(folder, fields)
+            for part in file_name.split(sep)[:-1]:
+                child = folder + sep + part if folder else part
+                if child not in self.folders:
+                    self.folders[child] = ([], [])
+                    self.counts[child] = [0, 0]
+                    self.folders[folder][0].append(child)
+                folder = child
+                self._count(folder, fields)
+            self.folders[folder][1].append(file_name)
+
+    def _count(self, folder, fields):
+        self.counts[folder][0] += 1
+        self.counts[folder][1] += fields
+
+    def name(self, path):
+        return path.rsplit(self.sep, 1)[-1]
+
+    def children(self, folder=''):
+        """[('dir', folder path) or ('file', file name)] directly inside `folder`, in list order."""
+        subfolders, files = self.folders.get(folder, ((), ()))
+        items = [(self.name(path) + self.sep, 'dir', path) for path in subfolders]
+        items += [(self.name(path), 'file', path) for path in files]
+        items.sort()
+        return [(kind, path) for _, kind, path in items]
+
+    def ancestors(self, file_name):
+        """Folders containing `file_name`, outermost first."""
+        parts = file_name.split(self.sep)[:-1]
+        return [self.sep.join(parts[:i + 1]) for i in range(len(parts))]
+
+def find_child_references(content):
+    """Return the resource paths of the child particle systems referenced in `content`."""
+    return child_reference_pattern.findall(content) if content else []
+
+def normalize_resource_path(path):
+    return path.replace('\\', '/').strip('/').lower()
+
+class IndexEntry:
+    """
+    One color usage in ColorIndex: where it is (file, span of the color
+    array) and what it is (field key, occurrence, RGB and alpha). A slots
+    record like ColorField, read with the same dict-style access
+    (entry['color'], entry.get('alpha')).
+    """
+
+    __slots__ = ('file', 'type', 'field', 'occurrence', 'start', 'end', 'color', 'alpha')
+
+    def __init__(self, file, type_, field, occurrence, start, end, color, alpha=None):
+        self.file = file
+        self.type = type_
+        self.field = field
+        self.occurrence = occurrence
+        self.start = start
+        self.end = end
+        self.color = color
+        self.alpha = alpha
+
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __repr__(self):
+        return f"IndexEntry({self.file!r}, {self.field!r}, {self.occurrence}, {self.color})"
+
+class ColorIndex:
+    """
+    Inverted index from RGB color to the places it is used across the project.
+
+    Built from find_color_fields() output and updated per file. Exact lookups
+    are a dict access; tolerance lookups only visit the grid cells within the
+    tolerance. Alpha is ignored for matching and preserved when replacing.
+    Gradient stops that also match the scalar m_Color pattern point at the
+    same numbers and are indexed once.
+    """
+
+    def __init__(self):
+        self.entries = {}  # {file_name: [IndexEntry]}
+        self.exact = {}    # {(r, g, b): {(file_name, entry position)}}
+        self.grid = {}     # {(r // cell, g // cell, b // cell): {(r, g, b)}}
+        self._columns = None
+
+    @staticmethod
+    def normalize(color):
+        channels = [min(255, max(0, int(c))) for c in list(color)[:3]]
+        return tuple(channels + [0] * (3 - len(channels)))
+
+    def _cell(self, rgb):
+        return tuple(c // COLOR_INDEX_CELL for c in rgb)
+
+    def update_file(self, file_name, color_fields):
+        """(Re)index one file from its find_color_fields() output."""
+        self.remove_file(file_name)
+        self._columns = None
+        entries = []
+        seen_numbers = set()
+        occurrences = {}
+        for field in color_fields:
+            span = (field['value_start'], field['value_end'])
+            first_number = re.search(r'[\d\.]', field['value'])
+            number_start = span[0] + (first_number.start() if first_number else 0)
+            if number_start in seen_numbers:
+                continue
+            seen_numbers.add(number_start)
+            color = parse_color_string(field['value'])
+            if len(color) < 3:
+                continue
+            if field['type'] == 'gradient':
+                key = sys.intern(f"Gradient {field['gradient_block_index']}")
+                occurrence = field['stop_index']
+            else:
+                key = field['raw_name']
+                occurrence = occurrences.get(key, 0)
+                occurrences[key] = occurrence + 1
+            rgb = self.normalize(color)
+            entries.append(IndexEntry(
+                file_name, field['type'], key, occurrence, span[0], span[1], rgb,
+                color[3] if len(color) > 3 else None
+            ))
+            self.exact.setdefault(rgb, set()).add((file_name, len(entries) - 1))
+            self.grid.setdefault(self._cell(rgb), set()).add(rgb)
+        self.entries[file_name] = entries
+
+    def remove_file(self, file_name):
+        if file_name in self.entries:
+            self._columns = None
+        for position, entry in enumerate(self.entries.pop(file_name, ())):
+            refs = self.exact.get(entry['color'])
+            if refs is None:
+                continue
+            refs.discard((file_name, position))
+            if not refs:
+                del self.exact[entry['color']]
+                cell = self.grid.get(self._cell(entry['color']))
+                if cell is not None:
+                    cell.discard(entry['color'])
+                    if not cell:
+                        del self.grid[self._cell(entry['color'])]
+
+    def clear(self):
+        self.entries.clear()
+        self.exact.clear()
+        self.grid.clear()
+        self._columns = None
+
+    def matching_colors(self, color, tolerance=0):
+        """Indexed colors within Euclidean RGB distance `tolerance` of `color`."""
+        rgb = self.normalize(color)
+        if tolerance <= 0:
+            return [rgb] if rgb in self.exact else []
+        reach = int(tolerance) // COLOR_INDEX_CELL + 1
+        cr, cg, cb = self._cell(rgb)
+        limit = tolerance * tolerance
+        matches = []
+        for dr in range(-reach, reach + 1):
+            for dg in range(-reach, reach + 1):
+                for db in range(-reach, reach + 1):
+                    for candidate in self.grid.get((cr + dr, cg + dg, cb + db), ()):
+                        distance = sum((a - b) * (a - b) for a, b in zip(candidate, rgb))
+                        if distance <= limit:
+                            matches.append(candidate)
+        return matches
+
+    def lookup(self, color, tolerance=0):
+        """
+        Returns:
+            list: Entry dicts ('file', 'field', 'occurrence', 'start', 'end', 'color', 'alpha')
+                  for every usage of `color` (within `tolerance`)
+        """
+        results = []
+        for rgb in self.matching_colors(color, tolerance):
+            for file_name, position in self.exact.get(rgb, ()):
+                results.append(self.entries[file_name][position])
+        results.sort(key=lambda e: (e['file'], e['start']))
+        return results
+
+    def usage_counts(self):
+        """{(r, g, b): number of usages}"""
+        return {rgb: len(refs) for rgb, refs in self.exact.items()}
+
+    def columns(self):
+        """
+        Columnar NumPy view of every entry, cached until the index changes.
+
+        Returns:
+            dict: 'colors' (N, 3) uint8, 'field' and 'file' int codes into
+                  'field_names' and 'file_names'. Gradient stops share the
+                  field name "Gradient stops".
+        """
+        require_numpy()
+        if self._columns is None:
+            field_codes, file_names, colors, fields, files = {}, [], [], [], []
+            for file_name, entries in self.entries.items():
+                file_code = len(file_names)
+                file_names.append(file_name)
+                for entry in entries:
+                    name = "Gradient stops" if entry['type'] == 'gradient' else entry['field']
+                    fields.append(field_codes.setdefault(name, len(field_codes)))
+                    files.append(file_code)
+                    colors.append(entry['color'])
+            self._columns = {
+                'colors': np.array(colors, dtype=np.uint8).reshape(-1, 3),
+                'field': np.array(fields, dtype=np.int64),
+                'file': np.array(files, dtype=np.int64),
+                'field_names': list(field_codes),
+                'file_names': file_names,
+            }
+        return self._columns
+
+def text_trigrams(text):
+    """
+    Lower-case trigrams of every line of `text`, with leading and trailing
+    whitespace of each line left out. Lines repeated in a file are only
+    processed once.
+    """
+    grams = set()
+    for line in set(text.lower().splitlines()):
+        line = line.strip()
+        grams.update(zip(line, line[1:], line[2:]))
+    return grams
+
+class TextIndex:
+    """
+    Trigram index for case-insensitive substring search across file contents.
+
+    Maps each trigram to the files containing it. A query only verifies the
+    files that contain all of its trigrams. Files added with set_contents()
+    stay "pending" until index_pending() has processed them (normally on a
+    background thread) and are searched directly until then, so results are
+    complete while the index is still being built. Files known only by path
+    (no color fields, so not in files_content) are read on first use.
+    Queries shorter than three characters, or spanning lines, check every
+    file.
+    """
+
+    def __init__(self):
+        self.contents = {}  # {file_name: content, or None until read from paths}
+        self.paths = {}     # {file_name: file path}
+        self.postings = {}  # {trigram: {file_name}}
+        self.pending = set()
+        self._lock = threading.Lock()
+
+    def set_contents(self, files_content, paths=None):
+        """
+        Replace every file; the new contents are indexed by index_pending().
+        Files in `paths` ({file_name: path}) but not in `files_content` are
+        read from disk when they are indexed or searched.
+        """
+        with self._lock:
+            self.paths = dict(paths or {})
+            self.contents = dict.fromkeys(self.paths)
+            self.contents.update(files_content)
+            self.postings = {}
+            self.pending = set(self.contents)
+
+    def file_content(self, file_name):
+        """Content of an indexed file, reading it if it is only known by path."""
+        with self._lock:
+            content = self.contents.get(file_name)
+            path = self.paths.get(file_name)
+        if content is not None or path is None:
+            return content
+        content = read_file(path)
+        with self._lock:
+            if file_name in self.contents and self.contents[file_name] is None:
+                self.contents[file_name] = content
+            return self.contents.get(file_name)
+
+    def index_pending(self):
+        """Index all pending files. Safe to run on a worker thread."""
+        while True:
+            with self._lock:
+                if not self.pending:
+                    return
+                file_name = self.pending.pop()
+            content = self.file_content(file_name)
+            if content is None:
+                continue
+            grams = text_trigrams(content)
+            with self._lock:
+                if self.contents.get(file_name) is content:
+                    self._add(file_name, grams)
+
+    def update_file(self, file_name, content):
+        """(Re)index one file after it was written."""
+        with self._lock:
+            old = self.contents.get(file_name)
+            was_pending = file_name in self.pending
+        old_grams = text_trigrams(old) if old is not None and not was_pending else ()
+        grams = text_trigrams(content)
+        with self._lock:
+            self._remove(file_name, old_grams)
+            self.pending.discard(file_name)
+            self.contents[file_name] = content
+            self._add(file_name, grams)
+
+    def remove_file(self, file_name):
+        with self._lock:
+            old = self.contents.pop(file_name, None)
+            was_pending = file_name in self.pending
+            self.pending.discard(file_name)
+        if old is not None and not was_pending:
+            grams = text_trigrams(old)
+            with self._lock:
+                self._remove(file_name, grams)
+
+    def _add(self, file_name, grams):
+        for gram in grams:
+            files = self.postings.get(gram)
+            if files is None:
+                self.postings[gram] = {file_name}
+            else:
+                files.add(file_name)
+
+    def _remove(self, file_name, grams):
+        for gram in grams:
+            files = self.postings.get(gram)
+            if files is not None:
+                files.discard(file_name)
+                if not files:
+                    del self.postings[gram]
+
+    def candidates(self, query):
+        """Files that may contain `query`, sorted by name."""
+        grams = text_trigrams(query) if '\n' not in query else ()
+        with self._lock:
+            if not grams:
+                return sorted(self.contents)
+            found = None
+            for gram in sorted(grams, key=lambda g: len(self.postings.get(g, ()))):
+                files = self.postings.get(gram, set())
+                found = set(files) if found is None else found & files
+                if not found:
+                    break
+            return sorted(found | self.pending)
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT):
+        """
+        Returns:
+            tuple: ([{'file', 'line', 'column', 'start', 'end', 'text'}], truncated)
+                   with 1-based lines and 0-based columns
+        """
+        if not query:
+            return [], False
+        hits = []
+        for file_name in self.candidates(query):
+            content = self.file_content(file_name)
+            if content is None:
+                continue
+            line, counted = 1, 0
+            for start, end in self._matches(content, query):
+                line += content.count('\n', counted, start)
+                counted = start
+                line_start = content.rfind('\n', 0, start) + 1
+                line_end = content.find('\n', start)
+                hits.append({
+                    'file': file_name,
+                    'line': line,
+                    'column': start - line_start,
+                    'start': start,
+                    'end': end,
+                    'text': content[line_start:line_end if line_end >= 0 else len(content)].strip()[:200],
+                })
+                if len(hits) >= limit:
+                    return hits, True
+        return hits, False
+
+    @staticmethod
+    def _matches(content, query):
+        """(start, end) of each case-insensitive, non-overlapping occurrence of `query`."""
+        lowered, needle = content.lower(), query.lower()
+        if len(lowered) != len(content) or len(needle) != len(query):
+            # Lower-casing changed the length, so offsets would not line up
+            for match in re.finditer(re.escape(query), content, re.IGNORECASE):
+                yield match.start(), match.end()
+            return
+        position = lowered.find(needle)
+        while position >= 0:
+            yield position, position + len(needle)
+            position = lowered.find(needle, position + len(needle))
+
+def replace_color_in_contents(index, files_content, old_color, new_color, tolerance=0):
+    """
+    Replace every usage of `old_color` (within `tolerance`) with `new_color`,
+    touching only the files and spans found in the index.
+
+    Returns:
+        dict: {file_name: new content} for the files that changed
+    """
+    return replace_entries_in_contents(index.lookup(old_color, tolerance), files_content, new_color)
+
+def replace_entries_in_contents(entries, files_content, new_color):
+    """
+    Set the RGB of every index entry in `entries` to `new_color`.
+
+    Returns:
+        dict: {file_name: new content} for the files that changed
+    """
+    return apply_file_edits(files_content, entry_color_edits(((e, new_color) for e in entries), files_content))
+
+def entry_color_edits(entry_colors, files_content):
+    """
+    Span edits that set the RGB of index entries, grouped by file. Only the
+    channel numbers are replaced, so alpha and formatting are kept.
+
+    Args:
+        entry_colors (iterable): (entry, new_color) pairs
+        files_content (dict): {file_name: content} the entries were indexed from
+
+    Returns:
+        dict: {file_name: sorted, non-overlapping (start, end, replacement) edits}
+    """
+    edits_by_file = {}
+    for entry, new_color in entry_colors:
+        content = files_content[entry['file']]
+        text = content[entry['start']:entry['end']]
+        replacement = replace_color_text(text, new_color)
+        if replacement != text:
+            edits_by_file.setdefault(entry['file'], set()).add((entry['start'], entry['end'], replacement))
+    return {file_name: sorted(edits) for file_name, edits in edits_by_file.items()}
+
+def apply_file_edits(files_content, file_edits):
+    """
+    Apply entry_color_edits()-style edits to the file contents.
+
+    Returns:
+        dict: {file_name: new content} for the files that changed
+    """
+    updated = {}
+    for file_name, edits in file_edits.items():
+        content = files_content[file_name]
+        new_content = apply_span_edits(content, edits)
+        if new_content != content:
+            updated[file_name] = new_content
+    return updated
+
+np = None  # numpy, imported by require_numpy() the first time a tool needs it
+
+def require_numpy():
+    """Import NumPy on first use; only the color transforms, clusters and statistics need it."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("This feature requires NumPy. Install it with: pip install numpy") from None
+        np = numpy
+    return np
+
+def cluster_colors(usage_counts, threshold):
+    """
+    Group near-duplicate colors: every color within Euclidean RGB distance
+    `threshold` of a cluster's leader joins that cluster. Leaders are picked
+    most-used first, so each cluster is represented by its most common color.
+
+    Colors are bucketed into a grid with cells `threshold` wide, so each leader
+    only measures the distance to colors in the 27 surrounding cells.
+
+    Args:
+        usage_counts (dict): {(r, g, b): number of usages}, see ColorIndex.usage_counts()
+        threshold (float): Maximum distance from the leader
+
+    Returns:
+        list: Dicts with 'leader' (r, g, b), 'colors' [(r, g, b), ...] (most used first)
+              and 'usages', for clusters with more than one color, largest first
+    """
+    require_numpy()
+    if not usage_counts or threshold <= 0:
+        return []
+    colors = np.array(list(usage_counts.keys()), dtype=np.int32).reshape(-1, 3)
+    counts = np.array(list(usage_counts.values()), dtype=np.int64)
+    order = np.lexsort((colors[:, 2], colors[:, 1], colors[:, 0], -counts))
+    colors, counts = colors[order], counts[order]
+
+    cell = max(1, int(np.ceil(threshold)))
+    base = 256 // cell + 3
+    keys = colors // cell + 1
+    flat = (keys[:, 0] * base + keys[:, 1]) * base + keys[:, 2]
+    by_cell = np.argsort(flat, kind='stable')
+    cell_ids, starts = np.unique(flat[by_cell], return_index=True)
+    ends = np.append(starts[1:], len(by_cell))
+    cells = {int(c): by_cell[a:b] for c, a, b in zip(cell_ids, starts, ends)}
+    offsets = [(dr * base + dg) * base + db for dr in (-1, 0, 1) for dg in (-1, 0, 1) for db in (-1, 0, 1)]
+
+    neighbourhoods = {}
+    limit = float(threshold) ** 2
+    assigned = np.zeros(len(colors), dtype=bool)
+    clusters = []
+    for leader in range(len(colors)):
+        if assigned[leader]:
+            continue
+        key = int(flat[leader])
+        candidates = neighbourhoods.get(key)
+        if candidates is None:
+            candidates = np.concatenate([cells[key + o] for o in offsets if key + o in cells])
+            neighbourhoods[key] = candidates
+        candidates = candidates[~assigned[candidates]]
+        distances = ((colors[candidates] - colors[leader]) ** 2).sum(axis=1)
+        members = np.sort(candidates[distances <= limit])
+        assigned[members] = True
+        if len(members) > 1:
+            clusters.append({
+                'leader': tuple(int(c) for c in colors[leader]),
+                'colors': [tuple(int(c) for c in colors[m]) for m in members],
+                'usages': int(counts[members].sum()),
+            })
+    clusters.sort(key=lambda c: (-c['usages'], c['leader']))
+    return clusters
+
+def group_color_stats(groups, files, colors, num_groups, top=5):
+    """
+    Per-group usage statistics over parallel entry arrays.
+
+    Args:
+        groups (numpy.ndarray): Group code per entry, in range(num_groups)
+        files (numpy.ndarray): File code per entry
+        colors (numpy.ndarray): (N, 3) uint8 colors
+        top (int): Number of dominant colors to keep per group
+
+    Returns:
+        list: One dict per group with 'usages', 'files', 'distinct' and
+              'top_colors' [((r, g, b), count), ...] most used first
+    """
+    packed = (colors[:, 0].astype(np.int64) << 16) | (colors[:, 1].astype(np.int64) << 8) | colors[:, 2]
+    usages = np.bincount(groups, minlength=num_groups)
+    group_files = np.unique(groups * (int(files.max(initial=0)) + 1) + files)
+    file_counts = np.bincount(group_files // (int(files.max(initial=0)) + 1), minlength=num_groups)
+
+    pairs, pair_counts = np.unique(groups * (1 << 24) + packed, return_counts=True)
+    pair_groups = pairs >> 24
+    pair_colors = pairs & 0xFFFFFF
+    distinct = np.bincount(pair_groups, minlength=num_groups)
+
+    order = np.lexsort((pair_colors, -pair_counts, pair_groups))
+    pair_groups, pair_colors, pair_counts = pair_groups[order], pair_colors[order], pair_counts[order]
+    starts = np.searchsorted(pair_groups, np.arange(num_groups))
+
+    stats = []
+    for group in range(num_groups):
+        start = starts[group]
+        stop = start + min(top, distinct[group])
+        stats.append({
+            'usages': int(usages[group]),
+            'files': int(file_counts[group]),
+            'distinct': int(distinct[group]),
+            'top_colors': [
+                (((int(c) >> 16) & 255, (int(c) >> 8) & 255, int(c) & 255), int(n))
+                for c, n in zip(pair_colors[start:stop], pair_counts[start:stop])
+            ],
+        })
+    return stats
+
+def color_usage_stats(index, top=5):
+    """
+    Usage statistics for the statistics panel, aggregated from ColorIndex.columns().
+
+    Returns:
+        dict: 'fields' and 'folders' lists of group_color_stats() dicts with a
+              'name' key, most used first, plus 'usages', 'files' and 'distinct' totals
+    """
+    columns = index.columns()
+    colors, fields, files = columns['colors'], columns['field'], columns['file']
+
+    folder_codes = {}
+    file_folders = np.array(
+        [folder_codes.setdefault(os.path.dirname(fn) or ".", len(folder_codes)) for fn in columns['file_names']],
+        dtype=np.int64
+    )
+    folders = file_folders[files] if len(files) else files
+
+    def named(names, stats):
+        for name, entry in zip(names, stats):
+            entry['name'] = name
+        return sorted(stats, key=lambda e: (-e['usages'], e['name']))
+
+    return {
+        'fields': named(columns['field_names'], group_color_stats(fields, files, colors, len(columns['field_names']), top)),
+        'folders': named(list(folder_codes), group_color_stats(folders, files, colors, len(folder_codes), top)),
+        'usages': len(files),
+        'files': len(columns['file_names']),
+        'distinct': len(index.exact),
+    }
+
+def collect_index_colors(index, file_names=None):
+    """
+    Gather every indexed color in scope into one array.
+
+    Args:
+        index (ColorIndex): The project color index
+        file_names (iterable): Files to include, or None for all indexed files
+
+    Returns:
+        tuple: (entries list, uint8 array of shape (N, 3)) in matching order
+    """
+    require_numpy()
+    names = index.entries.keys() if file_names is None else [fn for fn in file_names if fn in index.entries]
+    entries = [entry for fn in names for entry in index.entries[fn]]
+    colors = np.array([entry['color'] for entry in entries], dtype=np.uint8).reshape(-1, 3)
+    return entries, colors
+
+def rgb_to_hsv_array(rgb):
+    """Vectorized RGB -> HSV. `rgb` is float in [0, 1], shape (N, 3); hue is in [0, 1)."""
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    delta = maxc - minc
+    safe_delta = np.where(delta == 0, 1.0, delta)
+    hue = np.select(
+        [maxc == r, maxc == g],
+        [((g - b) / safe_delta) % 6.0, (b - r) / safe_delta + 2.0],
+        default=(r - g) / safe_delta + 4.0
+    ) / 6.0
+    hue = np.where(delta == 0, 0.0, hue) % 1.0
+    saturation = np.where(maxc == 0, 0.0, delta / np.where(maxc == 0, 1.0, maxc))
+    return np.stack([hue, saturation, maxc], axis=1)
+
+def hsv_to_rgb_array(hsv):
+    """Vectorized HSV -> RGB, inverse of rgb_to_hsv_array()."""
+    h, s_, v = hsv[:, 0] % 1.0, hsv[:, 1], hsv[:, 2]
+    i = np.floor(h * 6.0).astype(int) % 6
+    f = h * 6.0 - np.floor(h * 6.0)
+    p = v * (1.0 - s_)
+    q = v * (1.0 - s_ * f)
+    t = v * (1.0 - s_ * (1.0 - f))
+    choices = [
+        np.stack([v, t, p], axis=1), np.stack([q, v, p], axis=1), np.stack([p, v, t], axis=1),
+        np.stack([p, q, v], axis=1), np.stack([t, p, v], axis=1), np.stack([v, p, q], axis=1),
+    ]
+    return np.select([(i == k)[:, None] for k in range(6)], choices)
+
+def parse_curve(points):
+    """
+    Build a 256-entry lookup table from "in:out" control points, e.g.
+    "0:0, 128:160, 255:255". Returns None for an empty string.
+    """
+    points = [p.strip() for p in (points or "").replace(';', ',').split(',') if p.strip()]
+    if not points:
+        return None
+    require_numpy()
+    pairs = sorted((float(a), float(b)) for a, b in (p.split(':') for p in points))
+    xs = [a for a, _ in pairs]
+    ys = [b for _, b in pairs]
+    return np.clip(np.interp(np.arange(256), xs, ys), 0, 255)
+
+def parse_palette(text):
+    """
+    Parse palette remap lines of the form "255, 0, 0 -> 0, 0, 255".
+
+    Returns:
+        list: (old_rgb, new_rgb) pairs
+    """
+    palette = []
+    for line in (text or "").splitlines():
+        if not line.strip():
+            continue
+        if '->' not in line:
+            raise ValueError(f"Palette line needs 'old -> new': {line.strip()}")
+        old, new = (parse_color_string(part)[:3] for part in line.split('->', 1))
+        if len(old) != 3 or len(new) != 3:
+            raise ValueError(f"Palette colors need three channels: {line.strip()}")
+        palette.append((old, new))
+    return palette
+
+def transform_color_array(colors, hue_shift=0.0, saturation=1.0, brightness=1.0,
+                          palette=None, palette_threshold=None, curves=None):
+    """
+    Apply color transforms to an (N, 3) uint8 array in one vectorized pass.
+
+    Args:
+        hue_shift (float): Hue rotation in degrees
+        saturation (float): Saturation multiplier
+        brightness (float): Value (HSV) multiplier
+        palette (list): (old_rgb, new_rgb) pairs; each color is mapped to the new color
+            of its nearest old color
+        palette_threshold (float): Only remap colors within this RGB distance of a palette entry
+        curves (list): Three 256-entry lookup tables (or None) for R, G and B, see parse_curve()
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (N, 3)
+    """
+    require_numpy()
+    result = colors.astype(np.float64)
+    if len(result) == 0:
+        return colors.copy()
+
+    if palette:
+        sources = np.array([p[0] for p in palette], dtype=np.float64).reshape(-1, 3)
+        targets = np.array([p[1] for p in palette], dtype=np.float64).reshape(-1, 3)
+        distances = ((result[:, None, :] - sources[None, :, :]) ** 2).sum(axis=2)
+        nearest = distances.argmin(axis=1)
+        remapped = targets[nearest]
+        if palette_threshold is not None:
+            within = distances[np.arange(len(result)), nearest] <= palette_threshold ** 2
+            remapped = np.where(within[:, None], remapped, result)
+        result = remapped
+
+    if hue_shift or saturation != 1.0 or brightness != 1.0:
+        hsv = rgb_to_hsv_array(result / 255.0)
+        hsv[:, 0] = (hsv[:, 0] + hue_shift / 360.0) % 1.0
+        hsv[:, 1] = np.clip(hsv[:, 1] * saturation, 0.0, 1.0)
+        hsv[:, 2] = np.clip(hsv[:, 2] * brightness, 0.0, 1.0)
+        result = hsv_to_rgb_array(hsv) * 255.0
+
+    result = np.clip(np.rint(result), 0, 255).astype(np.uint8)
+    if curves:
+        for channel, table in enumerate(curves):
+            if table is not None:
+                result[:, channel] = np.rint(table[result[:, channel]]).astype(np.uint8)
+    return result
+
+def build_color_edits(entries, new_colors, files_content):
+    """
+    Write transformed colors back into the file contents through span edits.
+    Only the RGB channels are replaced, so alpha and formatting are kept.
+
+    Returns:
+        dict: {file_name: new content} for the files that changed
+    """
+    return apply_file_edits(files_content, transform_color_edits(entries, new_colors, files_content))
+
+def transform_color_edits(entries, new_colors, files_content):
+    """entry_color_edits() for the entries whose transformed color differs from the current one."""
+    return entry_color_edits(
+        ((entry, new_color) for entry, new_color in zip(entries, new_colors.tolist())
+         if tuple(new_color) != tuple(entry['color'])),
+        files_content
+    )
+
+def content_digest(content):
+    """SHA-256 of file content as read by read_file(), used to detect stale manifests."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def export_color_manifest(index, files_content, path):
+    """
+    Write every indexed color field and gradient stop to a manifest.
+
+    A .csv path writes one row per entry with the columns in
+    MANIFEST_COLUMNS; any other path writes compact JSON grouped by file.
+    Values are written as "[ r, g, b, a ]" and each file carries the hash of
+    the content the spans refer to.
+
+    Returns:
+        int: Number of entries written
+    """
+    files = {}
+    for file_name in sorted(index.entries):
+        content = files_content.get(file_name)
+        if content is None or not index.entries[file_name]:
+            continue
+        files[file_name] = {
+            'sha256': content_digest(content),
+            'fields': [
+                [e['field'], e['occurrence'], e['start'], e['end'],
+                 color_list_to_string(parse_color_string(content[e['start']:e['end']]))]
+                for e in index.entries[file_name]
+            ],
+        }
+
+    if path.lower().endswith('.csv'):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(MANIFEST_COLUMNS)
+            for file_name, data in files.items():
+                for row in data['fields']:
+                    writer.writerow([file_name, data['sha256']] + row)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': files}, f, separators=(',', ':'))
+    return sum(len(data['fields']) for data in files.values())
+
+def read_color_manifest(path):
+    """
+    Load a manifest written by export_color_manifest() (CSV or JSON).
+
+    Returns:
+        dict: {file_name: {'sha256': str, 'fields': [[field, occurrence, start, end, value]]}}
+    """
+    if path.lower().endswith('.csv'):
+        files = {}
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                try:
+                    data = files.setdefault(row['file'], {'sha256': row['sha256'], 'fields': []})
+                    data['fields'].append([row['field'], int(row['occurrence']), int(row['start']),
+                                           int(row['end']), row['value']])
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ValueError(f"{path}, line {line}: invalid manifest row ({e})")
+        return files
+
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"{path}: unsupported manifest version {manifest.get('version')!r}")
+    return manifest['files']
+
+def apply_color_manifest(manifest, file_name_to_path):
+    """
+    Build the edits for every manifest entry whose color differs from the file.
+
+    Each file is read once and its hash checked against the manifest before
+    any of its entries are used; files that changed since the export are
+    reported as stale and left alone. Only the numbers of changed entries are
+    replaced, so formatting is kept.
+
+    Returns:
+        dict: 'updated' {file_name: new content}, 'edits' {file_name: span edits},
+              'changed' (entry count), 'stale' and 'missing' (lists of file names)
+    """
+    result = {'updated': {}, 'edits': {}, 'changed': 0, 'stale': [], 'missing': []}
+    for file_name, data in manifest.items():
+        path = file_name_to_path.get(file_name)
+        if path is None or not os.path.exists(path):
+            result['missing'].append(file_name)
+            continue
+        content = read_file(path)
+        if content_digest(content) != data['sha256']:
+            result['stale'].append(file_name)
+            continue
+
+        edits = []
+        for field, occurrence, start, end, value in data['fields']:
+            new_color = [min(255, max(0, c)) for c in parse_color_string(value)]
+            if len(new_color) < 3:
+                raise ValueError(f"{file_name}: {field} #{occurrence + 1}: not a color: {value!r}")
+            old_text = content[start:end]
+            if not 0 <= start < end <= len(content) or len(parse_color_string(old_text)) < 3:
+                raise ValueError(f"{file_name}: {field} #{occurrence + 1}: span {start}-{end} is not a color")
+            if new_color != parse_color_string(old_text):
+                edits.append((start, end, replace_color_text(old_text, new_color)))
+        if edits:
+            edits = sorted(set(edits))
+            result['updated'][file_name] = apply_span_edits(content, edits)
+            result['edits'][file_name] = edits
+            result['changed'] += len(edits)
+    return result
+
+class ReferenceGraph:
+    """
+    Parent/child graph of particle systems built from m_ChildRef references.
+
+    Resource paths in the files are relative to the addon content root, while
+    file names are relative to the selected folder, so references are
+    resolved by matching path suffixes of the files' full paths. A match must
+    include at least one folder besides the file name; a reference to a file
+    outside the scanned folders that merely shares its name stays
+    unresolved. When a suffix matches several files (the same effect in two
+    workspace roots), the one sharing the longest leading path with the
+    referencing file wins.
+    """
+
+    def __init__(self):
+        self.children = {}  # {file_name: set(file_name)}
+        self.parents = {}   # {file_name: set(file_name)}
+        self._references = {}
+        self._suffix_index = {}  # {normalized path suffix: file_name, or None if ambiguous}
+        self._ambiguous = {}     # {ambiguous suffix: set(file_name)}
+
+    @classmethod
+    def build(cls, references, paths=None):
+        """
+        Args:
+            references (dict): {file_name: [resource paths]} as returned by scan_vpcf_files()
+            paths (dict): {file_name: file path} ('vpcf_paths'); file names are used where missing
+        """
+        graph = cls()
+        paths = paths or {}
+        for file_name in references:
+            graph._index(file_name, paths.get(file_name))
+        for file_name, refs in references.items():
+            graph._references[file_name] = list(refs)
+        graph._link_all()
+        return graph
+
+    def _index(self, file_name, path=None):
+        parts = normalize_resource_path(path or file_name).split('/')
+        for i in range(len(parts)):
+            suffix = '/'.join(parts[i:])
+            if suffix in self._suffix_index and self._suffix_index[suffix] != file_name:
+                previous = self._suffix_index[suffix]
+                self._ambiguous.setdefault(suffix, set()).update(p for p in (previous, file_name) if p)
+                self._suffix_index[suffix] = None
+            else:
+                self._suffix_index[suffix] = file_name
+
+    def resolve(self, resource_path, from_file=None):
+        """Map a resource path to a known file name, or None."""
+        parts = normalize_resource_path(resource_path).split('/')
+        # Stop before the bare file name unless the reference is nothing more than that
+        for i in range(max(1, len(parts) - 1)):
+            suffix = '/'.join(parts[i:])
+            match = self._suffix_index.get(suffix)
+            if match:
+                return match
+            if match is None and suffix in self._suffix_index:
+                return self._closest(self._ambiguous.get(suffix, ()), from_file)
+        return None
+
+    @staticmethod
+    def _closest(candidates, from_file):
+        """The candidate sharing the most leading path components with `from_file`, if unique."""
+        if not from_file:
+            return None
+        origin = normalize_resource_path(from_file).split('/')
+
+        def shared(candidate):
+            count = 0
+            for a, b in zip(origin, normalize_resource_path(candidate).split('/')):
+                if a != b:
+                    break
+                count += 1
+            return count
+
+        scored = sorted(((shared(c), c) for c in candidates), reverse=True)
+        if scored and scored[0][0] > 0 and (len(scored) == 1 or scored[0][0] > scored[1][0]):
+            return scored[0][1]
+        return None
+
+    def _link_all(self):
+        self.children = {name: set() for name in self._references}
+        self.parents = {name: set() for name in self._references}
+        for file_name, refs in self._references.items():
+            for ref in refs:
+                child = self.resolve(ref, file_name)
+                if child and child != file_name:
+                    self.children[file_name].add(child)
+                    self.parents.setdefault(child, set()).add(file_name)
+
+    def update_file(self, file_name, references, path=None):
+        """Replace the references of one file (e.g. after it was saved)."""
+        if file_name not in self._references:
+            self._index(file_name, path)
+        self._references[file_name] = list(references)
+        for child in self.children.get(file_name, ()):
+            self.parents.get(child, set()).discard(file_name)
+        self.children[file_name] = set()
+        self.parents.setdefault(file_name, set())
+        for ref in references:
+            child = self.resolve(ref, file_name)
+            if child and child != file_name:
+                self.children[file_name].add(child)
+                self.parents.setdefault(child, set()).add(file_name)
+
+    def _walk(self, start, edges):
+        seen = set()
+        stack = list(start)
+        while stack:
+            name = stack.pop()
+            for nxt in edges.get(name, ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def ancestors(self, file_names):
+        """All files that directly or indirectly reference any of `file_names`."""
+        return self._walk(file_names, self.parents)
+
+    def descendants(self, file_names):
+        """All files directly or indirectly referenced by `file_names` (the effect tree)."""
+        return self._walk(file_names, self.children)
+
+    def levels(self, file_names):
+        """
+        Order `file_names` into dependency levels: every file comes after the
+        children it references (within the set). Files in one level are
+        independent and can be compiled in parallel. Cycles are placed in a
+        final level.
+
+        Returns:
+            list: Lists of file names, children first
+        """
+        remaining = set(file_names)
+        pending_children = {
+            name: {child for child in self.children.get(name, ()) if child in remaining}
+            for name in remaining
+        }
+        levels = []
+        while remaining:
+            level = sorted(name for name in remaining if not pending_children[name])
+            if not level:
+                logging.warning(f"Reference cycle among {len(remaining)} files; compiling them together")
+                levels.append(sorted(remaining))
+                break
+            levels.append(level)
+            remaining.difference_update(level)
+            for name in remaining:
+                pending_children[name].difference_update(level)
+        return levels
+
 def parse_color_string(color_string):
     """
     Return up to 4 channels (R, G, B, A) if the file has them.
@@ -356,6 +2030,39 @@ def parse_color_string(color_string):
 def color_list_to_string(color_list):
     return '[ ' + ', '.join(str(int(c)) for c in color_list) + ' ]'
 
+def replace_color_text(value_text, new_color):
+    """
+    Replace the numbers of a color array text with `new_color`, keeping the
+    brackets, separators and whitespace. Channels beyond len(new_color)
+    (usually alpha) are left untouched.
+    """
+    parts = []
+    last = 0
+    for i, number in enumerate(re.finditer(r'[\d\.]+', value_text)):
+        if i >= len(new_color):
+            break
+        parts.append(value_text[last:number.start()])
+        parts.append(str(int(new_color[i])))
+        last = number.end()
+    parts.append(value_text[last:])
+    return ''.join(parts)
+
+def apply_span_edits(content, edits):
+    """
+    Apply (start, end, replacement) edits to `content` in one pass.
+    Edits must not overlap; duplicates of the same span are applied once.
+    """
+    parts = []
+    last = 0
+    for start, end, replacement in sorted(set(edits)):
+        if start < last:
+            continue
+        parts.append(content[last:start])
+        parts.append(replacement)
+        last = end
+    parts.append(content[last:])
+    return ''.join(parts)
+
 def rgb_to_hex(color_list):
     if isinstance(color_list, list) and len(color_list) >= 3:
         r, g, b = [int(float(c)) for c in color_list[:3]]
@@ -363,19 +2070,119 @@ def rgb_to_hex(color_list):
     else:
         return '#000000'
 
+def parse_stop_position(stop_text):
+    """The m_flPosition of a gradient stop's text, clamped to 0-1 (0.0 if missing)."""
+    match = re.search(r'm_flPosition\s*=\s*([\d\.]+)', stop_text)
+    try:
+        return min(1.0, max(0.0, float(match.group(1)))) if match else 0.0
+    except ValueError:
+        return 0.0
+
+def even_gradient_stops(colors):
+    """[(position, color)] for colors spread evenly from 0 to 1, as the gradient editor writes them."""
+    last = max(1, len(colors) - 1)
+    return [(i / last, color) for i, color in enumerate(colors)]
+
+def interpolate_gradient(stops, width):
+    """
+    Sample a gradient at `width` evenly spaced points.
+
+    Args:
+        stops (list): (position 0-1, color) pairs in any order
+        width (int): Number of samples
+
+    Returns:
+        list: `width` (r, g, b) tuples, linearly interpolated between stops
+    """
+    stops = sorted((position, ColorIndex.normalize(color)) for position, color in stops)
+    if not stops:
+        return [(0, 0, 0)] * width
+    positions = [position for position, _ in stops]
+    pixels = []
+    for x in range(width):
+        t = x / (width - 1) if width > 1 else 0.0
+        i = bisect.bisect_right(positions, t)
+        if i == 0:
+            pixels.append(stops[0][1])
+        elif i == len(stops):
+            pixels.append(stops[-1][1])
+        else:
+            (p0, c0), (p1, c1) = stops[i - 1], stops[i]
+            f = (t - p0) / (p1 - p0) if p1 > p0 else 0.0
+            pixels.append(tuple(int(round(a + (b - a) * f)) for a, b in zip(c0, c1)))
+    return pixels
+
+class SwatchCache:
+    """
+    PhotoImages for color swatches and gradient strips, shared by every widget
+    that shows the same color or gradient. Each image is filled with a single
+    put() call: one row of pixels tiled over the whole image. The least
+    recently used images are dropped once `limit` is reached; widgets shown
+    through show() keep their own reference, so Tk does not free an evicted
+    image that is still on screen.
+    """
+
+    def __init__(self, limit=SWATCH_CACHE_LIMIT):
+        self.limit = limit
+        self.images = {}  # {key: PhotoImage}, oldest first
+
+    def color(self, color, size=SWATCH_SIZE):
+        rgb = ColorIndex.normalize(color)
+        return self._image(('color', rgb, size), lambda: [rgb], size)
+
+    def gradient(self, stops, size=GRADIENT_STRIP_SIZE):
+        """Interpolated strip for [(position, color)] stops."""
+        key = ('gradient', tuple((float(p), ColorIndex.normalize(c)) for p, c in stops), size)
+        return self._image(key, lambda: interpolate_gradient(stops, size[0]), size)
+
+    def _image(self, key, pixels, size):
+        image = self.images.pop(key, None)
+        if image is None:
+            width, height = size
+            image = tk.PhotoImage(width=width, height=height)
+            row = ' '.join('#%02x%02x%02x' % rgb for rgb in pixels())
+            image.put('{' + row + '}', to=(0, 0, width, height))
+            while len(self.images) >= self.limit:
+                del self.images[next(iter(self.images))]
+        self.images[key] = image
+        return image
+
+    @staticmethod
+    def show(widget, image, **options):
+        """Display `image` on a label and keep it alive for as long as the label shows it."""
+        widget.configure(image=image, **options)
+        widget.swatch_image = image
+        return image
+
+    def clear(self):
+        self.images.clear()
+
+swatch_cache = SwatchCache()
+
+def compiler_command(compiler, file_paths):
+    """
+    Build the argument list for one compiler invocation. Python scripts (such
+    as the benchmark stub compiler) are run with the current interpreter.
+    """
+    if compiler.lower().endswith('.py'):
+        return [sys.executable, compiler] + list(file_paths)
+    return [compiler] + list(file_paths)
+
 # Global compile_file function
 def global_compile_file(file_name, file_name_to_path, compiler_path):
+    import subprocess
     try:
         filename = file_name_to_path[file_name]
         if not os.path.exists(compiler_path):
             raise FileNotFoundError(f"The compiler was not found at: {compiler_path}")
 
-        result = subprocess.run(
-            [compiler_path, filename],
-            check=True,
-            capture_output=True,
-            text=True
-        )
+        with perf_stats.stage("compile.process"):
+            result = subprocess.run(
+                compiler_command(compiler_path, [filename]),
+                check=True,
+                capture_output=True,
+                text=True
+            )
         logging.info(f"Compiled successfully: {filename}")
         return True, result.stdout, result.stderr
     except subprocess.CalledProcessError as e:
@@ -385,6 +2192,839 @@ def global_compile_file(file_name, file_name_to_path, compiler_path):
         logging.error(f"Unexpected error during compilation of {file_name}: {e}")
         return False, None, str(e)
 
+def compile_single_file(file_name, file_path, compiler):
+    """
+    Compile a single file (to be run in the compile thread pool).
+
+    Returns:
+        dict: 'file_name', 'path', 'success', 'message' (one-line summary),
+              'returncode', 'output' (full stdout and stderr), 'started' and
+              'duration' (perf_counter seconds)
+    """
+    import subprocess
+    started = time.perf_counter()
+    result = {
+        'file_name': file_name,
+        'path': file_path,
+        'success': False,
+        'message': "",
+        'returncode': None,
+        'output': "",
+        'started': started,
+        'duration': 0.0,
+    }
+    try:
+        if not os.path.exists(compiler):
+            result['message'] = f"Compiler not found: {compiler}"
+            return result
+
+        with perf_stats.stage("compile.process"):
+            completed = subprocess.run(
+                compiler_command(compiler, [file_path]),
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=COMPILE_TIMEOUT
+            )
+        result['success'] = True
+        result['returncode'] = 0
+        result['message'] = "Success"
+        result['output'] = process_output(completed.stdout, completed.stderr)
+    except subprocess.CalledProcessError as e:
+        result['returncode'] = e.returncode
+        result['message'] = f"Compilation failed: {(e.stderr or '')[:100]}"
+        result['output'] = process_output(e.stdout, e.stderr)
+    except subprocess.TimeoutExpired as e:
+        result['message'] = f"Error: {str(e)}"
+        result['output'] = process_output(e.stdout, e.stderr)
+    except Exception as e:
+        result['message'] = f"Error: {str(e)}"
+    finally:
+        result['duration'] = time.perf_counter() - started
+    return result
+
+def process_output(stdout, stderr):
+    """Combine a compiler's stdout and stderr (str, bytes or None) into one string."""
+    parts = []
+    for stream in (stdout, stderr):
+        if isinstance(stream, bytes):
+            stream = stream.decode('utf-8', errors='replace')
+        if stream:
+            parts.append(stream.rstrip('\n'))
+    return "\n".join(parts)
+
+def get_compile_batch_options(config, compiler):
+    """Return the batching options stored for `compiler`, filled with defaults."""
+    options = dict(DEFAULT_COMPILE_BATCH)
+    options.update(config.get("compiler_batch", {}).get(compiler or "", {}))
+    if options["mode"] not in COMPILE_BATCH_MODES:
+        options["mode"] = "single"
+    options["size"] = max(1, int(options["size"]))
+    return options
+
+def split_batch_output(output, file_paths):
+    """
+    Attribute lines of a batched compiler's combined output to the file they
+    mention. A line naming a file starts that file's section; following lines
+    belong to it until another file is named.
+
+    Returns:
+        dict: {file_path: str}
+    """
+    full_keys = []
+    base_keys = []
+    for path in file_paths:
+        normalized = path.replace('\\', '/').lower()
+        full_keys.append((normalized, path))
+        # A bare file name only counts at the start of a name, so effect_1.vpcf does not match big_effect_1.vpcf
+        base_keys.append((re.compile(r'(?<![\w.\-])' + re.escape(os.path.basename(normalized))), path))
+    full_keys.sort(key=lambda key: len(key[0]), reverse=True)
+
+    sections = {path: [] for path in file_paths}
+    current = None
+    for line in (output or "").splitlines():
+        lowered = line.replace('\\', '/').lower()
+        named = next((path for full, path in full_keys if full in lowered), None)
+        if named is None:
+            named = next((path for pattern, path in base_keys if pattern.search(lowered)), None)
+        if named is not None:
+            current = named
+        if current is not None:
+            sections[current].append(line)
+    return {path: "\n".join(lines) for path, lines in sections.items()}
+
+def batch_section_succeeded(section, file_path):
+    """
+    Return True if a file's share of a failed batch's output clearly reports
+    success: it mentions success and no error. The file's own path and name are
+    ignored so a file called e.g. error_sparks.vpcf is not mistaken for a failure.
+    """
+    text = section.replace('\\', '/')
+    for name in (file_path.replace('\\', '/'), os.path.basename(file_path)):
+        text = re.sub(re.escape(name), ' ', text, flags=re.IGNORECASE)
+    return bool(BATCH_SUCCESS_PATTERN.search(text)) and not BATCH_ERROR_PATTERN.search(text)
+
+def compile_batch(jobs, compiler, batch_options):
+    """
+    Compile several files with one compiler invocation.
+
+    If the invocation fails, its output is split per file: files whose section
+    clearly reports success are kept as compiled, and only the rest (errors or
+    no clear result) are returned in 'retry' so the caller can compile them one
+    by one to get their own exit code and output. If the compiler could not be
+    run at all, every job is retried.
+
+    Returns:
+        dict: 'results' (compile_single_file()-style dicts) and 'retry' (jobs to recompile singly)
+    """
+    import subprocess
+    started = time.perf_counter()
+    paths = [file_path for _, file_path in jobs]
+    list_file = None
+    try:
+        if not os.path.exists(compiler):
+            raise FileNotFoundError(f"Compiler not found: {compiler}")
+
+        if batch_options["mode"] == "filelist":
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+                f.write("\n".join(paths) + "\n")
+                list_file = f.name
+            args = [batch_options["filelist_arg"], list_file] if batch_options["filelist_arg"] else [list_file]
+        else:
+            args = paths
+
+        with perf_stats.stage("compile.batch"):
+            completed = subprocess.run(
+                compiler_command(compiler, args),
+                capture_output=True,
+                text=True,
+                timeout=COMPILE_TIMEOUT * len(jobs)
+            )
+    except Exception as e:
+        logging.warning(f"Batched compile of {len(jobs)} files could not run: {e}")
+        return {'results': [], 'retry': list(jobs)}
+    finally:
+        if list_file:
+            try:
+                os.remove(list_file)
+            except OSError:
+                pass
+
+    # Split the time evenly and keep each file's share of the output
+    duration = time.perf_counter() - started
+    sections = split_batch_output((completed.stdout or "") + "\n" + (completed.stderr or ""), paths)
+    results = []
+    retry = []
+    for file_name, file_path in jobs:
+        if completed.returncode != 0 and not batch_section_succeeded(sections.get(file_path, ""), file_path):
+            retry.append((file_name, file_path))
+            continue
+        results.append({
+            'file_name': file_name,
+            'path': file_path,
+            'success': True,
+            'message': "Success (batched)",
+            'batched': True,
+            'returncode': 0,
+            'started': started,
+            'duration': duration / len(jobs),
+            'output': sections.get(file_path, ""),
+        })
+    if retry:
+        logging.info(f"Batch of {len(jobs)} files failed (exit code {completed.returncode}), "
+                     f"recompiling {len(retry)} singly")
+    return {'results': results, 'retry': retry}
+
+def run_compile_jobs(jobs, compiler, max_workers=DEFAULT_COMPILE_WORKERS, on_result=None, batch_options=None):
+    """
+    Compile files in parallel with a thread pool.
+
+    Args:
+        jobs (list): (file_name, file_path) pairs, submitted in order
+        compiler (str): Path of the compiler executable
+        max_workers (int): Number of concurrent compiler processes
+        on_result (callable): Called as on_result(result, completed, total) from the
+            calling thread as each file finishes. This is the only place the full
+            compiler 'output' is available (e.g. to record it with CompileRun).
+        batch_options (dict): See DEFAULT_COMPILE_BATCH. Files in a failed batch whose
+            output does not clearly report success are recompiled one per process so
+            only the broken ones are reported.
+
+    Returns:
+        dict: 'results' (list of compile_single_file() dicts without 'output'), 'successful',
+              'failed', 'failed_files', 'workers', 'batches', 'retried' and 'wall_time'
+    """
+    jobs = list(jobs)
+    total = len(jobs)
+    batch_options = batch_options or DEFAULT_COMPILE_BATCH
+    batch_size = batch_options["size"] if batch_options["mode"] != "single" else 1
+    if batch_size > 1:
+        units = [jobs[i:i + batch_size] for i in range(0, total, batch_size)]
+    else:
+        units = [[job] for job in jobs]
+    workers = max(1, min(max_workers, len(units)))
+    summary = {
+        'results': [], 'successful': 0, 'failed': 0, 'failed_files': [],
+        'workers': workers, 'batches': 0, 'retried': 0,
+    }
+    started = time.perf_counter()
+
+    def run_single(job):
+        return {'results': [compile_single_file(job[0], job[1], compiler)], 'retry': []}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for unit in units:
+            if len(unit) > 1:
+                summary['batches'] += 1
+                pending.add(executor.submit(compile_batch, unit, compiler, batch_options))
+            else:
+                pending.add(executor.submit(run_single, unit[0]))
+
+        completed = 0
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcome = future.result()
+                for job in outcome['retry']:
+                    summary['retried'] += 1
+                    pending.add(executor.submit(run_single, job))
+                for result in outcome['results']:
+                    completed += 1
+                    if result['success']:
+                        summary['successful'] += 1
+                    else:
+                        summary['failed'] += 1
+                        summary['failed_files'].append(result['file_name'])
+                    if on_result:
+                        on_result(result, completed, total)
+                    # The output lives on disk in the compile history, not for the whole run in memory
+                    result.pop('output', None)
+                    summary['results'].append(result)
+
+    summary['wall_time'] = time.perf_counter() - started
+    return summary
+
+def run_compile_levels(levels, compiler, max_workers=DEFAULT_COMPILE_WORKERS, on_result=None, batch_options=None):
+    """
+    Run run_compile_jobs() once per dependency level, in order, so children are
+    compiled before the parents that reference them.
+
+    Args:
+        levels (list): Lists of (file_name, file_path) jobs, as ordered by ReferenceGraph.levels()
+
+    Returns:
+        dict: Combined run_compile_jobs() summary plus 'levels'
+    """
+    total = sum(len(level) for level in levels)
+    combined = {
+        'results': [], 'successful': 0, 'failed': 0, 'failed_files': [],
+        'workers': 0, 'batches': 0, 'retried': 0, 'levels': len(levels),
+    }
+    offset = 0
+    started = time.perf_counter()
+    for level in levels:
+        if not level:
+            continue
+
+        def level_result(result, completed, _total, offset=offset):
+            if on_result:
+                on_result(result, offset + completed, total)
+
+        summary = run_compile_jobs(level, compiler, max_workers, level_result, batch_options)
+        for key in ('successful', 'failed', 'batches', 'retried'):
+            combined[key] += summary[key]
+        combined['results'].extend(summary['results'])
+        combined['failed_files'].extend(summary['failed_files'])
+        combined['workers'] = max(combined['workers'], summary['workers'])
+        offset += len(level)
+    combined['wall_time'] = time.perf_counter() - started
+    return combined
+
+class CompileDurations:
+    """
+    Persistent per-file compile durations, used to schedule the slowest files
+    first. Stores an exponential moving average per absolute path and
+    estimates unknown files from their size using the average seconds per
+    byte of known files.
+    """
+
+    def __init__(self, path=COMPILE_DURATIONS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._durations = {}  # {path: {'seconds': float, 'size': int}}
+        self._dirty = False
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._durations = json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read compile durations from {path}: {e}")
+
+    def record(self, file_path, seconds):
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        key = os.path.abspath(file_path)
+        with self._lock:
+            previous = self._durations.get(key)
+            if previous:
+                seconds = COMPILE_DURATION_SMOOTHING * seconds + (1 - COMPILE_DURATION_SMOOTHING) * previous['seconds']
+            self._durations[key] = {'seconds': seconds, 'size': size}
+            self._dirty = True
+
+    def expected(self, file_paths):
+        """
+        Returns:
+            dict: {file_path: expected seconds} for every path in `file_paths`
+        """
+        with self._lock:
+            known = list(self._durations.values())
+        total_seconds = sum(d['seconds'] for d in known)
+        total_size = sum(d['size'] for d in known)
+        mean = total_seconds / len(known) if known else 1.0
+        per_byte = total_seconds / total_size if total_size else 0.0
+
+        expected = {}
+        for file_path in file_paths:
+            entry = self._durations.get(os.path.abspath(file_path))
+            if entry:
+                expected[file_path] = entry['seconds']
+            elif per_byte:
+                try:
+                    expected[file_path] = os.path.getsize(file_path) * per_byte
+                except OSError:
+                    expected[file_path] = mean
+            else:
+                expected[file_path] = mean
+        return expected
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(self._durations)
+            self._dirty = False
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except Exception as e:
+            logging.warning(f"Could not save compile durations to {self.path}: {e}")
+
+def order_longest_first(jobs, expected):
+    """Sort (file_name, file_path) jobs by expected duration, slowest first."""
+    return sorted(jobs, key=lambda job: expected.get(job[1], 0.0), reverse=True)
+
+def predict_compile_time(levels, expected, workers):
+    """
+    Predict the wall time of compiling `levels` in order by simulating greedy
+    list scheduling of each level on `workers` workers.
+    """
+    total = 0.0
+    for level in levels:
+        finish_times = [0.0] * max(1, min(workers, len(level)))
+        for _, file_path in level:
+            start = heapq.heappop(finish_times)
+            heapq.heappush(finish_times, start + expected.get(file_path, 0.0))
+        total += max(finish_times) if level else 0.0
+    return total
+
+class CompileRun:
+    """
+    One compile run being recorded by CompileHistory. record() appends each
+    result to the run's file as it arrives and is safe to call from several
+    threads.
+    """
+
+    def __init__(self, path, header):
+        self.path = path
+        self.header = header
+        self._lock = threading.Lock()
+        self.counts = {'passed': 0, 'failed': 0}
+        self.finished = False
+        self._write(header)
+
+    def record(self, result):
+        status = "passed" if result['success'] else "failed"
+        with self._lock:
+            self.counts[status] += 1
+            self._write({
+                'type': 'result',
+                'file': result['file_name'],
+                'path': result['path'],
+                'status': status,
+                'duration': round(result['duration'], 4),
+                'returncode': result['returncode'],
+                'batched': bool(result.get('batched')),
+                'message': result['message'],
+                'output': result.get('output', ""),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            })
+
+    def finish(self, wall_time=None):
+        with self._lock:
+            self.finished = True
+            self._write({
+                'type': 'summary',
+                'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'wall_time': round(wall_time, 3) if wall_time is not None else None,
+                'passed': self.counts['passed'],
+                'failed': self.counts['failed'],
+            })
+
+    def _write(self, record):
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logging.warning(f"Could not write compile history {self.path}: {e}")
+
+class CompileHistory:
+    """
+    Compile runs recorded on disk, one JSON-lines file per run: a header, one
+    line per compiled file (status, duration, exit code, full output) and a
+    summary once the run finishes. Output goes straight to disk instead of
+    staying in memory. Only the newest `limit` runs are kept; runs that are
+    still being recorded (such as the session's "Save and Compile" run) are
+    never pruned, however old they are.
+    """
+
+    def __init__(self, directory, limit=COMPILE_HISTORY_LIMIT):
+        self.directory = directory
+        self.limit = limit
+        self.live = {}  # {run_id: CompileRun} started by this history and maybe not finished
+
+    def start_run(self, title, compiler):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            logging.warning(f"Could not create compile history folder {self.directory}: {e}")
+        now = time.time_ns()
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now // 10**9))}-{now // 1000 % 1000000:06d}"
+        run = CompileRun(os.path.join(self.directory, f"{run_id}.jsonl"), {
+            'type': 'run',
+            'id': run_id,
+            'title': title,
+            'compiler': compiler,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+        self.live[run_id] = run
+        self._prune()
+        return run
+
+    def run_ids(self):
+        """Stored run ids, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted((name[:-len(".jsonl")] for name in os.listdir(self.directory) if name.endswith(".jsonl")),
+                      reverse=True)
+
+    def load_run(self, run_id, with_output=True):
+        """
+        Returns:
+            dict: The run header plus 'results' (list of result records) and
+                  'summary' (None if the run did not finish)
+        """
+        run = {'id': run_id, 'results': [], 'summary': None}
+        with open(os.path.join(self.directory, f"{run_id}.jsonl"), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # partly written line from an interrupted run
+                kind = record.pop('type', None)
+                if kind == 'run':
+                    run.update(record)
+                elif kind == 'result':
+                    if not with_output:
+                        record.pop('output', None)
+                    run['results'].append(record)
+                elif kind == 'summary':
+                    run['summary'] = record
+        return run
+
+    def load_runs(self, run_ids=None, with_output=True):
+        runs = []
+        for run_id in (run_ids if run_ids is not None else self.run_ids()):
+            try:
+                runs.append(self.load_run(run_id, with_output))
+            except OSError as e:
+                logging.warning(f"Could not read compile run {run_id}: {e}")
+        return runs
+
+    def _prune(self):
+        for run_id in [run_id for run_id, run in self.live.items() if run.finished]:
+            del self.live[run_id]
+        for run_id in self.run_ids()[self.limit:]:
+            if run_id in self.live:
+                continue
+            try:
+                os.remove(os.path.join(self.directory, f"{run_id}.jsonl"))
+            except OSError as e:
+                logging.warning(f"Could not remove old compile run {run_id}: {e}")
+
+def compile_runs_to_junit(runs):
+    """JUnit XML (as a string) with one <testsuite> per run and one <testcase> per file."""
+    import xml.etree.ElementTree as ET
+    suites = ET.Element('testsuites')
+    for run in runs:
+        results = run['results']
+        failures = sum(1 for r in results if r['status'] != "passed")
+        suite = ET.SubElement(suites, 'testsuite', {
+            'name': run.get('title', run['id']),
+            'id': run['id'],
+            'tests': str(len(results)),
+            'failures': str(failures),
+            'errors': "0",
+            'time': f"{sum(r['duration'] for r in results):.3f}",
+            'timestamp': run.get('started', ""),
+        })
+        for r in results:
+            case = ET.SubElement(suite, 'testcase', {
+                'classname': os.path.dirname(r['file']).replace(os.sep, '.').replace('/', '.') or "vpcf",
+                'name': os.path.basename(r['file']),
+                'file': r['path'],
+                'time': f"{r['duration']:.3f}",
+            })
+            if r['status'] != "passed":
+                failure = ET.SubElement(case, 'failure', {
+                    'message': r['message'],
+                    'type': f"exit code {r['returncode']}" if r['returncode'] is not None else "error",
+                })
+                failure.text = r.get('output', "")
+            elif r.get('output'):
+                ET.SubElement(case, 'system-out').text = r['output']
+    ET.indent(suites)
+    return ET.tostring(suites, encoding='unicode', xml_declaration=True)
+
+def write_compile_report(runs, path):
+    """Write runs as JUnit XML (.xml) or JSON (any other extension)."""
+    if path.lower().endswith('.xml'):
+        report = compile_runs_to_junit(runs)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'runs': runs}, f, indent=2)
+
+class CompileQueue:
+    """
+    Background compile queue used by "Save and Compile".
+
+    Compiles run on a bounded thread pool. Requests are coalesced per file: a
+    file that is already waiting is not queued twice, and a file saved again
+    while it is compiling is compiled once more after the current run
+    finishes. `on_status(event, file_name, result)` is called from worker
+    threads with event "queued", "started" or "finished".
+    """
+
+    def __init__(self, max_workers=DEFAULT_COMPILE_QUEUE_WORKERS, on_status=None):
+        self.on_status = on_status
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compile-queue")
+        self._lock = threading.Lock()
+        self._queued = set()
+        self._running = set()
+        self._rerun = {}  # {file_name: (file_path, compiler)} saved again while compiling
+
+    def submit(self, file_name, file_path, compiler):
+        """
+        Queue a compile of `file_path`.
+
+        Returns:
+            bool: False if the request was coalesced into one already pending
+        """
+        with self._lock:
+            if file_name in self._queued:
+                return False
+            if file_name in self._running:
+                self._rerun[file_name] = (file_path, compiler)
+                return False
+            self._queued.add(file_name)
+        self._notify("queued", file_name, None)
+        self._executor.submit(self._run, file_name, file_path, compiler)
+        return True
+
+    def pending(self):
+        """Number of files queued or compiling."""
+        with self._lock:
+            return len(self._queued) + len(self._running)
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, file_name, file_path, compiler):
+        with self._lock:
+            self._queued.discard(file_name)
+            self._running.add(file_name)
+        self._notify("started", file_name, None)
+        result = compile_single_file(file_name, file_path, compiler)
+        if result['success']:
+            logging.info(f"Compiled successfully: {file_path}")
+        else:
+            logging.error(f"Compilation failed for {file_name}: {result['message']}")
+
+        with self._lock:
+            self._running.discard(file_name)
+            rerun = self._rerun.pop(file_name, None)
+        self._notify("finished", file_name, result)
+        if rerun:
+            self.submit(file_name, *rerun)
+
+    def _notify(self, event, file_name, result):
+        if self.on_status:
+            try:
+                self.on_status(event, file_name, result)
+            except Exception as e:
+                logging.warning(f"Compile status callback failed: {e}")
+
+def color_field_edits(field_colors):
+    """
+    Span edits that write new colors into their fields: one (start, end,
+    replacement) per changed channel number, so the brackets, separators and
+    whitespace around the numbers keep their formatting. Fields whose color
+    did not change produce no edits. Where a gradient stop and a scalar
+    m_Color match cover the same numbers, the gradient stop wins.
+
+    Args:
+        field_colors (list): (field, new_color) pairs, fields as returned by find_color_fields()
+
+    Returns:
+        list: Sorted, non-overlapping (start, end, replacement) edits
+    """
+    edits = []
+    claimed = set()
+    for field, new_color in sorted(field_colors, key=lambda pair: pair[0]['type'] != 'gradient'):
+        if not new_color:
+            continue
+        value = field['value']
+        if list(new_color) == parse_color_string(value)[:len(new_color)]:
+            continue
+        for i, number in enumerate(re.finditer(r'[\d\.]+', value)):
+            if i >= len(new_color):
+                break
+            span = (field['value_start'] + number.start(), field['value_start'] + number.end())
+            if span in claimed:
+                continue
+            claimed.add(span)
+            replacement = str(int(new_color[i]))
+            if replacement != number.group():
+                edits.append(span + (replacement,))
+    edits.sort()
+    return edits
+
+def update_field_colors(content, field_colors):
+    """
+    Rewrite the given color fields in `content`, preserving the original
+    formatting of scalar fields and gradient stops.
+
+    Args:
+        content (str): Current file content
+        field_colors (list): (field, new_color) pairs, fields as returned by find_color_fields()
+
+    Returns:
+        str: The updated content
+    """
+    return apply_span_edits(content, color_field_edits(field_colors))
+
+def shift_color_fields(color_fields, new_content, edits):
+    """
+    Move color field records onto `new_content`, which is their content with
+    `edits` (sorted, non-overlapping (start, end, replacement)) applied, by
+    shifting every span that follows an edit.
+
+    Returns:
+        list: New ColorField records, or None if a field boundary falls inside an edit
+    """
+    ends = []
+    shifts = []
+    total = 0
+    for start, end, replacement in edits:
+        total += len(replacement) - (end - start)
+        ends.append(end)
+        shifts.append(total)
+
+    def moved(position):
+        if position is None:
+            return None
+        i = bisect.bisect_right(ends, position)
+        if i < len(edits) and edits[i][0] < position:
+            raise ValueError(position)
+        return position + (shifts[i - 1] if i else 0)
+
+    try:
+        return [
+            ColorField(
+                field.type, new_content, field.filename, moved(field.start), moved(field.end),
+                moved(field.value_start), moved(field.value_end), raw_name=field.raw_name,
+                stop_start=moved(field.stop_start), stop_end=moved(field.stop_end),
+                gradient_block_index=field.gradient_block_index, stop_index=field.stop_index
+            )
+            for field in color_fields
+        ]
+    except ValueError:
+        return None
+
+def reindex_after_edits(color_fields, new_content, edits, filename, verify=False):
+    """
+    Color fields of `filename` after a save, found by shifting the old records
+    past `edits` instead of re-parsing the file. Falls back to
+    find_color_fields() when the edits cannot be mapped. With `verify`, the
+    shifted records are also checked against a full re-parse and any mismatch
+    is logged and resolved in favor of the re-parse.
+    """
+    fields = shift_color_fields(color_fields, new_content, edits)
+    if fields is None:
+        logging.debug(f"Edits in {filename} split a field span; re-parsing")
+        return find_color_fields(new_content, filename)
+    if verify:
+        parsed = find_color_fields(new_content, filename)
+        if fields != parsed:
+            logging.error(f"Incremental re-index of {filename} differs from a full re-parse "
+                          f"({len(fields)} vs {len(parsed)} fields); using the re-parse")
+            return parsed
+        logging.debug(f"Incremental re-index of {filename} verified ({len(fields)} fields)")
+    return fields
+
+def replace_gradient_blocks(content, gradients_to_apply):
+    """
+    Replace the stops of every gradient block in `content` with evenly spaced
+    stops of the given colors, reusing the formatting of the existing stops.
+    """
+    def replace_gradient_block(match):
+        prefix = match.group(1)
+        gradient_block_content = match.group(2)
+        suffix = match.group(3)
+
+        gradient_stop_pattern = re.compile(
+            r'(\s*\{.*?m_flPosition\s*=\s*[\d\.]+.*?m_Color\s*=\s*(\[[^\]]*\]|\[.*?\])\s*\}[\s,]*)',
+            re.DOTALL
+        )
+        stops = gradient_stop_pattern.findall(gradient_block_content)
+        stop_formats = [full_stop for (full_stop, color_array) in stops]
+
+        num_new_stops = len(gradients_to_apply)
+        new_stops = []
+
+        for i in range(num_new_stops):
+            position = i / (num_new_stops - 1) if num_new_stops > 1 else 0.0
+            position_str = f"{position:.6f}"
+            if i < len(stop_formats):
+                existing_stop = stop_formats[i]
+                existing_stop = re.sub(
+                    r'(m_flPosition\s*=\s*)([\d\.]+)',
+                    lambda m: f"{m.group(1)}{position_str}",
+                    existing_stop
+                )
+                existing_stop = re.sub(
+                    r'(m_Color\s*=\s*)(\[[^\]]*\])',
+                    lambda m: f"{m.group(1)}{color_list_to_string(gradients_to_apply[i])}",
+                    existing_stop
+                )
+                new_stops.append(existing_stop)
+            else:
+                last_stop = stop_formats[-1]
+                new_stop = re.sub(
+                    r'(m_flPosition\s*=\s*)([\d\.]+)',
+                    lambda m: f"{m.group(1)}{position_str}",
+                    last_stop
+                )
+                new_stop = re.sub(
+                    r'(m_Color\s*=\s*)(\[[^\]]*\])',
+                    lambda m: f"{m.group(1)}{color_list_to_string(gradients_to_apply[i])}",
+                    new_stop
+                )
+                new_stops.append(new_stop)
+
+        new_gradient_block_content = ''.join(new_stops)
+        return prefix + new_gradient_block_content + suffix
+
+    return gradient_pattern.sub(replace_gradient_block, content)
+
+def scalar_color_edits(content, fields_to_apply):
+    """
+    Span edits that set every occurrence of the given scalar fields to a fixed
+    color, replacing the whole bracketed value.
+
+    Args:
+        content (str): File content
+        fields_to_apply (dict): {raw_name: [R, G, B(, A)]}
+
+    Returns:
+        list: Sorted, non-overlapping (start, end, replacement) edits
+    """
+    replacements = {}
+    for raw_name, color in fields_to_apply.items():
+        color_str = color_list_to_string(color)
+        pat = re.compile(
+            rf'(\b{re.escape(raw_name)}\s*=\s*)(\[[^\]]*\])',
+            re.IGNORECASE | re.MULTILINE
+        )
+        for match in pat.finditer(content):
+            replacements[match.span(2)] = color_str  # A later field name wins, as it did with re.sub
+    return sorted(
+        (start, end, color_str) for (start, end), color_str in replacements.items()
+        if content[start:end] != color_str
+    )
+
+def apply_colors_to_content(content, fields_to_apply, gradients_to_apply=None):
+    """
+    Set every occurrence of the given scalar fields to a fixed color and,
+    optionally, replace all gradient blocks. Used by "Apply to All".
+
+    Args:
+        content (str): File content
+        fields_to_apply (dict): {raw_name: [R, G, B(, A)]}
+        gradients_to_apply (list): Gradient stop colors, or None to leave gradients alone
+
+    Returns:
+        str: The updated content
+    """
+    new_content = apply_span_edits(content, scalar_color_edits(content, fields_to_apply))
+    if gradients_to_apply:
+        new_content = replace_gradient_blocks(new_content, gradients_to_apply)
+    return new_content
+
 def edit_gradients(apply_widgets, gradient_var_apply):
     try:
         start_color = colorchooser.askcolor(title="Choose Start Color", parent=root)[0]
@@ -419,17 +3059,11 @@ def edit_gradients(apply_widgets, gradient_var_apply):
             preview_window.title("Gradient Preview")
             preview_window.geometry("500x300")
 
-            # Canvas to display the gradient
+            # Canvas to display the interpolated gradient
             gradient_canvas = tk.Canvas(preview_window, width=480, height=100, bg="white")
             gradient_canvas.pack(pady=10)
-            stop_width = 480 // len(interpolated_colors)
-
-            for i, color in enumerate(interpolated_colors):
-                color_hex = rgb_to_hex(color)
-                gradient_canvas.create_rectangle(
-                    i * stop_width, 0, (i + 1) * stop_width, 100,
-                    fill=color_hex, outline=""
-                )
+            gradient_canvas.swatch_image = swatch_cache.gradient(even_gradient_stops(interpolated_colors), size=(480, 100))
+            gradient_canvas.create_image(0, 0, anchor='nw', image=gradient_canvas.swatch_image)
 
             # Redo the gradient selection process
             def redo_gradient():
@@ -463,6 +3097,10 @@ def edit_gradients(apply_widgets, gradient_var_apply):
             # Apply the gradient and store it for batch application
             def apply_gradient():
                 apply_widgets["gradient_editor"]["new_color"] = interpolated_colors
+                swatch_cache.show(
+                    apply_widgets["gradient_editor"]["color_label"],
+                    swatch_cache.gradient(even_gradient_stops(interpolated_colors)), text=""
+                )
                 gradient_var_apply.set(1)  # Automatically check "Apply"
                 preview_window.destroy()
                 messagebox.showinfo(
@@ -493,7 +3131,7 @@ def backup_file(filename):
         logging.info(f"Backup already exists: {backup_filename}")
 
 
-def show_gui(root, vpcf_files, parent_folder):
+def show_gui(root, vpcf_files, parent_folder, extra_roots=()):
     try:
         apply_widgets = {}  # Holds the widgets for the "Apply to All" section
         widgets = []        # Holds per-field widgets for the current file
@@ -504,7 +3142,13 @@ def show_gui(root, vpcf_files, parent_folder):
         files_content = {}
         all_color_fields = []
         unique_fields = {}
+        vpcf_paths = {}     # every scanned file, including those without color fields
+        reference_graph = ReferenceGraph()
+        color_index = ColorIndex()
+        text_index = TextIndex()
+        verify_reindex = load_config().get("verify_incremental_index", False)  # Debug: re-parse after saves to check the shifted spans
         current_file_index = [0]
+        workspace_roots = [parent_folder] + [r for r in extra_roots if r != parent_folder]
 
         # Define themes
         themes = {
@@ -533,6 +3177,14 @@ def show_gui(root, vpcf_files, parent_folder):
         style = Style()
         style.theme_use('clam')
 
+        # ========== Status bar (non-modal feedback, e.g. background compiles) ==========
+        status_var = StringVar(value="Ready")
+        status_bar = Label(root, textvariable=status_var, anchor='w', relief='sunken', padx=5)
+        status_bar.pack(side='bottom', fill='x')
+
+        def set_status(message):
+            status_var.set(message)
+
         # ========== Create a main horizontal PanedWindow ==========
         main_pane = PanedWindow(root, orient='horizontal')
         main_pane.pack(fill='both', expand=True)
@@ -560,10 +3212,23 @@ def show_gui(root, vpcf_files, parent_folder):
         listbox_scrollbar = Scrollbar(left_frame, orient='vertical', command=listbox_files.yview)
         listbox_files.configure(yscrollcommand=listbox_scrollbar.set)
         listbox_scrollbar.grid(row=2, column=1, sticky='ns')
+
+        # Directory mode: the listbox stays the ordered model behind filtering and Next/Previous,
+        # the tree only mirrors it and creates a folder's children when it is first expanded.
+        file_tree = ttk.Treeview(left_frame, columns=("files", "fields"), show='tree headings', selectmode='browse')
+        file_tree.heading('#0', text="Folder / File")
+        file_tree.heading("files", text="Files")
+        file_tree.heading("fields", text="Color Fields")
+        file_tree.column("files", width=60, anchor='e', stretch=False)
+        file_tree.column("fields", width=90, anchor='e', stretch=False)
+        tree_scrollbar = Scrollbar(left_frame, orient='vertical', command=file_tree.yview)
+        file_tree.configure(yscrollcommand=tree_scrollbar.set)
+        directory_tree = [None]
+        tree_view_var = IntVar(value=1 if load_config().get("file_tree_view", False) else 0)
         btn_downgrade = Button(
             left_frame,
             text="Downgrade VPCF Files",
-            command=lambda: downgrade_vpcf_files(parent_folder),
+            command=lambda: downgrade_vpcf_files(list(workspace_roots)),
             bg="#f44336", # Красный цвет для заметности
             fg="white"
         )
@@ -613,7 +3278,7 @@ def show_gui(root, vpcf_files, parent_folder):
         scrollbar_colors.grid(row=0, column=1, sticky='ns')
         canvas.configure(yscrollcommand=scrollbar_colors.set)
 
-        inner_frame = tk.Frame(canvas)
+        inner_frame = ttk.Frame(canvas)
         canvas.create_window((0, 0), window=inner_frame, anchor='nw')
         inner_frame.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
 
@@ -635,7 +3300,7 @@ def show_gui(root, vpcf_files, parent_folder):
         apply_scrollbar.grid(row=1, column=1, sticky='ns')
         apply_canvas.configure(yscrollcommand=apply_scrollbar.set)
 
-        apply_inner_frame = tk.Frame(apply_canvas)
+        apply_inner_frame = ttk.Frame(apply_canvas)
         apply_canvas.create_window((0, 0), window=apply_inner_frame, anchor='nw')
         apply_inner_frame.bind('<Configure>', lambda e: apply_canvas.configure(scrollregion=apply_canvas.bbox('all')))
 
@@ -853,20 +3518,47 @@ def show_gui(root, vpcf_files, parent_folder):
         btn_reload_text.config(command=lambda: load_text_into_editor(selected_file.get()))
         btn_save_text.config(command=lambda: save_text_from_editor(selected_file.get()))
 
+        def index_file(file_name, color_fields):
+            """Update the project-wide indexes for one file."""
+            color_index.update_file(file_name, color_fields)
+            with perf_stats.stage("index.text"):
+                text_index.update_file(file_name, files_content[file_name])
+
+        def apply_scan(scan):
+            """Replace the loaded file data with the result of scan_vpcf_files()."""
+            nonlocal reference_graph
+            file_name_to_path.clear()
+            files_content.clear()
+            all_color_fields.clear()
+            unique_fields.clear()
+            vpcf_paths.clear()
+            file_name_to_path.update(scan['file_name_to_path'])
+            files_content.update(scan['files_content'])
+            all_color_fields.extend(scan['all_color_fields'])
+            unique_fields.update(scan['unique_fields'])
+            vpcf_paths.update(scan['vpcf_paths'])
+            reference_graph = ReferenceGraph.build(scan['references'], scan['vpcf_paths'])
+
+            color_index.clear()
+            fields_by_file = {}
+            for field in all_color_fields:
+                fields_by_file.setdefault(field['filename'], []).append(field)
+            for fn, fields in fields_by_file.items():
+                color_index.update_file(fn, fields)
+
+            # The text index is built off the UI thread; searches check unindexed files directly
+            text_index.set_contents(files_content, vpcf_paths)
+            threading.Thread(target=text_index.index_pending, daemon=True).start()
+
         # Process each file and include only those with color fields
-        for file_path in vpcf_files:
-            file_name = os.path.relpath(file_path, parent_folder)
-            content = read_file(file_path)
-            color_fields = find_color_fields(content, file_name)
-            if color_fields:
-                file_name_to_path[file_name] = file_path
-                files_content[file_name] = content
-                all_color_fields.extend(color_fields)
-                for field in color_fields:
-                    if field['type'] == 'color':
-                        unique_fields[field['raw_name']] = field['field_name']
-            else:
-                logging.info(f"File skipped (no color fields): {file_name}")
+        read_concurrency = load_config().get("read_concurrency", DEFAULT_READ_CONCURRENCY)
+        if len(workspace_roots) == 1 and read_concurrency <= 1:
+            apply_scan(scan_vpcf_files(vpcf_files, parent_folder))
+        else:
+            # main() already walked the main folder; only the extra roots are discovered here
+            apply_scan(scan_workspace(
+                workspace_roots, read_concurrency=read_concurrency, discovered={parent_folder: vpcf_files}
+            ))
 
         if not file_name_to_path:
             messagebox.showinfo("No Color Fields Found", "No VPCF files with color fields found in the selected folder.", parent=root)
@@ -877,43 +3569,91 @@ def show_gui(root, vpcf_files, parent_folder):
             """Change the folder and reload files."""
             new_folder = filedialog.askdirectory(title="Select Parent Folder", parent=root)
             if new_folder:
-                folder_path[0] = new_folder
-                config = load_config()
-                config["folder_path"] = new_folder
-                save_config(config)
                 reload_files(new_folder)
 
         def reload_files(new_folder):
-            """Reload VPCF files from a new folder."""
-            global root
-            try:
-                vpcf_files_new = find_vpcf_files(new_folder)
-                if not vpcf_files_new:
-                    messagebox.showinfo("No Files Found", "No VPCF files found in the selected folder.", parent=root)
-                    return
+            """Make `new_folder` the main workspace folder and reload."""
+            if not find_vpcf_files(new_folder):
+                messagebox.showinfo("No Files Found", "No VPCF files found in the selected folder.", parent=root)
+                return
 
-                config = load_config()
-                config["folder_path"] = new_folder
-                save_config(config)
+            folder_path[0] = new_folder
+            workspace_roots[:] = [new_folder] + [r for r in workspace_roots[1:] if r != new_folder]
+            config = load_config()
+            config["folder_path"] = new_folder
+            save_config(config)
+            reload_workspace()
+
+        workspace_scan = {'running': False}
 
-                file_name_to_path.clear()
-                files_content.clear()
-                all_color_fields.clear()
-                unique_fields.clear()
-
-                for file_path in vpcf_files_new:
-                    fn = os.path.relpath(file_path, new_folder)
-                    c = read_file(file_path)
-                    cf = find_color_fields(c, fn)
-                    if cf:
-                        file_name_to_path[fn] = file_path
-                        files_content[fn] = c
-                        all_color_fields.extend(cf)
-                        for field in cf:
-                            if field['type'] == 'color':
-                                unique_fields[field['raw_name']] = field['field_name']
+        def reload_workspace():
+            """
+            Rescan every workspace folder on a background thread. Files are added
+            to the list as they are parsed; the loaded data is replaced once the
+            scan has finished.
+            """
+            if workspace_scan['running']:
+                return
+            workspace_scan['running'] = True
+            results = queue.Queue()
+            roots = list(workspace_roots)
+            read_concurrency = load_config().get("read_concurrency", DEFAULT_READ_CONCURRENCY)
+
+            def on_file(file_name, color_fields):
+                if color_fields:
+                    results.put(('file', file_name))
+
+            def scan_thread():
+                try:
+                    with perf_stats.stage("scan.workspace"):
+                        scan = scan_workspace(roots, read_concurrency=read_concurrency, on_file=on_file)
+                    results.put(('done', scan))
+                except Exception as e:
+                    logging.exception("An error occurred while scanning the workspace.")
+                    results.put(('error', e))
+
+            listbox_files.delete(0, END)
+            listbox_files.config(state='disabled')
+            file_tree.delete(*file_tree.get_children())
+            set_status("Scanning...")
+            threading.Thread(target=scan_thread, daemon=True).start()
+            root.after(SCAN_POLL_INTERVAL, lambda: poll_workspace_scan(results, 0))
+
+        def poll_workspace_scan(results, found):
+            arrived = []
+            finished = None
+            try:
+                while finished is None:
+                    kind, payload = results.get_nowait()
+                    if kind == 'file':
+                        arrived.append(payload)
                     else:
-                        logging.info(f"File skipped (no color fields): {fn}")
+                        finished = (kind, payload)
+            except queue.Empty:
+                pass
+
+            listbox_files.config(state='normal')
+            if arrived:
+                listbox_files.insert(END, *arrived)
+                found += len(arrived)
+            if finished is not None:
+                workspace_scan['running'] = False
+                kind, payload = finished
+                if kind == 'done':
+                    finish_workspace_scan(payload)
+                else:
+                    populate_listbox()
+                    set_status("Scan failed")
+                    messagebox.showerror("Error", f"An error occurred while reloading files:\n{payload}", parent=root)
+                return
+            listbox_files.config(state='disabled')
+            set_status(f"Scanning... {found} files with color fields so far")
+            root.after(SCAN_POLL_INTERVAL, lambda: poll_workspace_scan(results, found))
+
+        def finish_workspace_scan(scan):
+            try:
+                apply_scan(scan)
+                set_status(f"Loaded {len(file_name_to_path)} files with color fields")
 
                 if not file_name_to_path:
                     messagebox.showinfo("No Color Fields Found", "No VPCF files with color fields found in the selected folder.", parent=root)
@@ -928,10 +3668,59 @@ def show_gui(root, vpcf_files, parent_folder):
                 logging.exception("An error occurred while reloading files.")
                 messagebox.showerror("Error", f"An error occurred while reloading files:\n{e}", parent=root)
 
+        def show_workspace_window():
+            """Add or remove extra root folders that are loaded alongside the main folder."""
+            workspace_window = tk.Toplevel(root)
+            workspace_window.title("Workspace Folders")
+            workspace_window.geometry("560x300")
+
+            Label(workspace_window, text="Files from all folders are listed together, prefixed with the folder name.",
+                  anchor='w').pack(fill='x', padx=5, pady=5)
+            roots_listbox = tk.Listbox(workspace_window, selectmode=SINGLE, exportselection=False)
+            roots_listbox.pack(fill='both', expand=True, padx=5)
+
+            def refresh_roots():
+                roots_listbox.delete(0, END)
+                for index, root_folder in enumerate(workspace_roots):
+                    roots_listbox.insert(END, f"{root_folder} (main folder)" if index == 0 else root_folder)
+
+            def store_roots():
+                config = load_config()
+                config["workspace_roots"] = list(workspace_roots[1:])
+                save_config(config)
+                reload_workspace()
+                refresh_roots()
+
+            def add_root():
+                new_root = filedialog.askdirectory(title="Add Folder to Workspace", parent=workspace_window)
+                if not new_root:
+                    return
+                if new_root in workspace_roots:
+                    messagebox.showinfo("Workspace Folders", "That folder is already in the workspace.", parent=workspace_window)
+                    return
+                workspace_roots.append(new_root)
+                store_roots()
+
+            def remove_root():
+                selection = roots_listbox.curselection()
+                if not selection:
+                    return
+                if selection[0] == 0:
+                    messagebox.showinfo("Workspace Folders", "Use Settings > Change Folder to replace the main folder.", parent=workspace_window)
+                    return
+                del workspace_roots[selection[0]]
+                store_roots()
+
+            button_row = tk.Frame(workspace_window)
+            button_row.pack(fill='x', padx=5, pady=5)
+            Button(button_row, text="Add Folder...", command=add_root).pack(side='left', padx=5)
+            Button(button_row, text="Remove", command=remove_root).pack(side='left', padx=5)
+            refresh_roots()
+
         def populate_listbox():
             listbox_files.delete(0, END)
-            for fn in sorted(file_name_to_path.keys()):
-                listbox_files.insert(END, fn)
+            listbox_files.insert(END, *sorted(file_name_to_path.keys()))
+            refresh_file_tree()
             if listbox_files.size() > 0:
                 listbox_files.select_set(0)
                 on_file_select()
@@ -944,13 +3733,91 @@ def show_gui(root, vpcf_files, parent_folder):
         def filter_files():
             search_text = search_var.get().lower()
             listbox_files.delete(0, END)
-            for fn in sorted(file_name_to_path.keys()):
-                if search_text in fn.lower():
-                    listbox_files.insert(END, fn)
+            listbox_files.insert(END, *[fn for fn in sorted(file_name_to_path.keys()) if search_text in fn.lower()])
+            refresh_file_tree()
             if listbox_files.size() > 0:
                 listbox_files.select_set(0)
                 on_file_select()
 
+        def show_file_view():
+            """Grid either the flat file list or the directory tree into the file panel."""
+            if tree_view_var.get():
+                listbox_files.grid_remove()
+                listbox_scrollbar.grid_remove()
+                file_tree.grid(row=2, column=0, sticky='nsew', padx=5, pady=5)
+                tree_scrollbar.grid(row=2, column=1, sticky='ns')
+            else:
+                file_tree.grid_remove()
+                tree_scrollbar.grid_remove()
+                listbox_files.grid(row=2, column=0, sticky='nsew', padx=5, pady=5)
+                listbox_scrollbar.grid(row=2, column=1, sticky='ns')
+
+        def toggle_tree_view():
+            config = load_config()
+            config["file_tree_view"] = bool(tree_view_var.get())
+            save_config(config)
+            show_file_view()
+            refresh_file_tree()
+
+        def refresh_file_tree():
+            """Rebuild the directory tree from the (filtered) file list. Only top-level nodes are created."""
+            file_tree.delete(*file_tree.get_children())
+            if not tree_view_var.get():
+                directory_tree[0] = None
+                return
+            with perf_stats.stage("ui.file_tree"):
+                names = listbox_files.get(0, END)
+                field_counts = {fn: len(color_index.entries.get(fn, ())) for fn in names}
+                directory_tree[0] = DirectoryTree(names, field_counts)
+                insert_tree_children('')
+            sync_tree_selection()
+
+        def insert_tree_children(folder):
+            tree = directory_tree[0]
+            parent = f"dir:{folder}" if folder else ''
+            for kind, path in tree.children(folder):
+                if kind == 'dir':
+                    files, fields = tree.counts[path]
+                    file_tree.insert(parent, END, iid=f"dir:{path}", text=tree.name(path), values=(files, fields))
+                    file_tree.insert(f"dir:{path}", END, iid=f"stub:{path}")  # Placeholder so the folder can be expanded
+                else:
+                    file_tree.insert(parent, END, iid=f"file:{path}", text=tree.name(path),
+                                     values=("", tree.field_counts.get(path, 0)))
+
+        def expand_tree_folder(folder):
+            stub = f"stub:{folder}"
+            if file_tree.exists(stub):
+                file_tree.delete(stub)
+                insert_tree_children(folder)
+
+        def on_tree_open(event=None):
+            item = file_tree.focus()
+            if item.startswith("dir:"):
+                expand_tree_folder(item[len("dir:"):])
+
+        def on_tree_select(event=None):
+            selection = file_tree.selection()
+            item = selection[0] if selection else ""
+            if item.startswith("file:") and item[len("file:"):] != selected_file.get():
+                select_file(item[len("file:"):])
+
+        def sync_tree_selection():
+            """Reveal and select the current file in the tree, expanding its folders on demand."""
+            tree = directory_tree[0]
+            file_name = selected_file.get()
+            if tree is None or file_name not in tree.files:
+                return
+            for folder in tree.ancestors(file_name):
+                expand_tree_folder(folder)
+                file_tree.item(f"dir:{folder}", open=True)
+            item = f"file:{file_name}"
+            file_tree.focus(item)
+            file_tree.selection_set(item)
+            file_tree.see(item)
+
+        file_tree.bind('<<TreeviewOpen>>', on_tree_open)
+        file_tree.bind('<<TreeviewSelect>>', on_tree_select)
+
         def on_file_select(event=None):
             selection = listbox_files.curselection()
             if selection:
@@ -961,10 +3828,43 @@ def show_gui(root, vpcf_files, parent_folder):
                 logging.info(f"File selected: {file_name}")
                 load_vpcf_file(file_name)
                 load_text_into_editor(file_name)  # Load into raw text tab as well
+                sync_tree_selection()
 
         listbox_files.bind('<<ListboxSelect>>', on_file_select)
 
+        file_context_menu = Menu(root, tearoff=0)
+
+        def show_file_context_menu(event):
+            index = listbox_files.nearest(event.y)
+            if index < 0 or index >= listbox_files.size():
+                return
+            popup_file_context_menu(listbox_files.get(index), event)
+
+        def show_tree_context_menu(event):
+            item = file_tree.identify_row(event.y)
+            if item.startswith("file:"):
+                popup_file_context_menu(item[len("file:"):], event)
+
+        def popup_file_context_menu(file_name, event):
+            file_context_menu.delete(0, END)
+            file_context_menu.add_command(
+                label="Compile Effect Tree",
+                command=lambda: compile_effect_tree(file_name)
+            )
+            file_context_menu.add_command(
+                label="Compile Effect Tree with Parents",
+                command=lambda: compile_effect_tree(file_name, include_parents=True)
+            )
+            file_context_menu.tk_popup(event.x_root, event.y_root)
+
+        listbox_files.bind('<Button-3>', show_file_context_menu)
+        file_tree.bind('<Button-3>', show_tree_context_menu)
+
         def load_vpcf_file(filename):
+            with perf_stats.stage("ui.build_fields"):
+                build_file_view(filename)
+
+        def build_file_view(filename):
             nonlocal content, widgets
             widgets = []
             try:
@@ -984,23 +3884,39 @@ def show_gui(root, vpcf_files, parent_folder):
             lbl_current_file.config(text=f"Editing: {filename}")
 
             if not color_fields:
-                Label(inner_frame, text="No color fields found in this file.", anchor='w', fg='red').grid(row=0, column=0, sticky='w', pady=2)
+                ttk.Label(inner_frame, text="No color fields found in this file.", anchor='w', style="Error.TLabel").grid(row=0, column=0, sticky='w', pady=2)
                 return
 
             row = 0
             field_counter = {}
+            gradient_strips = {}  # {gradient block index: (strip label, widget positions of its stops)}
+
+            def show_gradient_strip(block):
+                strip, positions = gradient_strips[block]
+                stops = [(parse_stop_position(widgets[i]['field']['full_match']), widgets[i]['new_color'])
+                         for i in positions]
+                swatch_cache.show(strip, swatch_cache.gradient(stops))
+
             for idx, field in enumerate(color_fields):
                 if field['type'] == 'gradient':
                     display_name = field['field_name']
+                    block = field['gradient_block_index']
+                    if block not in gradient_strips:
+                        ttk.Label(inner_frame, text=f"Gradient Block {block}", anchor='w').grid(row=row, column=0, sticky='w', pady=2)
+                        strip = ttk.Label(inner_frame, relief='groove')
+                        strip.grid(row=row, column=1, columnspan=2, sticky='w', padx=5)
+                        gradient_strips[block] = (strip, [])
+                        row += 1
+                    gradient_strips[block][1].append(idx)
                 else:
                     field_name = field['field_name']
                     field_counter[field_name] = field_counter.get(field_name, 0) + 1
                     display_name = f"{field_name} {field_counter[field_name]}"
 
-                Label(inner_frame, text=display_name, anchor='w').grid(row=row, column=0, sticky='w', pady=2)
+                ttk.Label(inner_frame, text=display_name, anchor='w').grid(row=row, column=0, sticky='w', pady=2)
                 current_color = parse_color_string(field['value'])
-                current_color_hex = rgb_to_hex(current_color)
-                color_label = Label(inner_frame, text='    ', bg=current_color_hex, relief='groove')
+                color_label = ttk.Label(inner_frame, relief='groove')
+                swatch_cache.show(color_label, swatch_cache.color(current_color))
                 color_label.grid(row=row, column=1, sticky='w', padx=5)
 
                 def choose_color(idx=idx):
@@ -1017,12 +3933,12 @@ def show_gui(root, vpcf_files, parent_folder):
 
                         widgets[idx]['new_color'] = new_c
 
-                        # Update the swatch’s background using just RGB
-                        hex_color = '#%02x%02x%02x' % (new_c[0], new_c[1], new_c[2])
-                        widgets[idx]['color_label'].configure(bg=hex_color)
-
+                        # Swap in the cached swatch (and strip) for the new color
+                        swatch_cache.show(widgets[idx]['color_label'], swatch_cache.color(new_c))
+                        if widgets[idx]['field']['type'] == 'gradient':
+                            show_gradient_strip(widgets[idx]['field']['gradient_block_index'])
 
-                choose_button = Button(inner_frame, text='Choose Color', command=choose_color)
+                choose_button = ttk.Button(inner_frame, text='Choose Color', command=choose_color)
                 choose_button.grid(row=row, column=2, padx=5, pady=2)
 
                 widgets.append({
@@ -1032,6 +3948,9 @@ def show_gui(root, vpcf_files, parent_folder):
                 })
                 row += 1
 
+            for block in gradient_strips:
+                show_gradient_strip(block)
+
             inner_frame.update_idletasks()
             canvas.config(scrollregion=canvas.bbox('all'))
 
@@ -1043,24 +3962,24 @@ def show_gui(root, vpcf_files, parent_folder):
 
             row_ = 0
             for raw_name, display_name in sorted(unique_fields.items(), key=lambda x: x[1]):
-                Label(apply_inner_frame, text=display_name, anchor='w').grid(row=row_, column=0, sticky='w', pady=2)
-                color_label = Label(apply_inner_frame, text='    ', bg='#FFFFFF', relief='groove')
+                ttk.Label(apply_inner_frame, text=display_name, anchor='w').grid(row=row_, column=0, sticky='w', pady=2)
+                color_label = ttk.Label(apply_inner_frame, relief='groove')
+                swatch_cache.show(color_label, swatch_cache.color((255, 255, 255)))
                 color_label.grid(row=row_, column=1, sticky='w', padx=5)
 
                 var_apply = IntVar()
-                check_apply = Checkbutton(apply_inner_frame, text="Apply", variable=var_apply)
+                check_apply = ttk.Checkbutton(apply_inner_frame, text="Apply", variable=var_apply)
                 check_apply.grid(row=row_, column=3, padx=5)
 
                 def choose_color(rn=raw_name, var_apply=var_apply):
                     color = colorchooser.askcolor(parent=root)[0]
                     if color:
                         r, g, b = color
-                        hex_color = '#%02x%02x%02x' % (int(r), int(g), int(b))
                         apply_widgets[rn]['new_color'] = [int(r), int(g), int(b)]
-                        apply_widgets[rn]['color_label'].configure(bg=hex_color)
+                        swatch_cache.show(apply_widgets[rn]['color_label'], swatch_cache.color(apply_widgets[rn]['new_color']))
                         var_apply.set(1)
 
-                choose_button_ = Button(apply_inner_frame, text='Choose Color', command=choose_color)
+                choose_button_ = ttk.Button(apply_inner_frame, text='Choose Color', command=choose_color)
                 choose_button_.grid(row=row_, column=2, padx=5, pady=2)
 
                 apply_widgets[raw_name] = {
@@ -1071,18 +3990,22 @@ def show_gui(root, vpcf_files, parent_folder):
                 }
                 row_ += 1
 
-            Label(apply_inner_frame, text="Gradient Editor", anchor='w', font=("Arial", 10, "bold")).grid(row=row_, column=0, sticky='w', pady=5)
+            ttk.Label(apply_inner_frame, text="Gradient Editor", anchor='w', font=("Arial", 10, "bold")).grid(row=row_, column=0, sticky='w', pady=5)
+            row_ += 1
+            gradient_strip = ttk.Label(apply_inner_frame, text="No gradient chosen", relief='groove')
+            gradient_strip.grid(row=row_, column=0, sticky='w', padx=5)
 
             gradient_var_apply = IntVar()
-            gradient_check_apply = Checkbutton(apply_inner_frame, text="Apply", variable=gradient_var_apply)
+            gradient_check_apply = ttk.Checkbutton(apply_inner_frame, text="Apply", variable=gradient_var_apply)
             gradient_check_apply.grid(row=row_, column=3, padx=5)
 
-            gradient_button = Button(apply_inner_frame, text="Edit Gradients", command=lambda: edit_gradients(apply_widgets, gradient_var_apply))
+            gradient_button = ttk.Button(apply_inner_frame, text="Edit Gradients", command=lambda: edit_gradients(apply_widgets, gradient_var_apply))
             gradient_button.grid(row=row_, column=2, padx=5, pady=5)
 
             apply_widgets["gradient_editor"] = {
                 "apply": gradient_var_apply,
                 "new_color": None,
+                "color_label": gradient_strip,
             }
 
             apply_inner_frame.update_idletasks()
@@ -1099,6 +4022,8 @@ def show_gui(root, vpcf_files, parent_folder):
                     all_color_fields = [f for f in all_color_fields if f['filename'] != filename]
                     new_fields = find_color_fields(updated_content, filename)
                     all_color_fields.extend(new_fields)
+                    index_file(filename, new_fields)
+                    reference_graph.update_file(filename, find_child_references(updated_content), file_name_to_path[filename])
                     load_vpcf_file(filename)
                     logging.info(f"GUI refreshed for file: {filename}")
                 else:
@@ -1107,176 +4032,174 @@ def show_gui(root, vpcf_files, parent_folder):
                 logging.exception("Error occurred during GUI refresh.")
                 messagebox.showerror("Error", f"An error occurred during GUI refresh:\n{e}", parent=root)
 
-        def save_changes():
+        def reindex_saved_file(filename, new_content, edits):
+            """
+            Update the color fields, indexes and views of a file the editor just wrote,
+            shifting the known fields past `edits` instead of reading the file back and re-parsing it.
+            """
+            nonlocal all_color_fields
+            with perf_stats.stage("save.reindex"):
+                old_fields = [f for f in all_color_fields if f['filename'] == filename]
+                new_fields = reindex_after_edits(
+                    old_fields, new_content, edits, filename, verify=verify_reindex
+                )
+                all_color_fields = [f for f in all_color_fields if f['filename'] != filename]
+                all_color_fields.extend(new_fields)
+                index_file(filename, new_fields)
+            sync_written_file(filename, new_content)
+            load_vpcf_file(filename)
+
+        def sync_written_file(filename, new_content):
+            """Keep the text tab in sync with a written file without the file watcher reloading it from disk."""
+            path = file_name_to_path[filename]
+            if path in last_mtime_map:
+                last_mtime_map[path] = os.path.getmtime(path)
+                if filename == selected_file.get():
+                    text_widget.delete('1.0', tk.END)
+                    text_widget.insert('1.0', new_content)
+
+        def save_changes(notify=True):
+            """Write the edited colors of the current file. Returns True on success."""
             try:
                 filename = selected_file.get()
                 current_content = files_content[filename]
-                new_content = current_content
-
-                scalar_replacements = []
-                gradient_stop_colors = {}
 
-                # 1) Gather changed fields from the GUI
-                for w_ in widgets:
-                    field = w_['field']
-                    new_color = w_['new_color']
-
-                    if field['type'] == 'color':
-                        # Same as before: handle scalar color fields
-                        pat = re.compile(
-                            re.escape(field['prefix']) + re.escape(field['value']),
-                            re.IGNORECASE | re.MULTILINE
-                        )
-                        scalar_replacements.append((pat, field['prefix'] + color_list_to_string(new_color)))
-
-                    elif field['type'] == 'gradient':
-                        # gradient_block_index, stop_index -> [R, G, B, (optional A)]
-                        key_ = (field['gradient_block_index'], field['stop_index'])
-                        gradient_stop_colors[key_] = new_color
-
-                # 2) Apply scalar replacements first
-                for pat, replacement in scalar_replacements:
-                    new_content = pat.sub(replacement, new_content, count=1)
-
-                # 3) Rewrite gradient blocks using gradient_pattern
-                def replace_gradient_block(m):
-                    prefix = m.group(1)
-                    stops_body = m.group(2)
-                    suffix = m.group(3)
-
-                    nonlocal gradient_block_counter
-                    gradient_block_counter += 1
-                    current_block_index = gradient_block_counter
-
-                    def replace_stop(stop_m):
-                        full_stop_text = stop_m.group(1)
-                        # color_str is everything inside m_Color = [ ... ],
-                        # e.g. "195,\n   223,\n   255,\n   255,"
-                        color_str = stop_m.group(2)
-
-                        stop_key = (current_block_index, replace_stop.stop_index)
-                        replace_stop.stop_index += 1
-
-                        # If we don't have a new color for this stop, leave it alone
-                        if stop_key not in gradient_stop_colors:
-                            return full_stop_text
-
-                        new_rgb = gradient_stop_colors[stop_key]
-                        # new_rgb could be 3 elements (RGB) or 4 (RGBA)
-
-                        # We'll replace only the first len(new_rgb) numbers in color_str
-                        numbers = re.findall(r'\d+', color_str)
-                        updated_str = color_str
-
-                        for i, old_num in enumerate(numbers):
-                            if i < len(new_rgb):
-                                # Use a word-boundary-based regex to avoid partial merges
-                                updated_str = re.sub(
-                                    rf'\b{re.escape(old_num)}\b',
-                                    str(new_rgb[i]),
-                                    updated_str,
-                                    count=1
-                                )
-                            else:
-                                # We have more digits in the original array than in new_rgb.
-                                # Keep them as-is, do not remove them.
-                                break
-
-                        # Reinsert the updated digit string back into the full block text
-                        updated_stop_text = full_stop_text.replace(color_str, updated_str, 1)
-                        return updated_stop_text
-
-                    replace_stop.stop_index = 0
-                    new_stops_body = stop_pattern.sub(replace_stop, stops_body)
-
-                    return prefix + new_stops_body + suffix
-
-                gradient_block_counter = 0
-                new_content = gradient_pattern.sub(replace_gradient_block, new_content)
+                # 1-3) Rewrite the changed scalar fields and gradient stops
+                edits = color_field_edits([(w_['field'], w_['new_color']) for w_ in widgets])
+                new_content = apply_span_edits(current_content, edits)
 
                 # 4) Write out final result
-                backup_file(file_name_to_path[filename])
-                with open(file_name_to_path[filename], 'w', encoding='utf-8') as f:
-                    f.write(new_content)
+                with perf_stats.stage("save.write"):
+                    backup_file(file_name_to_path[filename])
+                    with open(file_name_to_path[filename], 'w', encoding='utf-8') as f:
+                        f.write(new_content)
 
                 files_content[filename] = new_content
                 logging.info(f"File saved: {filename}")
-                messagebox.showinfo("Success", f"Colors updated and file saved:\n{filename}", parent=root)
-                refresh_gui()
+                reindex_saved_file(filename, new_content, edits)
+                if notify:
+                    messagebox.showinfo("Success", f"Colors updated and file saved:\n{filename}", parent=root)
+                else:
+                    set_status(f"Saved {filename}")
+                return True
 
             except Exception as e:
                 logging.exception("An error occurred while saving changes.")
                 messagebox.showerror("Error", f"An error occurred while saving changes:\n{e}", parent=root)
+                return False
 
 
 
         def save_and_compile():
-            # Save the file first
-            save_changes()
-            # Then compile it, which now shows a short message in compile_file()
+            """Save the file, then compile it in the background without blocking the editor."""
+            file_name = selected_file.get()
+            if not save_changes(notify=False):
+                return
             if not compiler_path[0]:
                 messagebox.showwarning(
                     "Compiler Path Not Set",
+                    "The file was saved but not compiled.\n"
                     "Please set the compiler path in Settings > Set Compiler Path.",
                     parent=root
                 )
                 return
-            compile_file()
-
-
-        def compile_file():
-            try:
-                file_name = selected_file.get()
-                path_ = file_name_to_path[file_name]
-                compiler_ = compiler_path[0]
-
-                if not os.path.exists(compiler_):
-                    messagebox.showerror(
-                        "Compiler Not Found",
-                        f"The compiler was not found at:\n{compiler_}",
-                        parent=root
-                    )
-                    return
-
-                # We run the compiler
-                result = subprocess.run(
-                    [compiler_, path_],
-                    check=True,
-                    capture_output=True,
-                    text=True
-                )
+            if recompile_parents_var.get():
+                # Parents are queued once the files they reference have compiled
+                schedule_parent_compiles(file_name)
+            if compile_queue.submit(file_name, file_name_to_path[file_name], compiler_path[0]):
+                set_status(f"Saved {file_name}; compile queued")
+            else:
+                set_status(f"Saved {file_name}; compile already pending")
+
+        def schedule_parent_compiles(file_name):
+            """Register follow-up compiles so each parent is queued once all of its children in the tree finished."""
+            tree = reference_graph.ancestors([file_name]) | {file_name}
+            for name in tree:
+                children = reference_graph.children.get(name, set()) & tree
+                if children:
+                    compile_waiting_on.setdefault(name, set()).update(children)
+                parents = reference_graph.parents.get(name, set()) & tree
+                if parents:
+                    compile_followups.setdefault(name, set()).update(parents)
+
+        def run_compile_followups(file_name, success):
+            for parent in sorted(compile_followups.pop(file_name, ())):
+                waiting = compile_waiting_on.get(parent, set())
+                waiting.discard(file_name)
+                if not success:
+                    # A child failed: skip the parent and everything above it
+                    compile_waiting_on.pop(parent, None)
+                    run_compile_followups(parent, False)
+                elif not waiting:
+                    compile_waiting_on.pop(parent, None)
+                    compile_queue.submit(parent, vpcf_paths.get(parent) or file_name_to_path[parent], compiler_path[0])
+
+        def on_compile_status(event, file_name, result):
+            """Called from compile queue workers; forwards status to the Tk thread."""
+            pending = compile_queue.pending()
+            if event == "started":
+                message = f"Compiling {file_name}... ({pending} pending)"
+            elif event == "finished" and result['success']:
+                message = f"Compiled {file_name} in {result['duration']:.1f}s"
+                compile_durations.record(result['path'], result['duration'])
+            elif event == "finished":
+                message = f"Compile FAILED: {file_name} - {result['message'].strip()} (see Tools > Compile History)"
+            else:
+                return
+            if event == "finished":
+                save_compile_run().record(result)
+            root.after(0, lambda: set_status(message))
+            if event == "finished":
+                root.after(0, lambda: run_compile_followups(file_name, result['success']))
+
+        compile_durations = CompileDurations(os.path.join(os.path.dirname(config_store.path), COMPILE_DURATIONS_FILE))
+        compile_history = CompileHistory(
+            os.path.join(os.path.dirname(config_store.path), COMPILE_HISTORY_DIR),
+            limit=load_config().get("compile_history_limit", COMPILE_HISTORY_LIMIT)
+        )
+        save_compile_runs = []  # the session's "Save and Compile" run, started on first use
+        save_compile_lock = threading.Lock()
+
+        def save_compile_run():
+            """All "Save and Compile" results of this session are recorded as one run."""
+            with save_compile_lock:
+                if not save_compile_runs:
+                    save_compile_runs.append(compile_history.start_run("Save and Compile", compiler_path[0]))
+                return save_compile_runs[0]
+        compile_followups = {}   # {child file: parent files to queue once it has compiled}
+        compile_waiting_on = {}  # {parent file: child files that still have to compile}
+        recompile_parents_var = IntVar(value=1 if load_config().get("compile_parents_on_save", False) else 0)
+
+        def toggle_recompile_parents():
+            config = load_config()
+            config["compile_parents_on_save"] = bool(recompile_parents_var.get())
+            save_config(config)
 
-                # If it gets here, compilation succeeded
-                logging.info(f"Compiled successfully: {path_}")
-                # SHORT SUCCESS MESSAGE
-                messagebox.showinfo(
-                    "Compilation Result",
-                    "Compilation completed successfully.",
-                    parent=root
-                )
+        update_check_var = IntVar(value=1 if load_config().get("update_check_enabled", True) else 0)
 
-            except subprocess.CalledProcessError as e:
-                # CalledProcessError is thrown if `check=True` and return code != 0
-                # Log the full output for debugging
-                logging.exception(f"Compilation failed for {file_name}: {e}")
-                # Show a short user-facing message
-                messagebox.showerror(
-                    "Compilation Error",
-                    "An error occurred during compilation.\nSee the log for details.",
-                    parent=root
-                )
+        def toggle_update_check():
+            config = load_config()
+            config["update_check_enabled"] = bool(update_check_var.get())
+            save_config(config)
 
-            except Exception as e:
-                # Log unexpected exceptions
-                logging.exception(f"An unexpected error occurred during compilation of {file_name}")
-                messagebox.showerror(
-                    "Compilation Error",
-                    "An unexpected error occurred.\nSee the log for details.",
-                    parent=root
-                )
+        compile_queue = CompileQueue(
+            max_workers=load_config().get("compile_on_save_workers", DEFAULT_COMPILE_QUEUE_WORKERS),
+            on_status=on_compile_status
+        )
 
         def compile_all_files():
-            """Compile all VPCF files in parallel using ThreadPoolExecutor"""
+            """Compile all VPCF files with color fields."""
+            compile_files(list(file_name_to_path), "Compiling All Files (Parallel)")
+
+        def compile_effect_tree(file_name, include_parents=False):
+            """Compile a file with every particle system it references (and optionally its parents)."""
+            names = {file_name} | reference_graph.descendants([file_name])
+            if include_parents:
+                names |= reference_graph.ancestors([file_name])
+            compile_files(sorted(names), f"Compiling Effect Tree: {file_name}")
+
+        def compile_files(file_names, title):
+            """Compile files in dependency levels (children first), in parallel within each level."""
             if not compiler_path[0]:
                 messagebox.showwarning(
                     "Compiler Path Not Set",
@@ -1287,7 +4210,7 @@ def show_gui(root, vpcf_files, parent_folder):
 
             # Create progress window
             progress_window = tk.Toplevel(root)
-            progress_window.title("Compiling All Files (Parallel)")
+            progress_window.title(title)
             progress_window.geometry("600x200")
             progress_window.transient(root)
             progress_window.grab_set()
@@ -1307,13 +4230,13 @@ def show_gui(root, vpcf_files, parent_folder):
                 progress_window,
                 length=400,
                 mode='determinate',
-                maximum=len(file_name_to_path)
+                maximum=len(file_names)
             )
             progress_bar.pack(pady=10)
 
             # Progress text
             progress_text = tk.StringVar()
-            progress_text.set(f"0/{len(file_name_to_path)} files compiled")
+            progress_text.set(f"0/{len(file_names)} files compiled")
             progress_label = tk.Label(progress_window, textvariable=progress_text)
             progress_label.pack()
 
@@ -1331,71 +4254,73 @@ def show_gui(root, vpcf_files, parent_folder):
                     log_text.see(tk.END)
                 progress_window.after(0, _update)
 
-            def compile_single_file(file_name, file_path):
-                """Compile a single file (to be run in thread pool)"""
-                try:
-                    if not os.path.exists(compiler_path[0]):
-                        return file_name, False, f"Compiler not found: {compiler_path[0]}"
-
-                    result = subprocess.run(
-                        [compiler_path[0], file_path],
-                        check=True,
-                        capture_output=True,
-                        text=True,
-                        timeout=30  # 30 second timeout per file
-                    )
-                    return file_name, True, "Success"
-                except subprocess.CalledProcessError as e:
-                    return file_name, False, f"Compilation failed: {e.stderr[:100]}"
-                except Exception as e:
-                    return file_name, False, f"Error: {str(e)}"
-
             def compile_thread():
                 """Background thread for parallel compilation"""
-                successful = 0
-                failed = 0
-                failed_files = []
-                total_files = len(file_name_to_path)
-
-                # Determine optimal number of workers (max 4 by default, but can be adjusted)
-                max_workers = min(4, total_files)  # Adjust this number based on your CPU
-                update_log(f"Starting parallel compilation with {max_workers} workers...")
-
-                with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    # Submit all tasks
-                    future_to_file = {
-                        executor.submit(compile_single_file, file_name, file_path): file_name
-                        for file_name, file_path in file_name_to_path.items()
-                    }
-
-                    # Process completed tasks as they finish
-                    completed = 0
-                    for future in as_completed(future_to_file):
-                        file_name, success, message = future.result()
-                        completed += 1
-
-                        if success:
-                            successful += 1
-                            update_log(f"✅ {file_name}: {message}")
-                        else:
-                            failed += 1
-                            failed_files.append(file_name)
-                            update_log(f"❌ {file_name}: {message}")
+                total_files = len(file_names)
+                max_workers = min(DEFAULT_COMPILE_WORKERS, total_files)
+                levels = [
+                    [(fn, vpcf_paths.get(fn) or file_name_to_path[fn]) for fn in level]
+                    for level in reference_graph.levels(file_names)
+                ]
+                if len(levels) > 1:
+                    update_log(f"{total_files} files in {len(levels)} dependency levels (children first)")
+
+                # Start the slowest files first so the end of each level is not one long straggler
+                expected = compile_durations.expected([path for level in levels for _, path in level])
+                levels = [order_longest_first(level, expected) for level in levels]
+                predicted = predict_compile_time(levels, expected, max_workers)
+                update_log(f"Predicted compile time: {predicted:.1f}s")
+                history_run = compile_history.start_run(title, compiler_path[0])
+                progress_window.after(0, lambda: status_label.config(text=f"Predicted time: {predicted:.1f}s"))
+                batch_options = get_compile_batch_options(load_config(), compiler_path[0])
+                if batch_options["mode"] == "single":
+                    update_log(f"Starting parallel compilation with {max_workers} workers...")
+                else:
+                    update_log(
+                        f"Starting parallel compilation with {max_workers} workers, "
+                        f"{batch_options['size']} files per compiler process ({batch_options['mode']})..."
+                    )
 
-                        # Update progress
+                def on_result(result, completed, total):
+                    file_name = result['file_name']
+                    history_run.record(result)
+                    if result['returncode'] is not None and not result.get('batched'):
+                        compile_durations.record(result['path'], result['duration'])
+                    if result['success']:
+                        update_log(f"✅ {file_name}: {result['message']}")
+                    else:
+                        update_log(f"❌ {file_name}: {result['message']}")
+
+                    # Update progress on the Tk thread
+                    def _progress():
                         progress_bar['value'] = completed
-                        progress_text.set(f"{completed}/{total_files} files compiled")
+                        progress_text.set(f"{completed}/{total} files compiled")
                         status_label.config(text=f"Compiling: {file_name}")
-                        progress_window.update()
+                    progress_window.after(0, _progress)
+
+                summary = run_compile_levels(
+                    levels, compiler_path[0],
+                    max_workers=max_workers, on_result=on_result, batch_options=batch_options
+                )
+                successful = summary['successful']
+                failed = summary['failed']
+                failed_files = summary['failed_files']
+                compile_durations.save()
+                actual = summary['wall_time']
+                history_run.finish(actual)
 
                 # Compilation complete - show results
                 def show_results():
                     progress_window.destroy()
-                    result_message = f"Parallel Compilation Complete!\n\nSuccessfully compiled: {successful}\nFailed: {failed}"
+                    result_message = (
+                        f"Parallel Compilation Complete!\n\nSuccessfully compiled: {successful}\nFailed: {failed}"
+                        f"\n\nTime: {actual:.1f}s (predicted {predicted:.1f}s)"
+                    )
                     if failed_files:
                         result_message += f"\n\nFailed files:\n" + "\n".join(failed_files[:10])
                         if len(failed_files) > 10:
                             result_message += f"\n... and {len(failed_files) - 10} more"
+                        result_message += "\n\nFull output for every file: Tools > Compile History"
 
                     if failed == 0:
                         messagebox.showinfo("Compilation Success", result_message, parent=root)
@@ -1406,6 +4331,101 @@ def show_gui(root, vpcf_files, parent_folder):
 
             # Start compilation in background thread
             threading.Thread(target=compile_thread, daemon=True).start()
+
+        def show_compile_history_window():
+            """Browse recorded compile runs, view full output and export reports."""
+            history_window = tk.Toplevel(root)
+            history_window.title("Compile History")
+            history_window.geometry("860x520")
+
+            paned = PanedWindow(history_window, orient=tk.VERTICAL)
+            paned.pack(fill='both', expand=True, padx=5, pady=5)
+
+            runs_tree = ttk.Treeview(paned, columns=("started", "files", "failed", "time"), show='tree headings', height=6)
+            runs_tree.heading('#0', text="Run")
+            runs_tree.column('#0', width=300)
+            for column, heading, width in (("started", "Started", 160), ("files", "Files", 60),
+                                           ("failed", "Failed", 60), ("time", "Wall Time", 80)):
+                runs_tree.heading(column, text=heading)
+                runs_tree.column(column, width=width, anchor='w' if column == "started" else 'e')
+            paned.add(runs_tree, minsize=100)
+
+            results_tree = ttk.Treeview(paned, columns=("status", "duration", "exit", "message"), show='tree headings')
+            results_tree.heading('#0', text="File")
+            results_tree.column('#0', width=300)
+            for column, heading, width in (("status", "Status", 60), ("duration", "Duration", 70),
+                                           ("exit", "Exit Code", 70), ("message", "Message", 320)):
+                results_tree.heading(column, text=heading)
+                results_tree.column(column, width=width, anchor='w' if column in ("status", "message") else 'e')
+            paned.add(results_tree, minsize=150)
+
+            shown_results = {}  # {item id: (run id, result position)}
+
+            def load_runs():
+                runs_tree.delete(*runs_tree.get_children())
+                for run in compile_history.load_runs(with_output=False):
+                    summary = run['summary'] or {}
+                    failed = sum(1 for r in run['results'] if r['status'] != "passed")
+                    wall = f"{summary['wall_time']:.1f}s" if summary.get('wall_time') is not None else ""
+                    runs_tree.insert('', END, iid=run['id'], text=run.get('title', run['id']),
+                                     values=(run.get('started', ""), len(run['results']), failed, wall))
+
+            def show_run(event=None):
+                results_tree.delete(*results_tree.get_children())
+                shown_results.clear()
+                run_id = runs_tree.focus()
+                if not run_id:
+                    return
+                run = compile_history.load_run(run_id, with_output=False)
+                for position, r in enumerate(run['results']):
+                    item = results_tree.insert('', END, text=r['file'], values=(
+                        r['status'], f"{r['duration']:.2f}s",
+                        r['returncode'] if r['returncode'] is not None else "",
+                        r['message'].strip().splitlines()[0] if r['message'].strip() else ""
+                    ))
+                    shown_results[item] = (run_id, position)
+
+            def show_output(event=None):
+                selected = shown_results.get(results_tree.focus())
+                if selected is None:
+                    return
+                run_id, position = selected
+                result = compile_history.load_run(run_id)['results'][position]
+                output_window = tk.Toplevel(history_window)
+                output_window.title(f"Compiler Output: {result['file']}")
+                output_window.geometry("760x420")
+                output_text = tk.Text(output_window, wrap='none')
+                output_text.pack(fill='both', expand=True)
+                output_text.insert('1.0', f"{result['path']}\n{result['message']}\n\n{result.get('output') or '(no output)'}")
+                output_text.config(state='disabled')
+
+            def export_report(junit):
+                run_ids = list(runs_tree.selection()) or None
+                extension = ".xml" if junit else ".json"
+                path = filedialog.asksaveasfilename(
+                    title="Export Compile Report", parent=history_window, defaultextension=extension,
+                    filetypes=[("JUnit XML", "*.xml")] if junit else [("JSON", "*.json")]
+                )
+                if not path:
+                    return
+                try:
+                    runs = compile_history.load_runs(run_ids)
+                    write_compile_report(runs, path)
+                    messagebox.showinfo("Export Compile Report", f"Exported {len(runs)} runs to:\n{path}", parent=history_window)
+                except Exception as e:
+                    logging.exception("An error occurred while exporting the compile report.")
+                    messagebox.showerror("Error", f"An error occurred while exporting the report:\n{e}", parent=history_window)
+
+            buttons = tk.Frame(history_window)
+            buttons.pack(fill='x', padx=5, pady=5)
+            Label(buttons, text="Double-click a file for its full compiler output. Exports cover the selected runs, or all runs.").pack(side='left')
+            Button(buttons, text="Export JUnit XML...", command=lambda: export_report(True)).pack(side='right', padx=5)
+            Button(buttons, text="Export JSON...", command=lambda: export_report(False)).pack(side='right', padx=5)
+            Button(buttons, text="Refresh", command=load_runs).pack(side='right', padx=5)
+
+            runs_tree.bind('<<TreeviewSelect>>', show_run)
+            results_tree.bind('<Double-1>', show_output)
+            load_runs()
         def set_compiler_path():
             path_ = filedialog.askopenfilename(title="Select Compiler Executable", parent=root)
             if path_:
@@ -1413,12 +4433,615 @@ def show_gui(root, vpcf_files, parent_folder):
                 compiler_path[0] = path_
 
                 # 2) Persist to config.json
-                config = load_config()  # read current config from file
-                config["compiler_path"] = path_  # update or add the key
-                save_config(config)     # write it back
+                config = load_config()
+                config["compiler_path"] = path_
+                save_config(config)
 
                 messagebox.showinfo("Compiler Path Set", f"Compiler path set to:\n{path_}", parent=root)
 
+        def set_compiler_batching():
+            """Configure how many files are passed to one compiler process for the current compiler."""
+            if not compiler_path[0]:
+                messagebox.showwarning(
+                    "Compiler Path Not Set",
+                    "Please set the compiler path in Settings > Set Compiler Path.",
+                    parent=root
+                )
+                return
+            config = load_config()
+            options = get_compile_batch_options(config, compiler_path[0])
+
+            mode = simpledialog.askstring(
+                "Compiler Batching",
+                "Batch mode for this compiler:\n"
+                "  single   - one compiler process per file\n"
+                "  args     - several file paths per process\n"
+                "  filelist - paths written to a list file passed to the compiler",
+                initialvalue=options["mode"],
+                parent=root
+            )
+            if mode is None:
+                return
+            mode = mode.strip().lower()
+            if mode not in COMPILE_BATCH_MODES:
+                messagebox.showerror("Compiler Batching", f"Unknown batch mode: {mode}", parent=root)
+                return
+            options["mode"] = mode
+
+            if mode != "single":
+                size = simpledialog.askinteger(
+                    "Compiler Batching", "Files per compiler process:",
+                    initialvalue=options["size"], minvalue=2, parent=root
+                )
+                if size is None:
+                    return
+                options["size"] = size
+            if mode == "filelist":
+                arg = simpledialog.askstring(
+                    "Compiler Batching",
+                    "Argument placed before the list file path (leave empty for none):",
+                    initialvalue=options["filelist_arg"],
+                    parent=root
+                )
+                if arg is None:
+                    return
+                options["filelist_arg"] = arg.strip()
+
+            config.setdefault("compiler_batch", {})[compiler_path[0]] = options
+            save_config(config)
+
+
+        def write_file_changes(updated, edits=None, refresh=True):
+            """
+            Back up and write {file_name: new content}, then update the color
+            fields and index of only those files. Used by the batch operations.
+
+            Files with `edits` ({file_name: the span edits that turn the current
+            content into the new one}) have their fields shifted as after a save;
+            the others are re-parsed.
+            """
+            nonlocal all_color_fields
+            if not updated:
+                return
+            edits = edits or {}
+            old_fields = {}
+            kept_fields = []
+            for f in all_color_fields:
+                if f['filename'] in updated:
+                    old_fields.setdefault(f['filename'], []).append(f)
+                else:
+                    kept_fields.append(f)
+            all_color_fields = kept_fields
+
+            for fn, new_c in updated.items():
+                with perf_stats.stage("apply.write"):
+                    backup_file(file_name_to_path[fn])
+                    with open(file_name_to_path[fn], 'w', encoding='utf-8') as f:
+                        f.write(new_c)
+                old_c = files_content[fn]
+                files_content[fn] = new_c
+                with perf_stats.stage("apply.reindex"):
+                    file_edits = edits.get(fn)
+                    # The edits may have been made against the file on disk (manifest import)
+                    if file_edits is not None and apply_span_edits(old_c, file_edits) == new_c:
+                        updated_fields = reindex_after_edits(
+                            old_fields.get(fn, []), new_c, file_edits, fn, verify=verify_reindex
+                        )
+                    else:
+                        updated_fields = find_color_fields(new_c, fn)
+                    all_color_fields.extend(updated_fields)
+                    index_file(fn, updated_fields)
+                sync_written_file(fn, new_c)
+            logging.info(f"Batch write: {len(updated)} files updated")
+            if refresh and selected_file.get() in updated:
+                load_vpcf_file(selected_file.get())
+
+        def show_color_search_window():
+            """Find every usage of a color across the project and optionally replace it."""
+            search_window = tk.Toplevel(root)
+            search_window.title("Find / Replace Color")
+            search_window.geometry("760x460")
+
+            find_color = [None]
+            controls = tk.Frame(search_window)
+            controls.pack(fill='x', padx=5, pady=5)
+
+            find_swatch = Label(controls, text='    ', bg='#FFFFFF', relief='groove')
+            tolerance_var = IntVar(value=0)
+            result_var = StringVar(value="Choose a color to search for.")
+
+            columns = ("field", "occurrence", "color")
+            results_tree = ttk.Treeview(search_window, columns=columns, show='tree headings')
+            results_tree.heading('#0', text="File")
+            results_tree.column('#0', width=360)
+            results_tree.heading("field", text="Field")
+            results_tree.heading("occurrence", text="#")
+            results_tree.column("occurrence", width=40, anchor='e')
+            results_tree.heading("color", text="Color")
+            results_tree.pack(fill='both', expand=True, padx=5, pady=5)
+            Label(search_window, textvariable=result_var, anchor='w').pack(fill='x', padx=5)
+
+            def run_search():
+                results_tree.delete(*results_tree.get_children())
+                if find_color[0] is None:
+                    return []
+                with perf_stats.stage("index.lookup"):
+                    matches = color_index.lookup(find_color[0], tolerance_var.get())
+                for entry in matches:
+                    results_tree.insert(
+                        '', END, text=entry['file'],
+                        values=(entry['field'], entry['occurrence'] + 1, list(entry['color']))
+                    )
+                files = len({e['file'] for e in matches})
+                result_var.set(f"{len(matches)} usages in {files} files")
+                return matches
+
+            def choose_find_color():
+                color = colorchooser.askcolor(parent=search_window)[0]
+                if color:
+                    find_color[0] = [int(c) for c in color]
+                    find_swatch.configure(bg=rgb_to_hex(find_color[0]))
+                    run_search()
+
+            def replace_all():
+                if find_color[0] is None:
+                    return
+                new_color = colorchooser.askcolor(title="Replace With", parent=search_window)[0]
+                if not new_color:
+                    return
+                new_color = [int(c) for c in new_color]
+                matches = color_index.lookup(find_color[0], tolerance_var.get())
+                if not matches:
+                    return
+                files = len({e['file'] for e in matches})
+                if not messagebox.askyesno(
+                    "Replace Color",
+                    f"Replace {len(matches)} usages in {files} files with {new_color}?",
+                    parent=search_window
+                ):
+                    return
+                try:
+                    edits = entry_color_edits(((e, new_color) for e in matches), files_content)
+                    write_file_changes(apply_file_edits(files_content, edits), edits)
+                    find_color[0] = new_color
+                    find_swatch.configure(bg=rgb_to_hex(new_color))
+                    run_search()
+                except Exception as e:
+                    logging.exception("An error occurred while replacing a color.")
+                    messagebox.showerror("Error", f"An error occurred while replacing the color:\n{e}", parent=search_window)
+
+            def open_result(event=None):
+                item = results_tree.focus()
+                if item:
+                    select_file(results_tree.item(item, 'text'))
+
+            Button(controls, text="Find Color...", command=choose_find_color).pack(side='left', padx=5)
+            find_swatch.pack(side='left', padx=5)
+            Label(controls, text="Tolerance:").pack(side='left', padx=(15, 2))
+            tolerance_box = tk.Spinbox(controls, from_=0, to=441, width=5, textvariable=tolerance_var, command=run_search)
+            tolerance_box.pack(side='left')
+            tolerance_box.bind('<Return>', lambda e: run_search())
+            Button(controls, text="Replace All With...", command=replace_all).pack(side='left', padx=15)
+            results_tree.bind('<Double-1>', open_result)
+
+        def show_text_search_window():
+            """Search the text of every scanned file through the trigram index."""
+            search_window = tk.Toplevel(root)
+            search_window.title("Search in Files")
+            search_window.geometry("820x460")
+
+            query_var = StringVar()
+            result_var = StringVar(value="Type text to search for (case-insensitive).")
+            controls = tk.Frame(search_window)
+            controls.pack(fill='x', padx=5, pady=5)
+            Label(controls, text="Find:").pack(side='left', padx=(5, 2))
+            query_entry = Entry(controls, textvariable=query_var, width=50)
+            query_entry.pack(side='left', fill='x', expand=True, padx=5)
+
+            columns = ("line", "text")
+            results_tree = ttk.Treeview(search_window, columns=columns, show='tree headings')
+            results_tree.heading('#0', text="File")
+            results_tree.column('#0', width=280)
+            results_tree.heading("line", text="Line")
+            results_tree.column("line", width=50, anchor='e')
+            results_tree.heading("text", text="Text")
+            results_tree.column("text", width=460)
+            results_tree.pack(fill='both', expand=True, padx=5, pady=5)
+            Label(search_window, textvariable=result_var, anchor='w').pack(fill='x', padx=5)
+
+            hits_by_item = {}
+            pending_search = [None]
+
+            def run_search():
+                pending_search[0] = None
+                results_tree.delete(*results_tree.get_children())
+                hits_by_item.clear()
+                query = query_var.get()
+                if not query.strip():
+                    result_var.set("Type text to search for (case-insensitive).")
+                    return
+                started = time.perf_counter()
+                with perf_stats.stage("index.text_search"):
+                    hits, truncated = text_index.search(query)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                for hit in hits:
+                    item = results_tree.insert('', END, text=hit['file'], values=(hit['line'], hit['text']))
+                    hits_by_item[item] = hit
+                files = len({hit['file'] for hit in hits})
+                result_var.set(
+                    f"{len(hits)} matches in {files} files ({elapsed_ms:.0f} ms)"
+                    + (f", showing the first {SEARCH_RESULT_LIMIT}" if truncated else "")
+                    + (f", {len(text_index.pending)} files still being indexed" if text_index.pending else "")
+                )
+
+            def schedule_search(*_):
+                if pending_search[0] is not None:
+                    search_window.after_cancel(pending_search[0])
+                pending_search[0] = search_window.after(SEARCH_TYPING_DELAY, run_search)
+
+            def highlight_hit(widget, hit):
+                start = f"{hit['line']}.{hit['column']}"
+                end = f"{start}+{hit['end'] - hit['start']}c"
+                widget.tag_remove("search_highlight", "1.0", tk.END)
+                widget.tag_add("search_highlight", start, end)
+                widget.tag_config("search_highlight", background="yellow", foreground="black")
+                widget.mark_set("insert", start)
+                widget.see(start)
+                widget.focus_set()
+
+            def show_unlisted_file(hit):
+                """Files without color fields are not in the file list; show them read-only."""
+                viewer = tk.Toplevel(search_window)
+                viewer.title(f"{hit['file']} (no color fields, read-only)")
+                viewer.geometry("760x520")
+                viewer_text = tk.Text(viewer, wrap='none')
+                viewer_scrollbar = Scrollbar(viewer, orient='vertical', command=viewer_text.yview)
+                viewer_text.configure(yscrollcommand=viewer_scrollbar.set)
+                viewer_scrollbar.pack(side='right', fill='y')
+                viewer_text.pack(fill='both', expand=True)
+                viewer_text.insert('1.0', text_index.file_content(hit['file']) or "")
+                highlight_hit(viewer_text, hit)
+                viewer_text.config(state='disabled')
+
+            def open_result(event=None):
+                hit = hits_by_item.get(results_tree.focus())
+                if hit is None:
+                    return
+                if hit['file'] not in file_name_to_path:
+                    show_unlisted_file(hit)
+                    return
+                select_file(hit['file'])
+                if selected_file.get() != hit['file']:
+                    return
+                notebook.select(text_editor_tab)
+                highlight_hit(text_widget, hit)
+
+            query_var.trace_add('write', schedule_search)
+            query_entry.bind('<Return>', lambda e: run_search())
+            results_tree.bind('<Double-1>', open_result)
+            results_tree.bind('<Return>', open_result)
+            query_entry.focus_set()
+
+        def show_transform_window():
+            """Hue/saturation/brightness, palette remap and curves over many files at once."""
+            try:
+                require_numpy()
+            except RuntimeError as e:
+                messagebox.showerror("NumPy Required", str(e), parent=root)
+                return
+
+            transform_window = tk.Toplevel(root)
+            transform_window.title("Transform Colors")
+            transform_window.geometry("520x520")
+
+            scope_var = StringVar(value="all")
+            hue_var = tk.DoubleVar(value=0.0)
+            saturation_var = tk.DoubleVar(value=1.0)
+            brightness_var = tk.DoubleVar(value=1.0)
+            threshold_var = StringVar(value="")
+            curve_vars = [StringVar(value="") for _ in range(3)]
+            result_var = StringVar(value="")
+
+            scope_frame = tk.LabelFrame(transform_window, text="Scope")
+            scope_frame.pack(fill='x', padx=5, pady=5)
+            for text, value in (("All files", "all"), ("Files shown in the list", "listed"), ("Current file", "current")):
+                tk.Radiobutton(scope_frame, text=text, variable=scope_var, value=value).pack(side='left', padx=5)
+
+            hsv_frame = tk.LabelFrame(transform_window, text="Hue / Saturation / Brightness")
+            hsv_frame.pack(fill='x', padx=5, pady=5)
+            for row, (text, var, from_, to, step) in enumerate((
+                ("Hue rotate (degrees):", hue_var, -180, 180, 1),
+                ("Saturation scale:", saturation_var, 0, 4, 0.05),
+                ("Brightness scale:", brightness_var, 0, 4, 0.05),
+            )):
+                Label(hsv_frame, text=text).grid(row=row, column=0, sticky='w', padx=5, pady=2)
+                tk.Spinbox(hsv_frame, from_=from_, to=to, increment=step, width=8, textvariable=var).grid(row=row, column=1, sticky='w')
+
+            palette_frame = tk.LabelFrame(transform_window, text="Palette Remap (one 'r, g, b -> r, g, b' per line)")
+            palette_frame.pack(fill='both', expand=True, padx=5, pady=5)
+            palette_text = tk.Text(palette_frame, height=5, width=40)
+            palette_text.pack(fill='both', expand=True, padx=5, pady=2)
+            threshold_row = tk.Frame(palette_frame)
+            threshold_row.pack(fill='x')
+            Label(threshold_row, text="Max distance (blank = remap every color):").pack(side='left', padx=5)
+            Entry(threshold_row, textvariable=threshold_var, width=8).pack(side='left')
+
+            curves_frame = tk.LabelFrame(transform_window, text="Curves (in:out points, e.g. 0:0, 128:160, 255:255)")
+            curves_frame.pack(fill='x', padx=5, pady=5)
+            for row, channel in enumerate("RGB"):
+                Label(curves_frame, text=f"{channel}:").grid(row=row, column=0, padx=5, pady=2)
+                Entry(curves_frame, textvariable=curve_vars[row], width=45).grid(row=row, column=1, sticky='we')
+
+            Label(transform_window, textvariable=result_var, anchor='w').pack(fill='x', padx=5)
+
+            def scope_files():
+                scope = scope_var.get()
+                if scope == "current":
+                    return [selected_file.get()] if selected_file.get() else []
+                if scope == "listed":
+                    return list(listbox_files.get(0, END))
+                return None
+
+            def compute():
+                """Return (entries, new colors) for the current settings."""
+                threshold = threshold_var.get().strip()
+                with perf_stats.stage("transform.compute"):
+                    entries, colors = collect_index_colors(color_index, scope_files())
+                    new_colors = transform_color_array(
+                        colors,
+                        hue_shift=float(hue_var.get()),
+                        saturation=float(saturation_var.get()),
+                        brightness=float(brightness_var.get()),
+                        palette=parse_palette(palette_text.get("1.0", END)),
+                        palette_threshold=float(threshold) if threshold else None,
+                        curves=[parse_curve(var.get()) for var in curve_vars],
+                    )
+                return entries, new_colors
+
+            def preview():
+                try:
+                    entries, new_colors = compute()
+                    changed = [e for e, c in zip(entries, new_colors.tolist()) if tuple(c) != tuple(e['color'])]
+                    files = len({e['file'] for e in changed})
+                    result_var.set(f"{len(changed)} of {len(entries)} colors would change in {files} files")
+                except (ValueError, RuntimeError) as e:
+                    result_var.set(f"Invalid settings: {e}")
+
+            def apply_transform():
+                try:
+                    entries, new_colors = compute()
+                    edits = transform_color_edits(entries, new_colors, files_content)
+                    updated = apply_file_edits(files_content, edits)
+                    if not updated:
+                        result_var.set("No colors changed.")
+                        return
+                    if not messagebox.askyesno(
+                        "Transform Colors", f"Write transformed colors to {len(updated)} files?", parent=transform_window
+                    ):
+                        return
+                    write_file_changes(updated, edits)
+                    result_var.set(f"Updated {len(updated)} files.")
+                except ValueError as e:
+                    messagebox.showerror("Invalid Settings", str(e), parent=transform_window)
+                except Exception as e:
+                    logging.exception("An error occurred while transforming colors.")
+                    messagebox.showerror("Error", f"An error occurred while transforming colors:\n{e}", parent=transform_window)
+
+            button_row = tk.Frame(transform_window)
+            button_row.pack(fill='x', padx=5, pady=5)
+            Button(button_row, text="Preview", command=preview).pack(side='left', padx=5)
+            Button(button_row, text="Apply", command=apply_transform).pack(side='left', padx=5)
+
+        def show_cluster_window():
+            """List groups of near-duplicate colors and unify a group into one color."""
+            try:
+                require_numpy()
+            except RuntimeError as e:
+                messagebox.showerror("NumPy Required", str(e), parent=root)
+                return
+
+            cluster_window = tk.Toplevel(root)
+            cluster_window.title("Near-Duplicate Colors")
+            cluster_window.geometry("760x480")
+
+            threshold_var = IntVar(value=8)
+            result_var = StringVar(value="")
+            controls = tk.Frame(cluster_window)
+            controls.pack(fill='x', padx=5, pady=5)
+
+            columns = ("colors", "usages", "files")
+            cluster_tree = ttk.Treeview(cluster_window, columns=columns, show='tree headings')
+            cluster_tree.heading('#0', text="Color")
+            cluster_tree.column('#0', width=160)
+            cluster_tree.heading("colors", text="Colors")
+            cluster_tree.column("colors", width=60, anchor='e')
+            cluster_tree.heading("usages", text="Usages")
+            cluster_tree.column("usages", width=60, anchor='e')
+            cluster_tree.heading("files", text="Files")
+            cluster_tree.column("files", width=420)
+            cluster_tree.pack(fill='both', expand=True, padx=5, pady=5)
+            Label(cluster_window, textvariable=result_var, anchor='w').pack(fill='x', padx=5)
+
+            tree_colors = {}  # {item id: (rgb, cluster colors)}
+
+            def files_using(rgb):
+                return sorted({file_name for file_name, _ in color_index.exact.get(rgb, ())})
+
+            def describe_files(files):
+                shown = ', '.join(files[:3])
+                return shown + (f" (+{len(files) - 3} more)" if len(files) > 3 else "")
+
+            def find_clusters():
+                cluster_tree.delete(*cluster_tree.get_children())
+                tree_colors.clear()
+                counts = color_index.usage_counts()
+                with perf_stats.stage("index.cluster"):
+                    clusters = cluster_colors(counts, threshold_var.get())
+                for cluster in clusters[:CLUSTER_DISPLAY_LIMIT]:
+                    files = sorted({fn for rgb in cluster['colors'] for fn in files_using(rgb)})
+                    parent = cluster_tree.insert(
+                        '', END, text=str(list(cluster['leader'])),
+                        values=(len(cluster['colors']), cluster['usages'], f"{len(files)} files")
+                    )
+                    tree_colors[parent] = (cluster['leader'], cluster['colors'])
+                    for rgb in cluster['colors']:
+                        member_files = files_using(rgb)
+                        child = cluster_tree.insert(
+                            parent, END, text=str(list(rgb)),
+                            values=("", counts[rgb], describe_files(member_files))
+                        )
+                        tree_colors[child] = (rgb, cluster['colors'])
+                shown = min(len(clusters), CLUSTER_DISPLAY_LIMIT)
+                result_var.set(
+                    f"{len(clusters)} clusters among {len(counts)} distinct colors"
+                    + (f" (showing the largest {shown})" if shown < len(clusters) else "")
+                )
+
+            def unify_selected():
+                item = cluster_tree.focus()
+                if item not in tree_colors:
+                    messagebox.showinfo("Unify Cluster", "Select a cluster, or one of its colors to unify to.", parent=cluster_window)
+                    return
+                target, members = tree_colors[item]
+                sources = [rgb for rgb in members if rgb != target]
+                entries = [entry for rgb in sources for entry in color_index.lookup(rgb)]
+                files = len({e['file'] for e in entries})
+                if not messagebox.askyesno(
+                    "Unify Cluster",
+                    f"Replace {len(entries)} usages of {len(sources)} colors in {files} files with {list(target)}?",
+                    parent=cluster_window
+                ):
+                    return
+                try:
+                    edits = entry_color_edits(((e, list(target)) for e in entries), files_content)
+                    write_file_changes(apply_file_edits(files_content, edits), edits)
+                    find_clusters()
+                except Exception as e:
+                    logging.exception("An error occurred while unifying colors.")
+                    messagebox.showerror("Error", f"An error occurred while unifying colors:\n{e}", parent=cluster_window)
+
+            Label(controls, text="Max distance:").pack(side='left', padx=(5, 2))
+            threshold_box = tk.Spinbox(controls, from_=1, to=441, width=5, textvariable=threshold_var)
+            threshold_box.pack(side='left')
+            threshold_box.bind('<Return>', lambda e: find_clusters())
+            Button(controls, text="Find Clusters", command=find_clusters).pack(side='left', padx=5)
+            Button(controls, text="Unify Selected", command=unify_selected).pack(side='left', padx=5)
+            Label(controls, text="Select a cluster to unify to its most used color, or a member to unify to that color.").pack(side='left', padx=5)
+            find_clusters()
+
+        def show_statistics_window():
+            """Color usage by field and by folder, aggregated from the color index."""
+            try:
+                require_numpy()
+            except RuntimeError as e:
+                messagebox.showerror("NumPy Required", str(e), parent=root)
+                return
+
+            stats_window = tk.Toplevel(root)
+            stats_window.title("Color Statistics")
+            stats_window.geometry("820x480")
+
+            summary_var = StringVar(value="")
+            Label(stats_window, textvariable=summary_var, anchor='w').pack(fill='x', padx=5, pady=5)
+            notebook = ttk.Notebook(stats_window)
+            notebook.pack(fill='both', expand=True, padx=5, pady=5)
+
+            columns = ("usages", "files", "distinct", "top")
+            trees = {}
+            for key, title in (("fields", "By Field"), ("folders", "By Folder")):
+                frame = ttk.Frame(notebook)
+                notebook.add(frame, text=title)
+                tree = ttk.Treeview(frame, columns=columns, show='tree headings')
+                tree.heading('#0', text="Field" if key == "fields" else "Folder")
+                tree.column('#0', width=220)
+                for column, heading, width in (("usages", "Usages", 70), ("files", "Files", 60),
+                                               ("distinct", "Distinct", 70), ("top", "Dominant Colors", 380)):
+                    tree.heading(column, text=heading)
+                    tree.column(column, width=width, anchor='w' if column == "top" else 'e')
+                tree.pack(fill='both', expand=True)
+                trees[key] = tree
+
+            def refresh_statistics():
+                with perf_stats.stage("index.stats"):
+                    stats = color_usage_stats(color_index)
+                for key, tree in trees.items():
+                    tree.delete(*tree.get_children())
+                    for entry in stats[key]:
+                        top = "  ".join(f"{list(rgb)} x{count}" for rgb, count in entry['top_colors'])
+                        tree.insert('', END, text=entry['name'],
+                                    values=(entry['usages'], entry['files'], entry['distinct'], top))
+                summary_var.set(
+                    f"{stats['usages']} color usages, {stats['distinct']} distinct colors in {stats['files']} files"
+                )
+
+            Button(stats_window, text="Refresh", command=refresh_statistics).pack(anchor='e', padx=5, pady=5)
+            refresh_statistics()
+
+        def export_manifest():
+            """Write every color field in the workspace to a CSV or JSON manifest."""
+            path = filedialog.asksaveasfilename(
+                title="Export Color Manifest", parent=root, defaultextension=".json",
+                filetypes=[("JSON manifest", "*.json"), ("CSV manifest", "*.csv")]
+            )
+            if not path:
+                return
+            try:
+                with perf_stats.stage("manifest.export"):
+                    count = export_color_manifest(color_index, files_content, path)
+                messagebox.showinfo("Export Color Manifest", f"Exported {count} color entries to:\n{path}", parent=root)
+            except Exception as e:
+                logging.exception("An error occurred while exporting the color manifest.")
+                messagebox.showerror("Error", f"An error occurred while exporting the manifest:\n{e}", parent=root)
+
+        def import_manifest():
+            """Apply an edited manifest, writing only the entries that changed."""
+            path = filedialog.askopenfilename(
+                title="Import Color Manifest", parent=root,
+                filetypes=[("Color manifest", "*.json *.csv"), ("All files", "*.*")]
+            )
+            if not path:
+                return
+            try:
+                with perf_stats.stage("manifest.import"):
+                    result = apply_color_manifest(read_color_manifest(path), file_name_to_path)
+                skipped = result['stale'] + result['missing']
+                if skipped:
+                    shown = '\n'.join(skipped[:10]) + (f"\n... and {len(skipped) - 10} more" if len(skipped) > 10 else "")
+                    if not messagebox.askyesno(
+                        "Import Color Manifest",
+                        f"{len(result['stale'])} files changed since the export and "
+                        f"{len(result['missing'])} are not in the workspace. They will be skipped:\n\n{shown}\n\n"
+                        f"Continue with the other files?",
+                        parent=root
+                    ):
+                        return
+                if not result['updated']:
+                    messagebox.showinfo("Import Color Manifest", "No colors differ from the current files.", parent=root)
+                    return
+                if not messagebox.askyesno(
+                    "Import Color Manifest",
+                    f"Write {result['changed']} changed colors to {len(result['updated'])} files?",
+                    parent=root
+                ):
+                    return
+                write_file_changes(result['updated'], result['edits'])
+                logging.info(f"Manifest import: {result['changed']} colors in {len(result['updated'])} files from {path}")
+            except Exception as e:
+                logging.exception("An error occurred while importing the color manifest.")
+                messagebox.showerror("Error", f"An error occurred while importing the manifest:\n{e}", parent=root)
+
+        def select_file(file_name):
+            """Select `file_name` in the file list (clearing the filter if needed) and load it."""
+            names = listbox_files.get(0, END)
+            if file_name not in names:
+                search_var.set("")
+                names = listbox_files.get(0, END)
+            if file_name in names:
+                index = names.index(file_name)
+                listbox_files.select_clear(0, END)
+                listbox_files.select_set(index)
+                listbox_files.see(index)
+                on_file_select()
 
         def apply_to_all():
             try:
@@ -1435,94 +5058,24 @@ def show_gui(root, vpcf_files, parent_folder):
                     messagebox.showinfo("No Changes", "No fields selected for applying changes.", parent=root)
                     return
 
-                modified_files = set()
+                updated = {}
+                edits = {}
                 for fn, c_ in files_content.items():
-                    new_c = c_
-                    for raw_name, col_ in fields_to_apply.items():
-                        col_str = color_list_to_string(col_)
-                        pat = re.compile(
-                            rf'(\b{re.escape(raw_name)}\s*=\s*)(\[[^\]]*\])',
-                            re.IGNORECASE | re.MULTILINE
-                        )
-                        new_c = re.sub(
-                            pat,
-                            lambda m: m.group(1) + col_str,
-                            new_c
-                        )
                     if gradients_to_apply:
-                        new_c = replace_gradient_blocks(new_c, gradients_to_apply)
-
+                        # Replacing gradient stops can change their number, so these files are re-parsed
+                        new_c = apply_colors_to_content(c_, fields_to_apply, gradients_to_apply)
+                    else:
+                        edits[fn] = scalar_color_edits(c_, fields_to_apply)
+                        new_c = apply_span_edits(c_, edits[fn])
                     if c_ != new_c:
-                        backup_file(file_name_to_path[fn])
-                        with open(file_name_to_path[fn], 'w') as f:
-                            f.write(new_c)
-                        files_content[fn] = new_c
-                        modified_files.add(fn)
-
-                nonlocal all_color_fields
-                for fn in modified_files:
-                    all_color_fields = [f for f in all_color_fields if f['filename'] != fn]
-                    updated_c = files_content[fn]
-                    updated_fields = find_color_fields(updated_c, fn)
-                    all_color_fields.extend(updated_fields)
+                        updated[fn] = new_c
+                write_file_changes(updated, edits)
 
                 messagebox.showinfo("Success", "Colors updated and all files saved.", parent=root)
-                refresh_gui()
             except Exception as e:
                 logging.exception("An error occurred while applying changes.")
                 messagebox.showerror("Error", f"An error occurred while applying changes:\n{e}", parent=root)
 
-        def replace_gradient_blocks(content, gradients_to_apply):
-            def replace_gradient_block(match):
-                prefix = match.group(1)
-                gradient_block_content = match.group(2)
-                suffix = match.group(3)
-
-                gradient_stop_pattern = re.compile(
-                    r'(\s*\{.*?m_flPosition\s*=\s*[\d\.]+.*?m_Color\s*=\s*(\[[^\]]*\]|\[.*?\])\s*\}[\s,]*)',
-                    re.DOTALL
-                )
-                stops = gradient_stop_pattern.findall(gradient_block_content)
-                stop_formats = [full_stop for (full_stop, color_array) in stops]
-
-                num_new_stops = len(gradients_to_apply)
-                new_stops = []
-
-                for i in range(num_new_stops):
-                    position = i / (num_new_stops - 1) if num_new_stops > 1 else 0.0
-                    position_str = f"{position:.6f}"
-                    if i < len(stop_formats):
-                        existing_stop = stop_formats[i]
-                        existing_stop = re.sub(
-                            r'(m_flPosition\s*=\s*)([\d\.]+)',
-                            lambda m: f"{m.group(1)}{position_str}",
-                            existing_stop
-                        )
-                        existing_stop = re.sub(
-                            r'(m_Color\s*=\s*)(\[[^\]]*\])',
-                            lambda m: f"{m.group(1)}{color_list_to_string(gradients_to_apply[i])}",
-                            existing_stop
-                        )
-                        new_stops.append(existing_stop)
-                    else:
-                        last_stop = stop_formats[-1]
-                        new_stop = re.sub(
-                            r'(m_flPosition\s*=\s*)([\d\.]+)',
-                            lambda m: f"{m.group(1)}{position_str}",
-                            last_stop
-                        )
-                        new_stop = re.sub(
-                            r'(m_Color\s*=\s*)(\[[^\]]*\])',
-                            lambda m: f"{m.group(1)}{color_list_to_string(gradients_to_apply[i])}",
-                            new_stop
-                        )
-                        new_stops.append(new_stop)
-
-                new_gradient_block_content = ''.join(new_stops)
-                return prefix + new_gradient_block_content + suffix
-
-            return gradient_pattern.sub(replace_gradient_block, content)
-
         def navigate_file(direction):
             new_index = current_file_index[0] + direction
             if 0 <= new_index < listbox_files.size():
@@ -1561,22 +5114,150 @@ def show_gui(root, vpcf_files, parent_folder):
         settings_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Settings", menu=settings_menu)
         settings_menu.add_command(label="Set Compiler Path", command=lambda: set_compiler_path())
+        settings_menu.add_command(label="Compiler Batching...", command=lambda: set_compiler_batching())
+        settings_menu.add_checkbutton(
+            label="Recompile Parents on Save",
+            variable=recompile_parents_var,
+            command=lambda: toggle_recompile_parents()
+        )
+        settings_menu.add_checkbutton(
+            label="Check for Updates on Startup",
+            variable=update_check_var,
+            command=lambda: toggle_update_check()
+        )
         settings_menu.add_command(label="Change Folder", command=lambda: change_folder())
+        settings_menu.add_command(label="Workspace Folders...", command=lambda: show_workspace_window())
+        settings_menu.add_checkbutton(
+            label="Show Files as Directory Tree",
+            variable=tree_view_var,
+            command=lambda: toggle_tree_view()
+        )
         settings_menu.add_command(label="Toggle Dark Mode", command=lambda: toggle_dark_mode())
 
+        tools_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Find / Replace Color...", command=lambda: show_color_search_window())
+        tools_menu.add_command(label="Search in Files...", command=lambda: show_text_search_window())
+        tools_menu.add_command(label="Transform Colors...", command=lambda: show_transform_window())
+        tools_menu.add_command(label="Near-Duplicate Colors...", command=lambda: show_cluster_window())
+        tools_menu.add_command(label="Color Statistics...", command=lambda: show_statistics_window())
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Export Color Manifest...", command=lambda: export_manifest())
+        tools_menu.add_command(label="Import Color Manifest...", command=lambda: import_manifest())
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Compile History...", command=lambda: show_compile_history_window())
+
         about_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=about_menu)
         about_menu.add_command(label="About", command=lambda: messagebox.showinfo("About", f"VPCF Color Editor {VERSION}\n{CREDIT}"))
         about_menu.add_command(label="Check for Updates", command=lambda: check_for_updates_async(user_initiated=True))
+        about_menu.add_command(label="Performance", command=lambda: show_performance_window())
+
+        def show_performance_window():
+            """Non-modal window listing aggregated stage timings."""
+            perf_window = tk.Toplevel(root)
+            perf_window.title("Performance")
+            perf_window.geometry("760x360")
+
+            columns = ("count", "total", "mean", "p50", "p90", "p99", "max")
+            tree = ttk.Treeview(perf_window, columns=columns, show='tree headings')
+            tree.heading('#0', text="Stage")
+            tree.column('#0', width=180)
+            for col in columns:
+                tree.heading(col, text=col if col == "count" else f"{col} (ms)")
+                tree.column(col, width=80, anchor='e')
+            tree.pack(fill='both', expand=True, padx=5, pady=5)
+
+            controls = tk.Frame(perf_window)
+            controls.pack(fill='x', padx=5, pady=5)
+
+            enabled_var = IntVar(value=1 if perf_stats.enabled else 0)
+
+            def on_toggle():
+                perf_stats.enabled = bool(enabled_var.get())
+
+            def refresh():
+                if not perf_window.winfo_exists():
+                    return
+                tree.delete(*tree.get_children())
+                for row_ in perf_stats.snapshot():
+                    values = [row_['count']] + [f"{row_[col] * 1000:.2f}" for col in columns[1:]]
+                    tree.insert('', END, text=row_['stage'], values=values)
+                perf_window.after(1000, refresh)
+
+            def export_json():
+                path_ = filedialog.asksaveasfilename(
+                    title="Export Performance Stats",
+                    defaultextension=".json",
+                    filetypes=[("JSON", "*.json")],
+                    parent=perf_window
+                )
+                if path_:
+                    perf_stats.dump_json(path_)
+
+            Checkbutton(controls, text="Enable timing", variable=enabled_var, command=on_toggle).pack(side='left', padx=5)
+            Button(controls, text="Reset", command=perf_stats.reset).pack(side='left', padx=5)
+            Button(controls, text="Export JSON...", command=export_json).pack(side='left', padx=5)
+
+            refresh()
 
         def toggle_dark_mode():
             global current_theme
             current_theme = "dark" if current_theme == "light" else "light"
-            theme_ = themes[current_theme]
-            apply_theme(root, theme_)
+            with perf_stats.stage("ui.theme"):
+                apply_theme(themes[current_theme])
             save_theme_preference()
 
-        def apply_theme(widget, theme_):
+        themed_widgets = []  # classic Tk widgets of the main window, collected once
+
+        def collect_themed_widgets(widget):
+            """
+            Remember the main window's classic Tk widgets. The field rows are ttk
+            widgets and are skipped, so this list does not grow with the file size.
+            """
+            if widget is btn_downgrade or widget in (inner_frame, apply_inner_frame):
+                return
+            if not isinstance(widget, ttk.Widget):
+                themed_widgets.append(widget)
+            for child in widget.winfo_children():
+                collect_themed_widgets(child)
+
+        def apply_theme(theme_):
+            """
+            Switch theme without walking the widget tree: ttk widgets follow the
+            style, classic widgets created later read the option database, and
+            the fixed set of classic main-window widgets is recolored directly.
+            """
+            bg, fg = theme_["bg"], theme_["fg"]
+            style.configure('.', background=bg, foreground=fg, fieldbackground=bg, insertcolor=fg,
+                            troughcolor=bg, selectbackground=theme_["highlight_bg"],
+                            selectforeground=theme_["highlight_fg"])
+            style.configure('TButton', background=theme_["button_bg"], foreground=theme_["button_fg"])
+            style.map('TButton', background=[('active', theme_["highlight_bg"])],
+                      foreground=[('active', theme_["highlight_fg"])])
+            style.map('TCheckbutton', background=[('active', theme_["highlight_bg"])])
+            style.configure('Treeview', background=bg, foreground=fg, fieldbackground=bg)
+            style.map('Treeview', background=[('selected', theme_["highlight_bg"])],
+                      foreground=[('selected', theme_["highlight_fg"])])
+            style.configure('Treeview.Heading', background=theme_["button_bg"], foreground=theme_["button_fg"])
+            style.configure('TNotebook', background=bg)
+            style.configure('TNotebook.Tab', background=theme_["button_bg"], foreground=theme_["button_fg"])
+            style.map('TNotebook.Tab', background=[('selected', bg)], foreground=[('selected', fg)])
+            style.configure('Error.TLabel', foreground='red')
+
+            for pattern, value in (
+                ('*Background', bg), ('*Foreground', fg),
+                ('*activeBackground', theme_["highlight_bg"]), ('*activeForeground', theme_["highlight_fg"]),
+                ('*selectBackground', theme_["highlight_bg"]), ('*selectForeground', theme_["highlight_fg"]),
+                ('*insertBackground', fg), ('*highlightBackground', bg), ('*troughColor', bg),
+                ('*selectColor', bg),
+            ):
+                root.option_add(pattern, value)
+
+            for widget in themed_widgets:
+                theme_widget(widget, theme_)
+
+        def theme_widget(widget, theme_):
             widget_type = widget.winfo_class()
             try:
                 widget.config(bg=theme_["bg"])
@@ -1592,7 +5273,7 @@ def show_gui(root, vpcf_files, parent_folder):
                         highlightbackground=theme_["bg"],
                         highlightcolor=theme_["bg"]
                     )
-                elif widget_type == "Entry":
+                if widget_type == "Entry":
                     widget.config(
                         fg=theme_["fg"],
                         bg=theme_["bg"],
@@ -1621,16 +5302,9 @@ def show_gui(root, vpcf_files, parent_folder):
                         activebackground=theme_["highlight_bg"],
                         activeforeground=theme_["highlight_fg"]
                     )
-                elif widget_type == "Frame":
-                    widget.config(bg=theme_["bg"])
-                elif widget_type == "Toplevel":
-                    widget.config(bg=theme_["bg"])
             except Exception as e:
                 logging.warning(f"Theme application skipped for {widget_type}: {e}")
 
-            for child in widget.winfo_children():
-                apply_theme(child, theme_)
-
         def save_theme_preference():
             config = load_config()
             config["theme"] = current_theme
@@ -1641,13 +5315,20 @@ def show_gui(root, vpcf_files, parent_folder):
             return config.get("theme", "light")
 
         current_theme = load_theme_preference()
-        apply_theme(root, themes[current_theme])
+        collect_themed_widgets(root)
+        apply_theme(themes[current_theme])
 
         # Start update check
         check_for_updates_async()
 
+        show_file_view()
         populate_listbox()
         root.mainloop()
+        compile_queue.shutdown()
+        compile_durations.save()
+        if save_compile_runs:
+            save_compile_runs[0].finish()
+        config_store.flush()
 
     except Exception as e:
         logging.exception("An unexpected error occurred in the GUI.")
@@ -1655,16 +5336,14 @@ def show_gui(root, vpcf_files, parent_folder):
         root.destroy()
         sys.exit(1)
 
-def downgrade_vpcf_files(current_folder):
-    if not current_folder or not os.path.exists(current_folder):
+def downgrade_vpcf_files(folders):
+    """Rewrite the KV3 header comment of every .vpcf file in `folders` (a list of folder paths)."""
+    if not folders or not all(os.path.exists(folder) for folder in folders):
         messagebox.showerror("Error", "Folder path is invalid.")
         return
 
-    vpcf_files = []
-    for root_dir, dirs, files in os.walk(current_folder):
-        for file in files:
-            if file.lower().endswith('.vpcf'):
-                vpcf_files.append(os.path.join(root_dir, file))
+    vpcf_files = [path for folder in folders for path in find_vpcf_files(folder)]
+    folder_list = "\n".join(folders)
 
     if not vpcf_files:
         messagebox.showinfo("Information", "No .vpcf files found.")
@@ -1672,7 +5351,7 @@ def downgrade_vpcf_files(current_folder):
 
     confirm = messagebox.askyesno(
         "Confirm Downgrade",
-        f"This will modify {len(vpcf_files)} files in:\n{current_folder}\n\nDo you want to continue?"
+        f"This will modify {len(vpcf_files)} files in:\n{folder_list}\n\nDo you want to continue?"
     )
     if not confirm:
         return
@@ -1707,14 +5386,89 @@ def downgrade_vpcf_files(current_folder):
         logging.exception("Error during downgrade process")
         messagebox.showerror("Error", f"An error occurred: {e}")
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=f"VPCF Color Editor {VERSION}")
+    parser.add_argument("--perf-json", metavar="PATH",
+                        help="Enable stage timing and write the collected stats to PATH on exit")
+    parser.add_argument("--scan", metavar="FOLDER", nargs="+",
+                        help="Scan one or more FOLDERs (as a workspace) without starting the GUI and print a summary")
+    parser.add_argument("--export-manifest", metavar="PATH",
+                        help="With --scan: write every color field to a CSV or JSON manifest at PATH")
+    parser.add_argument("--import-manifest", metavar="PATH",
+                        help="With --scan: write the changed colors from the manifest at PATH back to the files")
+    parser.add_argument("--compile-report", metavar="PATH",
+                        help="Write the recorded compile runs to PATH (JUnit XML for .xml, otherwise JSON) and exit")
+    return parser.parse_args(argv)
+
+def run_headless_scan(folders):
+    """Scan one or more folders without the GUI. Used for profiling and scripting."""
+    if isinstance(folders, str):
+        folders = [folders]
+    scan = scan_workspace(folders)
+    gradient_count = sum(1 for f in scan['all_color_fields'] if f['type'] == 'gradient')
+    print(f"{len(scan['vpcf_paths'])} VPCF files, {len(scan['file_name_to_path'])} with color fields, "
+          f"{len(scan['all_color_fields']) - gradient_count} scalar fields, {gradient_count} gradient stops")
+    return scan
+
+def run_manifest_export(scan, path):
+    index = ColorIndex()
+    fields_by_file = {}
+    for field in scan['all_color_fields']:
+        fields_by_file.setdefault(field['filename'], []).append(field)
+    for file_name, fields in fields_by_file.items():
+        index.update_file(file_name, fields)
+    count = export_color_manifest(index, scan['files_content'], path)
+    print(f"Exported {count} color entries to {path}")
+
+def run_manifest_import(scan, path):
+    result = apply_color_manifest(read_color_manifest(path), scan['file_name_to_path'])
+    for file_name in result['stale']:
+        print(f"Skipped (changed since export): {file_name}")
+    for file_name in result['missing']:
+        print(f"Skipped (not found): {file_name}")
+    for file_name, content in result['updated'].items():
+        file_path = scan['file_name_to_path'][file_name]
+        backup_file(file_path)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    print(f"Imported {result['changed']} changed colors into {len(result['updated'])} files")
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Log at the default level until the config is read, so its load warnings and migration notice reach the log file
+    setup_logging(DEFAULT_LOG_LEVEL)
+    config = load_config()
+    setup_logging(config.get("log_level", DEFAULT_LOG_LEVEL))
+
+    perf_stats.enabled = bool(args.perf_json or config.get("perf_enabled", False))
+    vpcf_discovery.exclude = list(config.get("scan_exclude", []))
+    if args.perf_json:
+        atexit.register(perf_stats.dump_json, args.perf_json)
+
+    if args.compile_report:
+        history = CompileHistory(os.path.join(os.path.dirname(config_store.path), COMPILE_HISTORY_DIR))
+        runs = history.load_runs()
+        write_compile_report(runs, args.compile_report)
+        print(f"Wrote {len(runs)} compile runs to {args.compile_report}")
+        return
+
+    if args.export_manifest or args.import_manifest:
+        if not args.scan:
+            sys.exit("--export-manifest and --import-manifest need --scan FOLDER")
+    if args.scan:
+        scan = run_headless_scan(args.scan)
+        if args.export_manifest:
+            run_manifest_export(scan, args.export_manifest)
+        if args.import_manifest:
+            run_manifest_import(scan, args.import_manifest)
+        return
+
     try:
         global root
         root = Tk()
         root.update()
 
         # Load configuration and folder path
-        config = load_config()
         if "folder_path" in config:
             folder_path[0] = config["folder_path"]
         else:
@@ -1732,7 +5486,8 @@ def main():
         else:
             folder_path[0] = None
 
-        while not folder_path[0] or not find_vpcf_files(folder_path[0]):
+        vpcf_files = find_vpcf_files(folder_path[0]) if folder_path[0] else []
+        while not vpcf_files:
             if folder_path[0]:
                 messagebox.showinfo(
                     "No Files Found",
@@ -1745,15 +5500,16 @@ def main():
                 sys.exit("No folder selected.")
             config["folder_path"] = folder_path[0]
             save_config(config)
+            vpcf_files = find_vpcf_files(folder_path[0])
 
         logging.info(f"Selected folder: {folder_path[0]}")
-        vpcf_files = find_vpcf_files(folder_path[0])
-        if not vpcf_files:
-            messagebox.showinfo("No Files Found", "No VPCF files found in the selected folder.", parent=root)
-            root.destroy()
-            sys.exit("No VPCF files found.")
-
-        show_gui(root, vpcf_files, folder_path[0])
+        extra_roots = []
+        for extra_root in config.get("workspace_roots", []):
+            if os.path.isdir(extra_root):
+                extra_roots.append(extra_root)
+            else:
+                logging.warning(f"Workspace folder not found, skipped: {extra_root}")
+        show_gui(root, vpcf_files, folder_path[0], extra_roots)
 
     except Exception as e:
         logging.exception("An error occurred in the main function.")